@@ -8,7 +8,7 @@ Convertit les fichiers Excel « Plannings YYYY SXX.xlsx » en :
   - fichiers JSON (métadonnées par semaine)
 
 Usage :
-    python generate.py
+    python generate.py [--quiet]
 
 Architecture :
     Excel (source) ──► generate.py ──► ics/ + HTML + data/
@@ -20,10 +20,41 @@ Le script détecte automatiquement tous les fichiers
 """
 
 import openpyxl
+import argparse
 import json
+import logging
 import os
 import re
+import sys
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import attrgetter
+from pathlib import Path
+
+try:
+    import orjson  # optionnel : sérialisation JSON nettement plus rapide
+except ImportError:
+    orjson = None
+
+
+def dumps_compact(obj):
+    """Sérialise en JSON compact UTF-8 (orjson si installé, sinon json)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps_pretty(obj):
+    """Sérialise en JSON indenté (2 espaces) pour les fichiers de data/."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+logger = logging.getLogger(__name__)
 
 # ── Mapping codes → noms lisibles + couleurs néon (basées sur l'Excel) ────
 
@@ -73,8 +104,14 @@ CODE_COLORS = {
     "STA-P": {"bg": "rgba(100,230,255,0.30)", "border": "#64e6ff",  "text": "#a0f0ff"},
 }
 DEFAULT_COLOR = {"bg": "rgba(255,255,255,0.20)", "border": "#888888", "text": "#cccccc"}
+# Sérialisés une fois : identiques pour toutes les pages semaine
+_COLORS_JSON = dumps_compact(CODE_COLORS)
+_DEFAULT_COLOR_JSON = dumps_compact(DEFAULT_COLOR)
 
-COLS = ["B", "C", "D", "E", "F", "G", "H"]
+# Colonnes jour B→H : COLS[d] pour le jour d (Lundi = 0), lu en vals[d + 1]
+COLS = ("B", "C", "D", "E", "F", "G", "H")
+
+_DAY = timedelta(days=1)
 
 FRENCH_MONTHS = {
     1: "Janvier", 2: "Février", 3: "Mars", 4: "Avril",
@@ -82,6 +119,43 @@ FRENCH_MONTHS = {
     9: "Septembre", 10: "Octobre", 11: "Novembre", 12: "Décembre",
 }
 
+# Expressions régulières compilées une fois pour tout le module
+_TIME_RE = re.compile(r"^(\d{1,2}):(\d{2})/(\d{1,2}):(\d{2})(\+?)$")
+_TIME_PREFIX_RE = re.compile(r"^\d{1,2}:\d{2}/\d{1,2}:\d{2}")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_FILENAME_RE = re.compile(r"Plannings\s+(\d{4})\s+S(\d+)(?:\s+v\d+)?\.xlsx", re.IGNORECASE)
+# Échappement des valeurs texte ICS (RFC 5545) en une seule passe
+_ICS_ESCAPE = str.maketrans({"\\": "\\\\", "\n": "\\n", ",": "\\,", ";": "\\;"})
+_SLUG_TABLE = str.maketrans({
+    "ï": "i", "é": "e", "è": "e", "ê": "e", "ô": "o", "ü": "u",
+    "ù": "u", "û": "u", "à": "a", "â": "a", "ç": "c",
+})
+
+# Bloc VTIMEZONE commun à tous les calendriers (lignes courtes, déjà terminées)
+_ICS_TIMEZONE = (
+    "X-WR-TIMEZONE:Europe/Paris\r\n"
+    # Intervalle de rafraîchissement pour les clients calendrier
+    "REFRESH-INTERVAL;VALUE=DURATION:PT12H\r\n"
+    "X-PUBLISHED-TTL:PT12H\r\n"
+    "BEGIN:VTIMEZONE\r\n"
+    "TZID:Europe/Paris\r\n"
+    "BEGIN:STANDARD\r\n"
+    "TZOFFSETFROM:+0200\r\n"
+    "TZOFFSETTO:+0100\r\n"
+    "TZNAME:CET\r\n"
+    "DTSTART:19701025T030000\r\n"
+    "RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU\r\n"
+    "END:STANDARD\r\n"
+    "BEGIN:DAYLIGHT\r\n"
+    "TZOFFSETFROM:+0100\r\n"
+    "TZOFFSETTO:+0200\r\n"
+    "TZNAME:CEST\r\n"
+    "DTSTART:19700329T020000\r\n"
+    "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU\r\n"
+    "END:DAYLIGHT\r\n"
+    "END:VTIMEZONE"
+)
+
 # ── Utilitaires ────────────────────────────────────────────────────────────
 
 
@@ -94,26 +168,27 @@ def first_name(name):
     return parts[-1]
 
 
+@lru_cache(maxsize=512)
 def slug(name):
     """BONILLO Matthieu -> bonillo-matthieu"""
     s = name.lower()
-    for old, new in [("ï", "i"), ("é", "e"), ("è", "e"), ("ê", "e"),
-                     ("ô", "o"), ("ü", "u"), ("ù", "u"), ("û", "u"),
-                     ("à", "a"), ("â", "a"), ("ç", "c")]:
-        s = s.replace(old, new)
-    return re.sub(r"[^a-z0-9]+", "-", s).strip("-")
+    if not s.isascii():
+        s = s.translate(_SLUG_TABLE)
+    return _SLUG_RE.sub("-", s).strip("-")
 
 
+@lru_cache(maxsize=256)
 def week_dates(year, week):
-    """Calcule les dates Lundi→Dimanche à partir de l'année/semaine ISO."""
+    """Calcule les dates Lundi→Dimanche (tuple) à partir de l'année/semaine ISO."""
     monday = datetime.fromisocalendar(year, week, 1)
-    return {col: monday + timedelta(days=i) for i, col in enumerate(COLS)}
+    return tuple(monday + timedelta(days=i) for i in range(7))
 
 
+@lru_cache(maxsize=256)
 def format_date_range(year, week):
     """Retourne « 2 → 8 Mars » ou « 28 Février → 6 Mars »."""
-    monday = datetime.fromisocalendar(year, week, 1)
-    sunday = monday + timedelta(days=6)
+    days = week_dates(year, week)
+    monday, sunday = days[0], days[6]
     if monday.month == sunday.month:
         return f"{monday.day} \u2192 {sunday.day} {FRENCH_MONTHS[monday.month]}"
     return (f"{monday.day} {FRENCH_MONTHS[monday.month]} \u2192 "
@@ -122,190 +197,229 @@ def format_date_range(year, week):
 
 def discover_excel_files(directory="."):
     """Trouve tous les fichiers « Plannings YYYY SXX.xlsx »."""
-    pattern = re.compile(r"Plannings\s+(\d{4})\s+S(\d+)(?:\s+v\d+)?\.xlsx", re.IGNORECASE)
     files = []
-    for f in sorted(os.listdir(directory)):
-        m = pattern.match(f)
-        if m:
-            files.append({
-                "filename": os.path.join(directory, f) if directory != "." else f,
-                "year": int(m.group(1)),
-                "week": int(m.group(2)),
-            })
-    files.sort(key=lambda x: (x["year"], x["week"]))
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            f = entry.name
+            m = _FILENAME_RE.match(f)
+            if m:
+                files.append({
+                    "filename": os.path.join(directory, f) if directory != "." else f,
+                    "year": int(m.group(1)),
+                    "week": int(m.group(2)),
+                })
+    # Le nom départage les versions d'une même semaine (ordre de scandir arbitraire)
+    files.sort(key=lambda x: (x["year"], x["week"], x["filename"]))
     return files
 
 
 # ── Parsing Excel ──────────────────────────────────────────────────────────
 
+# Lignes entièrement vides consécutives au-delà desquelles la suite d'une plage vide
+# est ignorée (feuilles dont la dimension déclarée est gonflée, ex. A1:Z1048576)
+_MAX_BLANK_ROWS = 50
 
-def get_cell(ws, row, col):
-    return ws[f"{col}{row}"].value
+# Créneau parsé : tuple nommé (léger, picklable pour le pool de processus)
+Event = namedtuple("Event", "code label start end week")
+_BY_START = attrgetter("start")
 
 
 def normalize_time_str(val):
-    """Normalise une valeur de cellule horaire en chaîne « HH:MM/HH:MM[+] ».
+    """Décompose une valeur de cellule horaire en (sh, sm, eh, em, next_day).
 
     Gère :
     - str  « 08:00/10:00 », « 8:00/10:00 », « 19:00/00:30+ »
-    - datetime (Excel formate la cellule en Heure) → converti en str
+    - datetime (Excel formate la cellule en Heure) → non exploitable
     - Retourne None si non reconnu.
     """
-    if isinstance(val, datetime):
-        # Excel time-formatted cell: openpyxl returns datetime(1900,1,1,H,M,S)
-        # On ne peut extraire qu'une seule heure, pas un intervalle → warning
-        return None
-    if not isinstance(val, str):
+    # Test de type exact : openpyxl ne renvoie que str, int, float, datetime ou None.
+    # Excel time-formatted cell: openpyxl returns datetime(1900,1,1,H,M,S)
+    # On ne peut extraire qu'une seule heure, pas un intervalle → warning (appelant)
+    if type(val) is not str:
         return None
     s = val.strip()
     if not s:
         return None
-    # Accepter les heures à 1 ou 2 chiffres : « 8:00/10:00 » → « 08:00/10:00 »
-    m = re.match(r"^(\d{1,2}):(\d{2})/(\d{1,2}):(\d{2})(\+?)$", s)
+    # Accepter les heures à 1 ou 2 chiffres : « 8:00/10:00 »
+    m = _TIME_RE.match(s)
     if not m:
         return None
-    return f"{int(m.group(1)):02d}:{m.group(2)}/{int(m.group(3)):02d}:{m.group(4)}{m.group(5)}"
+    # Groupes extraits en un appel plutôt que cinq m.group()
+    sh, sm, eh, em, plus = m.groups()
+    return (int(sh), int(sm), int(eh), int(em), plus == "+")
 
 
-def parse_time(time_str, base_date):
-    """Parse « 08:00/10:00 » ou « 19:00/00:30+ » en (start_dt, end_dt).
+def parse_time(fields, base_date):
+    """Construit (start_dt, end_dt) à partir des champs de normalize_time_str.
 
     Le suffixe « + » indique explicitement que l'heure de fin est le
     lendemain (ex : CUP-R 19:00/00:30+  →  19h → 0h30 le jour suivant).
     Même sans « + », si end ≤ start le lendemain est détecté automatiquement.
     """
-    parts = time_str.strip().split("/")
-    if len(parts) != 2:
-        return None
-
-    start_str = parts[0].strip()
-    end_str = parts[1].strip()
-
-    next_day = end_str.endswith("+")
-    if next_day:
-        end_str = end_str.rstrip("+")
-
-    sh, sm = int(start_str.split(":")[0]), int(start_str.split(":")[1])
-    eh, em = int(end_str.split(":")[0]), int(end_str.split(":")[1])
-
-    # Gérer 24:00 comme minuit du jour suivant
-    start_extra = 0
-    if sh >= 24:
-        sh -= 24
-        start_extra = 1
-    end_extra = 0
-    if eh >= 24:
-        eh -= 24
-        end_extra = 1
-
-    start_dt = base_date.replace(hour=sh, minute=sm, second=0) + timedelta(days=start_extra)
-    end_dt = base_date.replace(hour=eh, minute=em, second=0) + timedelta(days=end_extra)
-
+    sh, sm, eh, em, next_day = fields
+    # Cellule mal saisie (« 08:75 », « 48:00 ») : erreur, comme datetime() le faisait
+    if sm > 59 or em > 59 or sh > 24 or eh > 24:
+        raise ValueError(f"horaire invalide : {sh:02d}:{sm:02d}/{eh:02d}:{em:02d}")
+
+    # Calcul en minutes depuis minuit du jour de base (24:00 → lendemain 0h)
+    start = sh * 60 + sm
+    end = eh * 60 + em
     # « + » explicite OU détection automatique si fin ≤ début
-    if next_day or (end_dt <= start_dt):
-        end_dt += timedelta(days=1)
+    if next_day or end <= start:
+        end += 1440
+
+    y, mo, d = base_date.year, base_date.month, base_date.day
+    extra, minutes = divmod(start, 1440)
+    start_dt = datetime(y, mo, d, minutes // 60, minutes % 60)
+    if extra:
+        start_dt += _DAY * extra
+    extra, minutes = divmod(end, 1440)
+    end_dt = datetime(y, mo, d, minutes // 60, minutes % 60)
+    if extra:
+        end_dt += _DAY * extra
 
     return (start_dt, end_dt)
 
 
 def parse_employees(ws, dates, week_num):
-    """Parse tous les employés et leurs créneaux depuis la feuille Planning."""
+    """Parse tous les employés et leurs créneaux depuis la feuille Planning.
+
+    Retourne (employés, avertissements) : l'appelant se charge de les afficher.
+    """
     employees = {}
+    warnings = []
     current_name = None
     current_rows = []
 
-    for row in range(5, ws.max_row + 1):
-        name_cell = get_cell(ws, row, "A")
-        if name_cell and isinstance(name_cell, str) and name_cell.strip():
+    # Une seule passe sur la feuille (colonnes A→H, à partir de la ligne 5)
+    blank_streak = 0
+    for row, vals in enumerate(ws.iter_rows(min_row=5, max_col=8, values_only=True), start=5):
+        # Longue plage vide : feuille sans données (aucun employé vu) → arrêt ;
+        # sinon la lecture continue (un bloc sous un grand espacement reste lu) mais
+        # ces lignes ne sont plus confiées à parse_shifts, qui les ignorerait
+        if vals.count(None) == len(vals):
+            blank_streak += 1
+            if blank_streak > _MAX_BLANK_ROWS:
+                if current_name is None:
+                    break
+                continue
+        else:
+            blank_streak = 0
+        name_cell = vals[0]
+        if type(name_cell) is str and (name := name_cell.strip()):
             if current_name:
-                employees[current_name] = parse_shifts(ws, current_rows, dates, week_num, current_name)
-            current_name = name_cell.strip()
-            current_rows = [row]
+                employees[current_name] = parse_shifts(current_rows, dates, week_num, current_name, warnings)
+            current_name = name
+            current_rows = [(row, vals)]
         elif current_name:
-            current_rows.append(row)
+            current_rows.append((row, vals))
 
     if current_name:
-        employees[current_name] = parse_shifts(ws, current_rows, dates, week_num, current_name)
+        employees[current_name] = parse_shifts(current_rows, dates, week_num, current_name, warnings)
 
-    return employees
+    return employees, warnings
 
 
-def parse_shifts(ws, rows, dates, week_num, employee_name=""):
-    """Parse les créneaux d'un employé à partir de ses lignes."""
+def parse_planning_file(ef):
+    """Charge et parse un fichier Excel (exécuté dans un processus du pool)."""
+    dates = week_dates(ef["year"], ef["week"])
+    wb = openpyxl.load_workbook(ef["filename"], read_only=True, data_only=True)
+    try:
+        ws = wb["Planning"] if "Planning" in wb.sheetnames else wb.active
+        # Dimension déclarée erronée (« A1:A1 », certains exports) : en lecture
+        # seule, iter_rows s'arrêterait à la ligne 1 ; on lit jusqu'à la fin réelle.
+        if ws.max_row == 1 and ws.max_column == 1:
+            ws.reset_dimensions()
+        return parse_employees(ws, dates, ef["week"])
+    finally:
+        wb.close()
+
+
+def parse_shifts(rows, dates, week_num, employee_name, warnings):
+    """Parse les créneaux d'un employé à partir de ses lignes.
+
+    ``rows`` : liste de (numéro de ligne, valeurs A→H) telles que lues par iter_rows.
+    Les avertissements sont ajoutés à ``warnings`` (émis par parse_employees).
+    """
     events = []
-    warnings = []
+    # Lookup lié localement : appelé pour chaque créneau
+    code_name = CODE_NAMES.get
 
     i = 0
     while i < len(rows):
-        row = rows[i]
-        has_codes = False
+        row, vals = rows[i]
+        # Une seule passe B→H : chaque cellule est un code, un horaire ou vide.
+        # Les codes sont indexés par jour (0 = Lundi), position directe dans les lignes.
         codes = {}
-        for col in COLS:
-            val = get_cell(ws, row, col)
-            if val and isinstance(val, str):
+        for d, val in enumerate(vals[1:8]):
+            if type(val) is str:
                 val = val.strip()
-                if val and not re.match(r"^\d{1,2}:\d{2}/\d{1,2}:\d{2}", val):
-                    has_codes = True
-                    codes[col] = val
+                if val and not _TIME_PREFIX_RE.match(val):
+                    codes[d] = val
 
-        if has_codes:
+        if codes:
             times = {}
             if i + 1 < len(rows):
-                time_row = rows[i + 1]
-                for col in COLS:
-                    raw_val = get_cell(ws, time_row, col)
+                time_row, time_vals = rows[i + 1]
+                # Seules les colonnes portant un code ont besoin d'un horaire
+                for d in codes:
+                    raw_val = time_vals[d + 1]
                     if raw_val is None:
                         continue
-                    normalized = normalize_time_str(raw_val)
-                    if normalized:
-                        times[col] = normalized
+                    fields = normalize_time_str(raw_val)
+                    if fields:
+                        times[d] = fields
                     elif isinstance(raw_val, datetime):
                         warnings.append(
-                            f"  /!\\ {employee_name} ligne {time_row} col {col} : "
+                            f"  /!\\ {employee_name} ligne {time_row} col {COLS[d]} : "
                             f"cellule format\u00e9e en Heure ({raw_val.strftime('%H:%M')}), "
                             f"convertir en texte dans Excel"
                         )
             else:
-                for col, code in codes.items():
-                    if col in dates:
-                        warnings.append(
-                            f"  /!\\ {employee_name} ligne {row} col {col} : "
-                            f"code \u00ab {code} \u00bb sans ligne horaire en dessous"
-                        )
-
-            for col, code in codes.items():
-                if col in dates:
-                    if col in times:
-                        parsed = parse_time(times[col], dates[col])
-                        if parsed:
-                            label = CODE_NAMES.get(code, code)
-                            events.append({
-                                "code": code,
-                                "label": label,
-                                "start": parsed[0],
-                                "end": parsed[1],
-                                "week": week_num,
-                            })
-                    else:
-                        warnings.append(
-                            f"  /!\\ {employee_name} ligne {row} col {col} : "
-                            f"code \u00ab {code} \u00bb sans horaire trouv\u00e9"
-                        )
+                for d, code in codes.items():
+                    warnings.append(
+                        f"  /!\\ {employee_name} ligne {row} col {COLS[d]} : "
+                        f"code \u00ab {code} \u00bb sans ligne horaire en dessous"
+                    )
+
+            # Toutes les colonnes B→H ont une date : plus de test d'appartenance
+            for d, code in codes.items():
+                if d in times:
+                    start, end = parse_time(times[d], dates[d])
+                    events.append(Event(code, code_name(code, code), start, end, week_num))
+                else:
+                    warnings.append(
+                        f"  /!\\ {employee_name} ligne {row} col {COLS[d]} : "
+                        f"code \u00ab {code} \u00bb sans horaire trouv\u00e9"
+                    )
 
             i += 2
         else:
             i += 1
 
-    for w in warnings:
-        print(w)
-
-    events.sort(key=lambda e: e["start"])
+    events.sort(key=_BY_START)
     return events
 
 
 # ── Génération ICS (abonnement calendrier) ─────────────────────────────────
 
 
+def _ics_dt(dt):
+    """Date-heure locale ICS « AAAAMMJJTHHMMSS » (format fixe, sans strftime)."""
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}T{dt.hour:02d}{dt.minute:02d}{dt.second:02d}"
+
+
+def _repl_window(r):
+    """Fenêtre (début, fin) d'un remplacement, en heures décimales."""
+    r_parts = r.get("start", "0:0").split(":")
+    r_start = int(r_parts[0]) + int(r_parts[1] if len(r_parts) > 1 else 0) / 60
+    r_parts = r.get("end", "0:0").split(":")
+    r_end = int(r_parts[0]) + int(r_parts[1] if len(r_parts) > 1 else 0) / 60
+    return r_start, r_end
+
+
 def generate_ics(name, events, week_notes=None):
     """Génère le contenu ICS pour un employé (toutes semaines confondues).
 
@@ -316,49 +430,27 @@ def generate_ics(name, events, week_notes=None):
     if week_notes is None:
         week_notes = {}
     s = slug(name)
-    lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//Planning Urban 7D//FR",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
-        f"X-WR-CALNAME:Planning {name}",
-        "X-WR-TIMEZONE:Europe/Paris",
-        # Intervalle de rafraîchissement pour les clients calendrier
-        "REFRESH-INTERVAL;VALUE=DURATION:PT12H",
-        "X-PUBLISHED-TTL:PT12H",
-        "BEGIN:VTIMEZONE",
-        "TZID:Europe/Paris",
-        "BEGIN:STANDARD",
-        "TZOFFSETFROM:+0200",
-        "TZOFFSETTO:+0100",
-        "TZNAME:CET",
-        "DTSTART:19701025T030000",
-        "RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU",
-        "END:STANDARD",
-        "BEGIN:DAYLIGHT",
-        "TZOFFSETFROM:+0100",
-        "TZOFFSETTO:+0200",
-        "TZNAME:CEST",
-        "DTSTART:19700329T020000",
-        "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU",
-        "END:DAYLIGHT",
-        "END:VTIMEZONE",
+    blocks = [
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//Planning Urban 7D//FR\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "METHOD:PUBLISH\r\n"
+        + _fold_ics_line(f"X-WR-CALNAME:Planning {name}") + "\r\n"
+        + _ICS_TIMEZONE
     ]
 
     # Grouper par semaine pour des UIDs stables
-    by_week = {}
+    # (événements triés par début → semaines déjà dans l'ordre d'insertion)
+    by_week = defaultdict(list)
     for evt in events:
-        w = evt["week"]
-        if w not in by_week:
-            by_week[w] = []
-        by_week[w].append(evt)
+        by_week[evt.week].append(evt)
 
     # DTSTAMP must be UTC per RFC 5545
     from datetime import datetime as _dt, timezone as _tz
     dtstamp_utc = _dt.now(_tz.utc).strftime("%Y%m%dT%H%M%SZ")
 
-    for week_num in sorted(by_week.keys()):
+    for week_num, week_events in by_week.items():
         # Build description with weekly notes if available
         wn = week_notes.get(week_num, {})
         week_comment = wn.get("comment", "")
@@ -376,27 +468,31 @@ def generate_ics(name, events, week_notes=None):
                 extra_desc += prefix + upd_text
 
         # Build replacement lookup for this week
+        # (fenêtre horaire décodée au premier événement du même jour puis réutilisée :
+        # un remplacement mal saisi qui ne concerne aucun événement reste sans effet)
         week_repls = wn.get("replacements", [])
-
-        for i, evt in enumerate(by_week[week_num], 1):
-            dt_start = evt["start"].strftime("%Y%m%dT%H%M%S")
-            dt_end = evt["end"].strftime("%Y%m%dT%H%M%S")
-            evt_date = evt["start"].strftime("%Y-%m-%d")
-            evt_sh = evt["start"].hour + evt["start"].minute / 60
-            evt_eh = evt["end"].hour + evt["end"].minute / 60
+        repl_windows = [None] * len(week_repls)
+
+        for i, evt in enumerate(week_events, 1):
+            st, en = evt.start, evt.end
+            dt_start = _ics_dt(st)
+            dt_end = _ics_dt(en)
+            evt_date = st.date().isoformat()
+            evt_sh = st.hour + st.minute / 60
+            evt_eh = en.hour + en.minute / 60
             if evt_eh <= evt_sh:
                 evt_eh = 24
 
             # Check if this event is affected by a replacement
-            summary = evt['label']
+            summary = evt.label
             repl_note = ""
-            for r in week_repls:
+            for k, r in enumerate(week_repls):
                 if r.get("date") != evt_date:
                     continue
-                r_parts = r.get("start", "0:0").split(":")
-                r_start = int(r_parts[0]) + int(r_parts[1] if len(r_parts) > 1 else 0) / 60
-                r_parts = r.get("end", "0:0").split(":")
-                r_end = int(r_parts[0]) + int(r_parts[1] if len(r_parts) > 1 else 0) / 60
+                window = repl_windows[k]
+                if window is None:
+                    window = repl_windows[k] = _repl_window(r)
+                r_start, r_end = window
                 if evt_sh < r_end and evt_eh > r_start:
                     if name == r.get("out"):
                         # Get first name of replacer
@@ -414,157 +510,104 @@ def generate_ics(name, events, week_notes=None):
             desc = extra_desc
             if repl_note:
                 desc = repl_note + ("\n" + desc if desc else "")
-            desc_escaped = desc.replace("\\", "\\\\").replace("\n", "\\n").replace(",", "\\,").replace(";", "\\;")
-            summary_escaped = summary.replace(chr(92), chr(92)+chr(92)).replace(',', chr(92)+',').replace(';', chr(92)+';')
-            vevent = [
-                "BEGIN:VEVENT",
-                f"UID:{s}-s{week_num}-{i}@urban7d",
-                f"DTSTAMP:{dtstamp_utc}",
-                f"DTSTART;TZID=Europe/Paris:{dt_start}",
-                f"DTEND;TZID=Europe/Paris:{dt_end}",
-                f"SUMMARY:{summary_escaped}",
-            ]
+            desc_escaped = desc.translate(_ICS_ESCAPE)
+            summary_escaped = summary.translate(_ICS_ESCAPE)
+            # Un bloc par événement ; seules les lignes libres peuvent dépasser 75 octets
+            block = (
+                "BEGIN:VEVENT\r\n"
+                + _fold_ics_line(f"UID:{s}-s{week_num}-{i}@urban7d") + "\r\n"
+                f"DTSTAMP:{dtstamp_utc}\r\n"
+                f"DTSTART;TZID=Europe/Paris:{dt_start}\r\n"
+                f"DTEND;TZID=Europe/Paris:{dt_end}\r\n"
+                + _fold_ics_line(f"SUMMARY:{summary_escaped}") + "\r\n"
+            )
             if desc_escaped:
-                vevent.append(f"DESCRIPTION:{desc_escaped}")
-            vevent.append("END:VEVENT")
-            lines.extend(vevent)
-
-    lines.append("END:VCALENDAR")
-    # RFC 5545 §3.1: content lines MUST NOT exceed 75 octets – fold long lines
-    folded = []
-    for line in lines:
-        encoded = line.encode("utf-8")
-        if len(encoded) <= 75:
-            folded.append(line)
+                block += _fold_ics_line(f"DESCRIPTION:{desc_escaped}") + "\r\n"
+            blocks.append(block + "END:VEVENT")
+
+    blocks.append("END:VCALENDAR\r\n")
+    return "\r\n".join(blocks)
+
+
+def _fold_ics_line(line):
+    """Plie une ligne ICS trop longue (RFC 5545 §3.1 : 75 octets maximum)."""
+    if len(line) <= 75 and line.isascii():
+        return line
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    # First chunk: max 75 octets, continuations: space + max 74 octets
+    chunks = []
+    while len(encoded) > 75:
+        # Find a safe cut point (don't split multi-byte UTF-8 chars)
+        cut = 75 if not chunks else 74
+        pos = cut
+        while pos > 0 and (encoded[pos] & 0xC0) == 0x80:
+            pos -= 1
+        if pos == 0:
+            pos = cut  # fallback
+        if chunks:
+            chunks.append(" " + encoded[:pos].decode("utf-8", errors="replace"))
         else:
-            # First chunk: max 75 octets, continuations: space + max 74 octets
-            chunks = []
-            while len(encoded) > 75:
-                # Find a safe cut point (don't split multi-byte UTF-8 chars)
-                cut = 75 if not chunks else 74
-                pos = cut
-                while pos > 0 and (encoded[pos] & 0xC0) == 0x80:
-                    pos -= 1
-                if pos == 0:
-                    pos = cut  # fallback
-                if chunks:
-                    chunks.append(" " + encoded[:pos].decode("utf-8", errors="replace"))
-                else:
-                    chunks.append(encoded[:pos].decode("utf-8", errors="replace"))
-                encoded = encoded[pos:]
-            if encoded:
-                rest = encoded.decode("utf-8", errors="replace")
-                chunks.append((" " + rest) if chunks else rest)
-            folded.extend(chunks)
-    return "\r\n".join(folded) + "\r\n"
-
+            chunks.append(encoded[:pos].decode("utf-8", errors="replace"))
+        encoded = encoded[pos:]
+    if encoded:
+        rest = encoded.decode("utf-8", errors="replace")
+        chunks.append((" " + rest) if chunks else rest)
+    return "\r\n".join(chunks)
 
 # ── Génération HTML ────────────────────────────────────────────────────────
 
 
-def build_events_json(week_employees):
-    """Construit les données JSON des événements pour injection dans le HTML."""
+def build_events_data(week_employees):
+    """Construit les données des événements ({nom: {slug, events}}) d'une semaine."""
     data = {}
     for name, evts in week_employees.items():
         data[name] = {
             "slug": slug(name),
             "events": [{
-                "code": e["code"],
-                "label": e["label"],
-                "start": e["start"].strftime("%Y-%m-%dT%H:%M"),
-                "end": e["end"].strftime("%Y-%m-%dT%H:%M"),
-                "day": e["start"].weekday(),
+                "code": e.code,
+                "label": e.label,
+                "start": e.start.isoformat(timespec="minutes"),
+                "end": e.end.isoformat(timespec="minutes"),
+                "day": e.start.weekday(),
             } for e in evts],
         }
-    return json.dumps(data, ensure_ascii=False)
-
-
-def load_week_notes(week_num):
-    """Charge les notes de semaine depuis notes/SXX.json."""
-    path = f"notes/S{week_num}.json"
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-    return {"comment": "", "updates": []}
+    return data
 
 
-def generate_html(week_employees, week_num, year, all_weeks):
-    """Génère la page HTML avec preview timeline + vue individuelle + abonnement."""
-    date_range = format_date_range(year, week_num)
+def build_events_json(week_employees):
+    """Construit les données JSON des événements pour injection dans le HTML."""
+    return dumps_compact(build_events_data(week_employees))
 
-    # Si un fichier events.json existe (modifié depuis la page web), l'utiliser
-    # comme source de vérité à la place des données Excel.
-    events_path = f"data/S{week_num}-events.json"
-    if os.path.exists(events_path):
-        with open(events_path, "r", encoding="utf-8") as f:
-            events_json = f.read().strip()
-    else:
-        events_json = build_events_json(week_employees)
-    colors_json = json.dumps(CODE_COLORS, ensure_ascii=False)
-    default_color_json = json.dumps(DEFAULT_COLOR, ensure_ascii=False)
-    notes_data = load_week_notes(week_num)
-    notes_json = json.dumps(notes_data, ensure_ascii=False)
 
-    DAYS_SHORT = ["Lun", "Mar", "Mer", "Jeu", "Ven", "Sam", "Dim"]
-    DAYS_FULL = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
-    monday = datetime.fromisocalendar(year, week_num, 1)
-    day_labels_json = json.dumps([
-        f"{DAYS_SHORT[i]} {(monday + timedelta(days=i)).day:02d}"
-        for i in range(7)
-    ], ensure_ascii=False)
-    day_labels_full_json = json.dumps([
-        f"{DAYS_FULL[i]} {(monday + timedelta(days=i)).day:02d}/{(monday + timedelta(days=i)).month:02d}"
-        for i in range(7)
-    ], ensure_ascii=False)
-    week_dates_json = json.dumps([
-        (monday + timedelta(days=i)).strftime('%Y-%m-%d')
-        for i in range(7)
-    ])
-
-    week_tabs = ""
-    for w in sorted(all_weeks):
-        cls = ' active' if w == week_num else ''
-        href = '#' if w == week_num else f'S{w}.html'
-        week_tabs += f'            <a href="{href}" class="week-tab{cls}">S{w}</a>\n'
-
-    employee_buttons = ""
-    for name in week_employees:
-        s = slug(name)
-        has_events = len(week_employees[name]) > 0
-        if has_events:
-            employee_buttons += (
-                f'            <button class="employee-btn" data-name="{name}" '
-                f'data-slug="{s}">{name}</button>\n'
-            )
-        else:
-            employee_buttons += (
-                f'            <div class="employee-btn repos">{name} '
-                f'<span class="badge">Repos</span></div>\n'
-            )
+@lru_cache(maxsize=256)
+def load_week_notes(week_num):
+    """Charge les notes de semaine depuis notes/SXX.json.
 
-    return f"""<!DOCTYPE html>
-<html lang="fr">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Planning Urban 7D - S{week_num}</title>
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link href="https://fonts.googleapis.com/css2?family=Space+Mono:wght@400;700&family=Tahoma&display=swap" rel="stylesheet">
-    <style>
-        @font-face {{ font-family: 'Heading'; src: local('GT Pressura Mono Bold'), local('Space Mono'); }}
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
+    Lu une fois par exécution (ICS et HTML partagent le résultat, à ne pas modifier).
+    """
+    try:
+        with open(f"notes/S{week_num}.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"comment": "", "updates": []}
+
+
+# Parties statiques de la page semaine (CSS + script), identiques pour toutes
+# les semaines : concaténées telles quelles, sans passer par le formatage.
+_PAGE_CSS = """\
+        @font-face { font-family: 'Heading'; src: local('GT Pressura Mono Bold'), local('Space Mono'); }
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
             font-family: Tahoma, 'Inter', sans-serif;
             background: #1E1E1E;
             min-height: 100vh;
             padding: 15px;
             color: #fff;
             position: relative;
-        }}
-        body::before {{
+        }
+        body::before {
             content: '';
             position: fixed;
             inset: 0;
@@ -572,708 +615,765 @@ def generate_html(week_employees, week_num, year, all_weeks):
             pointer-events: none;
             background: url('bg-team.jpg') center center / cover no-repeat;
             opacity: 0.22;
-        }}
-        .container {{ position: relative; z-index: 1; max-width: 600px; margin: 0 auto;
+        }
+        .container { position: relative; z-index: 1; max-width: 600px; margin: 0 auto;
                       background: rgba(10,10,25,0.92); border-radius: 16px;
-                      padding: 2px 6px; margin-top: 6px; margin-bottom: 6px; }}
+                      padding: 2px 6px; margin-top: 6px; margin-bottom: 6px; }
 
         /* ── Header ── */
-        .header {{ text-align: center; margin-bottom: 12px; padding: 10px 10px 8px; }}
-        h1 {{ font-family: 'Space Mono', 'GT Pressura Mono Bold', monospace;
+        .header { text-align: center; margin-bottom: 12px; padding: 10px 10px 8px; }
+        h1 { font-family: 'Space Mono', 'GT Pressura Mono Bold', monospace;
               color: #FF7832; font-size: 18px; font-weight: 700; margin-bottom: 2px;
               text-transform: uppercase; letter-spacing: 1px;
-              text-shadow: 0 0 30px rgba(255,120,50,0.3); }}
-        .subtitle {{ color: #888; font-size: 12px; }}
-        .dates {{ color: #FF7832; font-size: 14px; font-weight: 600;
+              text-shadow: 0 0 30px rgba(255,120,50,0.3); }
+        .subtitle { color: #888; font-size: 12px; }
+        .dates { color: #FF7832; font-size: 14px; font-weight: 600;
                   background: rgba(255,120,50,0.1); padding: 6px 14px;
                   border-radius: 20px; display: inline-block; margin-top: 6px;
-                  border: 1px solid rgba(255,120,50,0.2); }}
+                  border: 1px solid rgba(255,120,50,0.2); }
 
         /* ── Week selector ── */
-        .week-selector {{ display: flex; justify-content: center; gap: 6px;
-                          margin-bottom: 15px; flex-wrap: wrap; }}
-        .week-tab {{ padding: 8px 14px; background: rgba(255,255,255,0.04);
+        .week-selector { display: flex; justify-content: center; gap: 6px;
+                          margin-bottom: 15px; flex-wrap: wrap; }
+        .week-tab { padding: 8px 14px; background: rgba(255,255,255,0.04);
                      border: 1px solid rgba(255,255,255,0.08); border-radius: 20px;
                      color: #666; text-decoration: none; font-weight: 500; font-size: 13px;
-                     transition: all 0.2s; }}
-        .week-tab:hover {{ background: rgba(255,120,50,0.1); border-color: rgba(255,120,50,0.3); color: #FF7832; }}
-        .week-tab.active {{ background: #FF7832; border-color: #FF7832; color: white;
-                            box-shadow: 0 0 15px rgba(255,120,50,0.4); }}
+                     transition: all 0.2s; }
+        .week-tab:hover { background: rgba(255,120,50,0.1); border-color: rgba(255,120,50,0.3); color: #FF7832; }
+        .week-tab.active { background: #FF7832; border-color: #FF7832; color: white;
+                            box-shadow: 0 0 15px rgba(255,120,50,0.4); }
 
         /* ── View toggle ── */
-        .view-toggle {{ display: flex; justify-content: center; gap: 4px; margin-bottom: 15px;
-                        background: rgba(255,255,255,0.04); border-radius: 12px; padding: 4px; }}
-        .view-btn {{ flex: 1; padding: 8px; border: none; background: transparent;
+        .view-toggle { display: flex; justify-content: center; gap: 4px; margin-bottom: 15px;
+                        background: rgba(255,255,255,0.04); border-radius: 12px; padding: 4px; }
+        .view-btn { flex: 1; padding: 8px; border: none; background: transparent;
                      color: #666; font-size: 12px; font-weight: 600; cursor: pointer;
-                     border-radius: 10px; transition: all 0.2s; font-family: inherit; }}
-        .view-btn.active {{ background: rgba(255,120,50,0.15); color: #FF7832;
-                            box-shadow: 0 0 10px rgba(255,120,50,0.2); }}
+                     border-radius: 10px; transition: all 0.2s; font-family: inherit; }
+        .view-btn.active { background: rgba(255,120,50,0.15); color: #FF7832;
+                            box-shadow: 0 0 10px rgba(255,120,50,0.2); }
 
         /* ── Day tabs ── */
-        .day-tabs {{ display: flex; gap: 3px; margin-bottom: 12px; overflow-x: auto;
+        .day-tabs { display: flex; gap: 3px; margin-bottom: 12px; overflow-x: auto;
                      padding-bottom: 4px; -webkit-overflow-scrolling: touch;
-                     scrollbar-width: none; }}
-        .day-tabs::-webkit-scrollbar {{ display: none; }}
-        .day-tab {{ padding: 6px 8px; background: rgba(255,255,255,0.04);
+                     scrollbar-width: none; }
+        .day-tabs::-webkit-scrollbar { display: none; }
+        .day-tab { padding: 6px 8px; background: rgba(255,255,255,0.04);
                     border: 1px solid rgba(255,255,255,0.08); border-radius: 8px;
                     color: #666; font-size: 10px; font-weight: 600; cursor: pointer;
                     white-space: nowrap; transition: all 0.2s; flex: 1; min-width: 0;
-                    text-align: center; }}
-        .day-tab.active {{ background: rgba(255,120,50,0.15); border-color: rgba(255,120,50,0.3);
-                           color: #FF7832; }}
+                    text-align: center; }
+        .day-tab.active { background: rgba(255,120,50,0.15); border-color: rgba(255,120,50,0.3);
+                           color: #FF7832; }
 
         /* ── Timeline (vue Journée) ── */
-        .timeline {{ position: relative; margin-bottom: 20px;
-                     overflow-x: auto; -webkit-overflow-scrolling: touch; }}
+        .timeline { position: relative; margin-bottom: 20px;
+                     overflow-x: auto; -webkit-overflow-scrolling: touch; }
         /* ── Scrollbar orange néon ── */
-        .timeline::-webkit-scrollbar {{ height: 6px; }}
-        .timeline::-webkit-scrollbar-track {{ background: rgba(255,255,255,0.04); border-radius: 3px; }}
-        .timeline::-webkit-scrollbar-thumb {{ background: #FF7832; border-radius: 3px;
-                                              box-shadow: 0 0 8px rgba(255,120,50,0.6); }}
-        .timeline {{ scrollbar-width: thin; scrollbar-color: #FF7832 rgba(255,255,255,0.04); }}
-        .timeline-inner {{ min-width: 500px; }}
-        .time-markers {{ display: flex; justify-content: space-between; padding: 0 0 6px 0;
-                         border-bottom: 1px solid rgba(255,255,255,0.06); margin-bottom: 8px; }}
-        .time-marker {{ font-size: 9px; color: #555; font-weight: 500; }}
-        .timeline-row {{ display: flex; align-items: center; margin-bottom: 4px; }}
-        .tl-name {{ width: 70px; font-size: 10px; color: #aaa; font-weight: 500;
+        .timeline::-webkit-scrollbar { height: 6px; }
+        .timeline::-webkit-scrollbar-track { background: rgba(255,255,255,0.04); border-radius: 3px; }
+        .timeline::-webkit-scrollbar-thumb { background: #FF7832; border-radius: 3px;
+                                              box-shadow: 0 0 8px rgba(255,120,50,0.6); }
+        .timeline { scrollbar-width: thin; scrollbar-color: #FF7832 rgba(255,255,255,0.04); }
+        .timeline-inner { min-width: 500px; }
+        .time-markers { display: flex; justify-content: space-between; padding: 0 0 6px 0;
+                         border-bottom: 1px solid rgba(255,255,255,0.06); margin-bottom: 8px; }
+        .time-marker { font-size: 9px; color: #555; font-weight: 500; }
+        .timeline-row { display: flex; align-items: center; margin-bottom: 4px; }
+        /* Lignes employés hors écran : rendu différé par le navigateur.
+           La marge de découpe laisse déborder le halo des barres au survol. */
+        .timeline-row + .timeline-row { content-visibility: auto; contain-intrinsic-size: auto 26px;
+                                        overflow-clip-margin: 12px; }
+        .tl-name { width: 70px; font-size: 10px; color: #aaa; font-weight: 500;
                     flex-shrink: 0; overflow: hidden; text-overflow: ellipsis; white-space: nowrap;
                     padding-right: 6px; cursor: pointer; transition: color 0.2s;
                     position: sticky; left: 0; z-index: 2;
                     background: linear-gradient(90deg, rgba(10,10,25,0.98) 80%, transparent);
-                    padding-right: 10px; }}
-        .tl-name:hover {{ color: #FF7832; }}
-        .tl-bar-container {{ flex: 1; position: relative; height: 26px;
-                             background: rgba(255,255,255,0.02); border-radius: 5px; }}
-        .tl-grid-line {{ position: absolute; top: 0; bottom: 0; width: 1px; pointer-events: none; z-index: 0; }}
-        .tl-grid-line.hour {{ background: rgba(255,255,255,0.10); }}
-        .tl-grid-line.half {{ background: rgba(255,255,255,0.05); border-left: 1px dashed rgba(255,255,255,0.08); width: 0; }}
-        @keyframes nowPulse {{
-            0%, 100% {{ filter: drop-shadow(0 0 4px #ffd700) drop-shadow(0 0 8px rgba(255,215,0,0.4)); opacity: 0.7; }}
-            50% {{ filter: drop-shadow(0 0 10px #ffd700) drop-shadow(0 0 20px rgba(255,215,0,0.8)); opacity: 1; }}
-        }}
-        .tl-now-line {{ position: absolute; top: 0; bottom: 0; width: 2px; pointer-events: none; z-index: 3;
+                    padding-right: 10px; }
+        .tl-name:hover { color: #FF7832; }
+        /* Quadrillage heures / demi-heures peint en fond : aucun nœud par ligne.
+           --hours (nombre d'heures affichées) est posé par renderTimeline. */
+        .tl-bar-container { flex: 1; position: relative; height: 26px; border-radius: 5px;
+                             contain: layout style;
+                             background-color: rgba(255,255,255,0.02);
+                             background-image: linear-gradient(90deg, rgba(255,255,255,0.10) 1px, transparent 1px),
+                                               linear-gradient(90deg, transparent 50%, rgba(255,255,255,0.06) 50%,
+                                                               rgba(255,255,255,0.06) calc(50% + 1px), transparent calc(50% + 1px));
+                             background-size: calc(100% / var(--hours, 1)) 100%; }
+        @keyframes nowPulse {
+            0%, 100% { filter: drop-shadow(0 0 4px #ffd700) drop-shadow(0 0 8px rgba(255,215,0,0.4)); opacity: 0.7; }
+            50% { filter: drop-shadow(0 0 10px #ffd700) drop-shadow(0 0 20px rgba(255,215,0,0.8)); opacity: 1; }
+        }
+        .tl-now-line { position: absolute; top: 0; bottom: 0; width: 2px; pointer-events: none; z-index: 3;
                         border-left: 2px dashed #ffd700;
-                        filter: drop-shadow(0 0 4px #ffd700) drop-shadow(0 0 8px rgba(255,215,0,0.4)); opacity: 0.8; }}
-        .tl-now-marker {{ position: absolute; top: 0; bottom: 0; width: 2px; pointer-events: none; z-index: 3;
+                        filter: drop-shadow(0 0 4px #ffd700) drop-shadow(0 0 8px rgba(255,215,0,0.4)); opacity: 0.8; }
+        .tl-now-marker { position: absolute; top: 0; bottom: 0; width: 2px; pointer-events: none; z-index: 3;
                           border-left: 2px dashed #ffd700;
-                          filter: drop-shadow(0 0 4px #ffd700) drop-shadow(0 0 8px rgba(255,215,0,0.4)); opacity: 0.8; }}
-        .tl-bar {{ position: absolute; height: 100%; border-radius: 5px;
+                          filter: drop-shadow(0 0 4px #ffd700) drop-shadow(0 0 8px rgba(255,215,0,0.4)); opacity: 0.8; }
+        .tl-bar { position: absolute; height: 100%; border-radius: 5px;
                    display: flex; align-items: center; justify-content: center;
                    font-size: 9px; font-weight: 600; overflow: hidden;
                    border-left: 2px solid; transition: all 0.2s;
-                   cursor: default; }}
-        .tl-bar:hover {{ filter: brightness(1.3); z-index: 2;
-                         box-shadow: 0 0 12px var(--glow-color); }}
-        .tl-bar .bar-label {{ padding: 0 4px; white-space: nowrap; }}
-        .tl-bar.replaced {{ position: relative; opacity: 0.7; }}
-        .tl-bar.replaced::after {{ content: ''; position: absolute; inset: 0; border-radius: inherit;
+                   cursor: default; }
+        .tl-bar:hover { filter: brightness(1.3); z-index: 2;
+                         box-shadow: 0 0 12px var(--glow-color); }
+        .tl-bar .bar-label { padding: 0 4px; white-space: nowrap; }
+        .tl-bar.replaced { position: relative; opacity: 0.7; }
+        .tl-bar.replaced::after { content: ''; position: absolute; inset: 0; border-radius: inherit;
             background: repeating-linear-gradient(45deg, transparent, transparent 3px, rgba(255,60,60,0.35) 3px, rgba(255,60,60,0.35) 5px);
-            pointer-events: none; }}
-        .tl-bar.replacer {{ position: relative; }}
-        .tl-bar.replacer::after {{ content: ''; position: absolute; inset: 0; border-radius: inherit;
+            pointer-events: none; }
+        .tl-bar.replacer { position: relative; }
+        .tl-bar.replacer::after { content: ''; position: absolute; inset: 0; border-radius: inherit;
             background: repeating-linear-gradient(45deg, transparent, transparent 3px, rgba(60,220,80,0.35) 3px, rgba(60,220,80,0.35) 5px);
-            pointer-events: none; }}
+            pointer-events: none; }
 
         /* ── Employee list (vue Staff) ── */
-        .employee-list {{ display: flex; flex-direction: column; gap: 6px; margin-bottom: 15px; }}
-        .employee-btn {{ display: flex; align-items: center; justify-content: space-between;
+        .employee-list { display: flex; flex-direction: column; gap: 6px; margin-bottom: 15px; }
+        .employee-btn { display: flex; align-items: center; justify-content: space-between;
                          padding: 12px 14px; background: rgba(255,255,255,0.04);
                          border-radius: 10px; color: white; font-weight: 500; font-size: 13px;
                          border: 1px solid rgba(255,255,255,0.08); cursor: pointer;
-                         transition: all 0.2s; font-family: inherit; width: 100%; text-align: left; }}
-        .employee-btn:hover {{ background: rgba(255,120,50,0.1); border-color: rgba(255,120,50,0.3);
-                               transform: translateX(4px); }}
-        .employee-btn.repos {{ color: #444; cursor: default; pointer-events: none; }}
-        .badge {{ font-size: 10px; padding: 3px 8px; background: rgba(255,255,255,0.06);
-                  border-radius: 15px; color: #444; }}
-        .hours-badge {{ background: rgba(255,120,50,0.15); color: #FF7832; font-weight: 600; }}
+                         transition: all 0.2s; font-family: inherit; width: 100%; text-align: left; }
+        .employee-btn:hover { background: rgba(255,120,50,0.1); border-color: rgba(255,120,50,0.3);
+                               transform: translateX(4px); }
+        .employee-btn.repos { color: #444; cursor: default; pointer-events: none; }
+        .badge { font-size: 10px; padding: 3px 8px; background: rgba(255,255,255,0.06);
+                  border-radius: 15px; color: #444; }
+        .hours-badge { background: rgba(255,120,50,0.15); color: #FF7832; font-weight: 600; }
 
         /* ── Individual preview (modal) ── */
-        .modal-overlay {{ display: none; position: fixed; inset: 0; background: rgba(0,0,0,0.85);
+        .modal-overlay { display: none; position: fixed; inset: 0; background: rgba(0,0,0,0.85);
                           z-index: 100; justify-content: center; align-items: flex-start;
-                          padding: 15px 10px; overflow-y: auto; }}
-        .modal-overlay.open {{ display: flex; }}
-        .modal {{ background: #12121e; border-radius: 14px; width: 100%; max-width: 500px;
-                  border: 1px solid rgba(255,255,255,0.08); overflow: hidden; }}
-        .modal-header {{ padding: 14px 16px; display: flex; justify-content: space-between;
-                         align-items: center; border-bottom: 1px solid rgba(255,255,255,0.06); }}
-        .modal-header h2 {{ font-size: 16px; color: #FF7832; font-weight: 700; }}
-        .modal-close {{ background: none; border: none; color: #666; font-size: 24px;
-                        cursor: pointer; padding: 0 5px; line-height: 1; }}
-        .modal-close:hover {{ color: #fff; }}
-        .modal-body {{ padding: 12px 14px; }}
-        .modal-day {{ margin-bottom: 12px; }}
-        .modal-day-title {{ font-size: 11px; color: #666; font-weight: 600;
-                            text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 5px; }}
-        .modal-event {{ display: flex; align-items: center; gap: 8px; padding: 8px 10px;
-                        border-radius: 8px; margin-bottom: 3px; border-left: 3px solid; }}
-        .modal-event .ev-time {{ font-size: 11px; font-weight: 600; white-space: nowrap;
-                                 min-width: 80px; }}
-        .modal-event .ev-label {{ font-size: 12px; font-weight: 500; }}
-        .modal-event .ev-repl {{ font-size: 10px; font-weight: 600; margin-left: auto; white-space: nowrap; }}
-        .modal-event.replaced {{ position: relative; opacity: 0.7; }}
-        .modal-event.replaced::after {{ content: ''; position: absolute; inset: 0; border-radius: inherit;
+                          padding: 15px 10px; overflow-y: auto; }
+        .modal-overlay.open { display: flex; }
+        .modal { background: #12121e; border-radius: 14px; width: 100%; max-width: 500px;
+                  border: 1px solid rgba(255,255,255,0.08); overflow: hidden; }
+        .modal-header { padding: 14px 16px; display: flex; justify-content: space-between;
+                         align-items: center; border-bottom: 1px solid rgba(255,255,255,0.06); }
+        .modal-header h2 { font-size: 16px; color: #FF7832; font-weight: 700; }
+        .modal-close { background: none; border: none; color: #666; font-size: 24px;
+                        cursor: pointer; padding: 0 5px; line-height: 1; }
+        .modal-close:hover { color: #fff; }
+        .modal-body { padding: 12px 14px; }
+        .modal-day { margin-bottom: 12px; }
+        .modal-day-title { font-size: 11px; color: #666; font-weight: 600;
+                            text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 5px; }
+        .modal-event { display: flex; align-items: center; gap: 8px; padding: 8px 10px;
+                        border-radius: 8px; margin-bottom: 3px; border-left: 3px solid; }
+        .modal-event .ev-time { font-size: 11px; font-weight: 600; white-space: nowrap;
+                                 min-width: 80px; }
+        .modal-event .ev-label { font-size: 12px; font-weight: 500; }
+        .modal-event .ev-repl { font-size: 10px; font-weight: 600; margin-left: auto; white-space: nowrap; }
+        .modal-event.replaced { position: relative; opacity: 0.7; }
+        .modal-event.replaced::after { content: ''; position: absolute; inset: 0; border-radius: inherit;
             background: repeating-linear-gradient(45deg, transparent, transparent 3px,
-            rgba(255,60,60,0.25) 3px, rgba(255,60,60,0.25) 5px); pointer-events: none; }}
-        .modal-event.replacer {{ position: relative; }}
-        .modal-event.replacer::after {{ content: ''; position: absolute; inset: 0; border-radius: inherit;
+            rgba(255,60,60,0.25) 3px, rgba(255,60,60,0.25) 5px); pointer-events: none; }
+        .modal-event.replacer { position: relative; }
+        .modal-event.replacer::after { content: ''; position: absolute; inset: 0; border-radius: inherit;
             background: repeating-linear-gradient(45deg, transparent, transparent 3px,
-            rgba(60,220,80,0.25) 3px, rgba(60,220,80,0.25) 5px); pointer-events: none; }}
-        .modal-footer {{ padding: 12px 16px; border-top: 1px solid rgba(255,255,255,0.06);
-                         text-align: center; }}
-        .modal-hours-total {{ margin-top: 12px; padding: 10px 14px; text-align: right;
+            rgba(60,220,80,0.25) 3px, rgba(60,220,80,0.25) 5px); pointer-events: none; }
+        .modal-footer { padding: 12px 16px; border-top: 1px solid rgba(255,255,255,0.06);
+                         text-align: center; }
+        .modal-hours-total { margin-top: 12px; padding: 10px 14px; text-align: right;
                               font-size: 13px; color: #FF7832; font-weight: 500;
-                              border-top: 1px solid rgba(255,255,255,0.06); }}
-        .hours-line {{ padding: 2px 0; }}
-        .hours-line.pause {{ color: #888; font-size: 11px; }}
-        .hours-line.net {{ color: #64dc3c; font-size: 14px; margin-top: 4px;
-                           padding-top: 6px; border-top: 1px solid rgba(255,255,255,0.06); }}
-        .hours-brut {{ color: #666; font-weight: 400; font-size: 9px; }}
-        .subscribe-btn {{ display: inline-flex; align-items: center; gap: 8px;
+                              border-top: 1px solid rgba(255,255,255,0.06); }
+        .hours-line { padding: 2px 0; }
+        .hours-line.pause { color: #888; font-size: 11px; }
+        .hours-line.net { color: #64dc3c; font-size: 14px; margin-top: 4px;
+                           padding-top: 6px; border-top: 1px solid rgba(255,255,255,0.06); }
+        .hours-brut { color: #666; font-weight: 400; font-size: 9px; }
+        .subscribe-btn { display: inline-flex; align-items: center; gap: 8px;
                           padding: 10px 24px; background: #FF7832; color: white;
                           border: none; border-radius: 25px; font-size: 13px; font-weight: 600;
                           cursor: pointer; font-family: inherit; transition: all 0.2s;
                           text-decoration: none;
-                          box-shadow: 0 0 20px rgba(255,120,50,0.3); }}
-        .subscribe-btn:hover {{ background: #ff9050;
-                                box-shadow: 0 0 30px rgba(255,120,50,0.5); transform: scale(1.02); }}
+                          box-shadow: 0 0 20px rgba(255,120,50,0.3); }
+        .subscribe-btn:hover { background: #ff9050;
+                                box-shadow: 0 0 30px rgba(255,120,50,0.5); transform: scale(1.02); }
 
         /* ── Calendar chooser (bottom sheet) ── */
-        .cal-chooser-overlay {{ display:none; position:fixed; inset:0; background:rgba(0,0,0,0.85);
-                                z-index:200; justify-content:center; align-items:flex-end; }}
-        .cal-chooser-overlay.open {{ display:flex; }}
-        .cal-chooser {{ background:#12121e; border-radius:16px 16px 0 0; width:100%; max-width:500px;
-                        padding:20px 16px 30px; animation: slideUp 0.25s ease-out; }}
-        @keyframes slideUp {{ from {{ transform:translateY(100%); }} to {{ transform:translateY(0); }} }}
-        .cal-chooser h3 {{ color:#FF7832; font-size:15px; font-weight:700; margin-bottom:4px; text-align:center; }}
-        .cal-chooser .cal-sub {{ color:#666; font-size:11px; text-align:center; margin-bottom:16px; }}
-        .cal-option {{ display:flex; align-items:center; gap:12px; padding:14px;
+        .cal-chooser-overlay { display:none; position:fixed; inset:0; background:rgba(0,0,0,0.85);
+                                z-index:200; justify-content:center; align-items:flex-end; }
+        .cal-chooser-overlay.open { display:flex; }
+        .cal-chooser { background:#12121e; border-radius:16px 16px 0 0; width:100%; max-width:500px;
+                        padding:20px 16px 30px; animation: slideUp 0.25s ease-out; }
+        @keyframes slideUp { from { transform:translateY(100%); } to { transform:translateY(0); } }
+        .cal-chooser h3 { color:#FF7832; font-size:15px; font-weight:700; margin-bottom:4px; text-align:center; }
+        .cal-chooser .cal-sub { color:#666; font-size:11px; text-align:center; margin-bottom:16px; }
+        .cal-option { display:flex; align-items:center; gap:12px; padding:14px;
                        background:rgba(255,255,255,0.04); border:1px solid rgba(255,255,255,0.08);
                        border-radius:12px; margin-bottom:8px; text-decoration:none; color:white;
-                       transition:all 0.2s; cursor:pointer; }}
-        .cal-option:hover {{ background:rgba(255,120,50,0.1); border-color:rgba(255,120,50,0.3); }}
-        .cal-option .cal-icon {{ font-size:22px; width:36px; text-align:center; flex-shrink:0; }}
-        .cal-option .cal-info {{ flex:1; }}
-        .cal-option .cal-name {{ font-weight:600; font-size:13px; }}
-        .cal-option .cal-desc {{ font-size:10px; color:#888; margin-top:2px; }}
-        .cal-chooser-cancel {{ display:block; width:100%; padding:12px; background:none;
+                       transition:all 0.2s; cursor:pointer; }
+        .cal-option:hover { background:rgba(255,120,50,0.1); border-color:rgba(255,120,50,0.3); }
+        .cal-option .cal-icon { font-size:22px; width:36px; text-align:center; flex-shrink:0; }
+        .cal-option .cal-info { flex:1; }
+        .cal-option .cal-name { font-weight:600; font-size:13px; }
+        .cal-option .cal-desc { font-size:10px; color:#888; margin-top:2px; }
+        .cal-chooser-cancel { display:block; width:100%; padding:12px; background:none;
                                border:1px solid rgba(255,255,255,0.1); border-radius:12px;
                                color:#888; font-size:13px; cursor:pointer; margin-top:4px;
-                               font-family:inherit; transition: all 0.2s; }}
-        .cal-chooser-cancel:hover {{ color:#fff; border-color:rgba(255,255,255,0.3); }}
+                               font-family:inherit; transition: all 0.2s; }
+        .cal-chooser-cancel:hover { color:#fff; border-color:rgba(255,255,255,0.3); }
 
-        .no-events {{ text-align: center; padding: 30px; color: #444; font-size: 13px; }}
+        .no-events { text-align: center; padding: 30px; color: #444; font-size: 13px; }
 
         /* ── Notes de semaine ── */
-        .week-notes {{ margin-bottom: 15px; }}
-        .note-card {{ background: rgba(255,255,255,0.04); border: 1px solid rgba(255,255,255,0.08);
-                      border-radius: 10px; padding: 12px 14px; margin-bottom: 8px; }}
-        .note-card.comment {{ border-left: 3px solid #FF7832; }}
-        .note-card.update {{ border-left: 3px solid #ffc000; }}
-        .note-header {{ display: flex; justify-content: space-between; align-items: center;
-                        margin-bottom: 6px; }}
-        .note-label {{ font-size: 10px; font-weight: 700; text-transform: uppercase;
-                       letter-spacing: 0.5px; }}
-        .note-label.comment {{ color: #FF7832; }}
-        .note-label.update {{ color: #ffc000; }}
-        .note-text {{ font-size: 12px; color: #ccc; line-height: 1.6; white-space: pre-line; }}
-        .note-text:empty::before {{ content: 'Cliquer pour ajouter...'; color: #444; font-style: italic; }}
-        .note-text[contenteditable=true] {{ outline: none; border: 1px solid rgba(255,120,50,0.2);
+        .week-notes { margin-bottom: 15px; }
+        .note-card { background: rgba(255,255,255,0.04); border: 1px solid rgba(255,255,255,0.08);
+                      border-radius: 10px; padding: 12px 14px; margin-bottom: 8px; }
+        .note-card.comment { border-left: 3px solid #FF7832; }
+        .note-card.update { border-left: 3px solid #ffc000; }
+        .note-header { display: flex; justify-content: space-between; align-items: center;
+                        margin-bottom: 6px; }
+        .note-label { font-size: 10px; font-weight: 700; text-transform: uppercase;
+                       letter-spacing: 0.5px; }
+        .note-label.comment { color: #FF7832; }
+        .note-label.update { color: #ffc000; }
+        .note-text { font-size: 12px; color: #ccc; line-height: 1.6; white-space: pre-line; }
+        .note-text:empty::before { content: 'Cliquer pour ajouter...'; color: #444; font-style: italic; }
+        .note-text[contenteditable=true] { outline: none; border: 1px solid rgba(255,120,50,0.2);
                                             border-radius: 6px; padding: 8px; min-height: 40px;
-                                            background: rgba(0,0,0,0.2); }}
-        .note-actions {{ display: flex; gap: 6px; }}
-        .note-btn {{ background: none; border: none; color: #555; font-size: 14px;
-                     cursor: pointer; padding: 2px 4px; transition: color 0.2s; }}
-        .note-btn:hover {{ color: #FF7832; }}
-        .note-btn.del:hover {{ color: #ff5050; }}
-        .add-note-btn {{ display: flex; align-items: center; justify-content: center; gap: 6px;
+                                            background: rgba(0,0,0,0.2); }
+        .note-actions { display: flex; gap: 6px; }
+        .note-btn { background: none; border: none; color: #555; font-size: 14px;
+                     cursor: pointer; padding: 2px 4px; transition: color 0.2s; }
+        .note-btn:hover { color: #FF7832; }
+        .note-btn.del:hover { color: #ff5050; }
+        .add-note-btn { display: flex; align-items: center; justify-content: center; gap: 6px;
                          padding: 8px; background: rgba(255,255,255,0.02);
                          border: 1px dashed rgba(255,255,255,0.1); border-radius: 10px;
                          color: #444; font-size: 11px; cursor: pointer; transition: all 0.2s;
-                         font-family: inherit; width: 100%; margin-bottom: 8px; }}
-        .add-note-btn:hover {{ border-color: rgba(255,120,50,0.3); color: #FF7832; }}
-        .publish-btn {{ display: flex; align-items: center; justify-content: center; gap: 6px;
+                         font-family: inherit; width: 100%; margin-bottom: 8px; }
+        .add-note-btn:hover { border-color: rgba(255,120,50,0.3); color: #FF7832; }
+        .publish-btn { display: flex; align-items: center; justify-content: center; gap: 6px;
                         padding: 10px 16px; background: #FF7832; border: none; border-radius: 10px;
                         color: #fff; font-size: 12px; font-weight: 600; cursor: pointer;
                         transition: all 0.2s; font-family: inherit; width: 100%; margin-top: 8px;
-                        box-shadow: 0 0 15px rgba(255,120,50,0.3); }}
-        .publish-btn:hover {{ background: #ff9050; box-shadow: 0 0 25px rgba(255,120,50,0.5); }}
-        .publish-btn:disabled {{ background: #444; box-shadow: none; cursor: not-allowed; color: #888; }}
-        .publish-btn.success {{ background: #64dc3c; box-shadow: 0 0 15px rgba(100,220,60,0.3); }}
-        .admin-setup {{ display: flex; align-items: center; gap: 6px; margin-top: 8px; }}
-        .admin-input {{ flex: 1; padding: 8px 10px; background: rgba(0,0,0,0.3);
+                        box-shadow: 0 0 15px rgba(255,120,50,0.3); }
+        .publish-btn:hover { background: #ff9050; box-shadow: 0 0 25px rgba(255,120,50,0.5); }
+        .publish-btn:disabled { background: #444; box-shadow: none; cursor: not-allowed; color: #888; }
+        .publish-btn.success { background: #64dc3c; box-shadow: 0 0 15px rgba(100,220,60,0.3); }
+        .admin-setup { display: flex; align-items: center; gap: 6px; margin-top: 8px; }
+        .admin-input { flex: 1; padding: 8px 10px; background: rgba(0,0,0,0.3);
                         border: 1px solid rgba(255,255,255,0.1); border-radius: 8px;
-                        color: #ccc; font-size: 11px; font-family: inherit; outline: none; }}
-        .admin-input:focus {{ border-color: rgba(255,120,50,0.4); }}
-        .admin-input::placeholder {{ color: #444; }}
-        .admin-save-btn {{ padding: 8px 12px; background: rgba(255,120,50,0.15);
+                        color: #ccc; font-size: 11px; font-family: inherit; outline: none; }
+        .admin-input:focus { border-color: rgba(255,120,50,0.4); }
+        .admin-input::placeholder { color: #444; }
+        .admin-save-btn { padding: 8px 12px; background: rgba(255,120,50,0.15);
                            border: 1px solid rgba(255,120,50,0.3); border-radius: 8px;
                            color: #FF7832; font-size: 11px; cursor: pointer; font-family: inherit;
-                           white-space: nowrap; }}
-        .admin-hint {{ font-size: 10px; color: #444; margin-top: 4px; }}
+                           white-space: nowrap; }
+        .admin-hint { font-size: 10px; color: #444; margin-top: 4px; }
 
         /* ── Remplacements ── */
-        .note-card.replacement {{ border-left: 3px solid #ff5050; }}
-        .note-label.replacement {{ color: #ff5050; }}
-        .repl-summary {{ font-size: 12px; color: #ccc; line-height: 1.6; }}
-        .repl-out {{ color: #ff6b6b; font-weight: 600; }}
-        .repl-in {{ color: #64dc3c; font-weight: 600; }}
-        .repl-form {{ display: flex; flex-direction: column; gap: 8px; margin-top: 8px; }}
-        .repl-form select, .repl-form input {{ padding: 7px 10px; background: rgba(0,0,0,0.3);
+        .note-card.replacement { border-left: 3px solid #ff5050; }
+        .note-label.replacement { color: #ff5050; }
+        .repl-summary { font-size: 12px; color: #ccc; line-height: 1.6; }
+        .repl-out { color: #ff6b6b; font-weight: 600; }
+        .repl-in { color: #64dc3c; font-weight: 600; }
+        .repl-form { display: flex; flex-direction: column; gap: 8px; margin-top: 8px; }
+        .repl-form select, .repl-form input { padding: 7px 10px; background: rgba(0,0,0,0.3);
             border: 1px solid rgba(255,255,255,0.1); border-radius: 8px;
-            color: #ccc; font-size: 11px; font-family: inherit; outline: none; }}
-        .repl-form select:focus, .repl-form input:focus {{ border-color: rgba(255,120,50,0.4); }}
-        .repl-form select option {{ background: #1a1a2e; color: #ccc; }}
-        .repl-row {{ display: flex; gap: 6px; align-items: center; }}
-        .repl-row label {{ font-size: 10px; color: #666; min-width: 55px; text-align: right; }}
-        .repl-row select, .repl-row input {{ flex: 1; }}
-        .repl-add-btn {{ padding: 7px 14px; background: rgba(255,80,80,0.15);
+            color: #ccc; font-size: 11px; font-family: inherit; outline: none; }
+        .repl-form select:focus, .repl-form input:focus { border-color: rgba(255,120,50,0.4); }
+        .repl-form select option { background: #1a1a2e; color: #ccc; }
+        .repl-row { display: flex; gap: 6px; align-items: center; }
+        .repl-row label { font-size: 10px; color: #666; min-width: 55px; text-align: right; }
+        .repl-row select, .repl-row input { flex: 1; }
+        .repl-add-btn { padding: 7px 14px; background: rgba(255,80,80,0.15);
             border: 1px solid rgba(255,80,80,0.3); border-radius: 8px;
             color: #ff5050; font-size: 11px; cursor: pointer; font-family: inherit;
-            transition: all 0.2s; align-self: flex-end; }}
-        .repl-add-btn:hover {{ background: rgba(255,80,80,0.25); }}
-        .add-repl-btn {{ display: flex; align-items: center; justify-content: center; gap: 6px;
+            transition: all 0.2s; align-self: flex-end; }
+        .repl-add-btn:hover { background: rgba(255,80,80,0.25); }
+        .add-repl-btn { display: flex; align-items: center; justify-content: center; gap: 6px;
                          padding: 8px; background: rgba(255,80,80,0.02);
                          border: 1px dashed rgba(255,80,80,0.15); border-radius: 10px;
                          color: #ff5050; font-size: 11px; cursor: pointer; transition: all 0.2s;
-                         font-family: inherit; width: 100%; margin-bottom: 8px; opacity: 0.6; }}
-        .add-repl-btn:hover {{ border-color: rgba(255,80,80,0.4); opacity: 1; }}
+                         font-family: inherit; width: 100%; margin-bottom: 8px; opacity: 0.6; }
+        .add-repl-btn:hover { border-color: rgba(255,80,80,0.4); opacity: 1; }
 
         /* ── Admin edit mode ── */
-        .admin-toolbar {{ display: flex; align-items: center; gap: 8px; margin-bottom: 12px;
+        .admin-toolbar { display: flex; align-items: center; gap: 8px; margin-bottom: 12px;
                           padding: 8px 12px; background: rgba(255,120,50,0.08);
-                          border: 1px solid rgba(255,120,50,0.2); border-radius: 10px; }}
-        .edit-toggle {{ padding: 6px 14px; background: rgba(255,120,50,0.15);
+                          border: 1px solid rgba(255,120,50,0.2); border-radius: 10px; }
+        .edit-toggle { padding: 6px 14px; background: rgba(255,120,50,0.15);
                         border: 1px solid rgba(255,120,50,0.3); border-radius: 8px;
                         color: #FF7832; font-size: 11px; font-weight: 600; cursor: pointer;
-                        font-family: inherit; transition: all 0.2s; }}
-        .edit-toggle:hover {{ background: #FF7832; color: #fff; }}
-        .edit-toggle.active {{ background: #FF7832; color: #fff;
-                               box-shadow: 0 0 10px rgba(255,120,50,0.4); }}
-        .admin-toolbar .label {{ font-size: 11px; color: #888; }}
-        .tl-bar.editable {{ cursor: pointer; }}
-        .tl-bar.editable:hover {{ outline: 2px solid #FF7832; outline-offset: 1px; }}
-        .edit-popup {{ position: fixed; top: 50%; left: 50%; transform: translate(-50%, -50%);
+                        font-family: inherit; transition: all 0.2s; }
+        .edit-toggle:hover { background: #FF7832; color: #fff; }
+        .edit-toggle.active { background: #FF7832; color: #fff;
+                               box-shadow: 0 0 10px rgba(255,120,50,0.4); }
+        .admin-toolbar .label { font-size: 11px; color: #888; }
+        #timeline.editing .tl-bar { cursor: pointer; }
+        #timeline.editing .tl-bar:hover { outline: 2px solid #FF7832; outline-offset: 1px; }
+        .edit-popup { position: fixed; top: 50%; left: 50%; transform: translate(-50%, -50%);
                        z-index: 200; background: #1a1a2e; border: 1px solid rgba(255,120,50,0.3);
                        border-radius: 12px; padding: 16px; min-width: 260px;
-                       box-shadow: 0 10px 40px rgba(0,0,0,0.6); }}
-        .edit-popup h3 {{ font-size: 13px; color: #FF7832; margin-bottom: 10px; }}
-        .edit-popup .field {{ display: flex; align-items: center; gap: 8px; margin-bottom: 8px; }}
-        .edit-popup .field label {{ font-size: 11px; color: #888; min-width: 45px; }}
-        .edit-popup .field input, .edit-popup .field input[type="text"] {{
+                       box-shadow: 0 10px 40px rgba(0,0,0,0.6); }
+        .edit-popup h3 { font-size: 13px; color: #FF7832; margin-bottom: 10px; }
+        .edit-popup .field { display: flex; align-items: center; gap: 8px; margin-bottom: 8px; }
+        .edit-popup .field label { font-size: 11px; color: #888; min-width: 45px; }
+        .edit-popup .field input, .edit-popup .field input[type="text"] {
             flex: 1; padding: 6px 8px; background: rgba(0,0,0,0.3);
             border: 1px solid rgba(255,255,255,0.1); border-radius: 6px;
-            color: #fff; font-size: 12px; font-family: inherit; outline: none; }}
-        .edit-popup .field input:focus {{ border-color: rgba(255,120,50,0.4); }}
-        .edit-popup .actions {{ display: flex; gap: 6px; margin-top: 10px; }}
-        .edit-popup .actions button {{ flex: 1; padding: 8px; border: none; border-radius: 8px;
+            color: #fff; font-size: 12px; font-family: inherit; outline: none; }
+        .edit-popup .field input:focus { border-color: rgba(255,120,50,0.4); }
+        .edit-popup .actions { display: flex; gap: 6px; margin-top: 10px; }
+        .edit-popup .actions button { flex: 1; padding: 8px; border: none; border-radius: 8px;
                                        font-size: 11px; font-weight: 600; cursor: pointer;
-                                       font-family: inherit; transition: all 0.2s; }}
-        .edit-popup .btn-save {{ background: #FF7832; color: #fff; }}
-        .edit-popup .btn-save:hover {{ background: #ff9050; }}
-        .edit-popup .btn-cancel {{ background: rgba(255,255,255,0.08); color: #888; }}
-        .edit-popup .btn-cancel:hover {{ background: rgba(255,255,255,0.15); color: #fff; }}
-        .edit-popup .btn-delete {{ background: rgba(220,50,50,0.15); color: #e55; flex: 0.6; }}
-        .edit-popup .btn-delete:hover {{ background: rgba(220,50,50,0.3); color: #ff6666; }}
-        .edit-popup select {{ flex: 1; padding: 6px 8px; background: rgba(0,0,0,0.3);
+                                       font-family: inherit; transition: all 0.2s; }
+        .edit-popup .btn-save { background: #FF7832; color: #fff; }
+        .edit-popup .btn-save:hover { background: #ff9050; }
+        .edit-popup .btn-cancel { background: rgba(255,255,255,0.08); color: #888; }
+        .edit-popup .btn-cancel:hover { background: rgba(255,255,255,0.15); color: #fff; }
+        .edit-popup .btn-delete { background: rgba(220,50,50,0.15); color: #e55; flex: 0.6; }
+        .edit-popup .btn-delete:hover { background: rgba(220,50,50,0.3); color: #ff6666; }
+        .edit-popup select { flex: 1; padding: 6px 8px; background: rgba(0,0,0,0.3);
                               border: 1px solid rgba(255,255,255,0.1); border-radius: 6px;
-                              color: #fff; font-size: 12px; font-family: inherit; outline: none; }}
-        .edit-popup select:focus {{ border-color: rgba(255,120,50,0.4); }}
-        .day-check {{ display: flex; align-items: center; gap: 8px; padding: 5px 8px;
+                              color: #fff; font-size: 12px; font-family: inherit; outline: none; }
+        .edit-popup select:focus { border-color: rgba(255,120,50,0.4); }
+        .day-check { display: flex; align-items: center; gap: 8px; padding: 5px 8px;
                       border-radius: 6px; cursor: pointer; font-size: 12px; color: #ccc;
-                      transition: background 0.15s; }}
-        .day-check:hover {{ background: rgba(255,255,255,0.05); }}
-        .day-check em {{ color: #666; font-style: normal; font-size: 10px; }}
-        .day-check input[type="checkbox"] {{ accent-color: #FF7832; width: 16px; height: 16px; cursor: pointer; }}
-        .day-check.all-check {{ border-bottom: 1px solid rgba(255,255,255,0.06);
-                                padding-bottom: 8px; margin-bottom: 4px; }}
-        .day-check.all-check span {{ font-weight: 600; color: #FF7832; }}
-        .edit-overlay {{ position: fixed; inset: 0; z-index: 199; background: rgba(0,0,0,0.5); }}
-        .save-edits-btn {{ display: none; padding: 6px 16px; border: none; border-radius: 8px;
+                      transition: background 0.15s; }
+        .day-check:hover { background: rgba(255,255,255,0.05); }
+        .day-check em { color: #666; font-style: normal; font-size: 10px; }
+        .day-check input[type="checkbox"] { accent-color: #FF7832; width: 16px; height: 16px; cursor: pointer; }
+        .day-check.all-check { border-bottom: 1px solid rgba(255,255,255,0.06);
+                                padding-bottom: 8px; margin-bottom: 4px; }
+        .day-check.all-check span { font-weight: 600; color: #FF7832; }
+        .edit-overlay { position: fixed; inset: 0; z-index: 199; background: rgba(0,0,0,0.5); }
+        .save-edits-btn { display: none; padding: 6px 16px; border: none; border-radius: 8px;
                            font-size: 12px; font-weight: 600; cursor: pointer; font-family: inherit;
-                           transition: all 0.2s; margin-left: 8px; }}
-        .save-edits-btn.dirty {{ display: inline-block; background: #FF7832; color: #fff;
-                                  animation: pulse-save 1.5s ease-in-out infinite; }}
-        .save-edits-btn.saving {{ background: #666; color: #fff; cursor: wait; }}
-        .save-edits-btn.saved {{ display: inline-block; background: #2a6e2a; color: #64dc3c; }}
-        .save-edits-btn.error {{ display: inline-block; background: #6e2a2a; color: #ff6666; }}
-        @keyframes pulse-save {{ 0%,100% {{ box-shadow: 0 0 4px rgba(255,120,50,0.3); }}
-                                 50% {{ box-shadow: 0 0 14px rgba(255,120,50,0.6); }} }}
-        .edit-status {{ font-size: 10px; color: #64dc3c; margin-left: auto; }}
+                           transition: all 0.2s; margin-left: 8px; }
+        .save-edits-btn.dirty { display: inline-block; background: #FF7832; color: #fff;
+                                  animation: pulse-save 1.5s ease-in-out infinite; }
+        .save-edits-btn.saving { background: #666; color: #fff; cursor: wait; }
+        .save-edits-btn.saved { display: inline-block; background: #2a6e2a; color: #64dc3c; }
+        .save-edits-btn.error { display: inline-block; background: #6e2a2a; color: #ff6666; }
+        @keyframes pulse-save { 0%,100% { box-shadow: 0 0 4px rgba(255,120,50,0.3); }
+                                 50% { box-shadow: 0 0 14px rgba(255,120,50,0.6); } }
+        .edit-status { font-size: 10px; color: #64dc3c; margin-left: auto; }
 
         /* ── Drag-resize handles ── */
-        .tl-bar.editable .drag-handle {{
+        #timeline.editing .drag-handle {
             position: absolute; top: 0; bottom: 0; width: 8px;
             cursor: ew-resize; z-index: 10; opacity: 0;
             transition: opacity 0.15s;
-        }}
-        .tl-bar.editable:hover .drag-handle,
-        .tl-bar.editable .drag-handle.active {{ opacity: 1; }}
-        .drag-handle.left {{ left: -2px; border-radius: 4px 0 0 4px; background: linear-gradient(90deg, rgba(255,120,50,0.7), transparent); }}
-        .drag-handle.right {{ right: -2px; border-radius: 0 4px 4px 0; background: linear-gradient(270deg, rgba(255,120,50,0.7), transparent); }}
-        .drag-handle::after {{
+        }
+        #timeline.editing .tl-bar:hover .drag-handle,
+        #timeline.editing .drag-handle.active { opacity: 1; }
+        .drag-handle.left { left: -2px; border-radius: 4px 0 0 4px; background: linear-gradient(90deg, rgba(255,120,50,0.7), transparent); }
+        .drag-handle.right { right: -2px; border-radius: 0 4px 4px 0; background: linear-gradient(270deg, rgba(255,120,50,0.7), transparent); }
+        .drag-handle::after {
             content: ''; position: absolute; top: 50%; transform: translateY(-50%);
             width: 2px; height: 12px; background: rgba(255,255,255,0.7); border-radius: 1px;
-        }}
-        .drag-handle.left::after {{ left: 2px; }}
-        .drag-handle.right::after {{ right: 2px; }}
-        .tl-bar-container {{ cursor: default; }}
-        .add-staff-row {{ display: flex; justify-content: center; padding: 8px 0; }}
-        .add-staff-btn {{ background: rgba(255,120,50,0.1); border: 1px dashed rgba(255,120,50,0.3);
+        }
+        .drag-handle.left::after { left: 2px; }
+        .drag-handle.right::after { right: 2px; }
+        .tl-bar-container { cursor: default; }
+        .add-staff-row { display: flex; justify-content: center; padding: 8px 0; }
+        .add-staff-btn { background: rgba(255,120,50,0.1); border: 1px dashed rgba(255,120,50,0.3);
                           color: #FF7832; font-size: 12px; font-weight: 600; padding: 6px 18px;
-                          border-radius: 8px; cursor: pointer; font-family: inherit; transition: all 0.2s; }}
-        .add-staff-btn:hover {{ background: rgba(255,120,50,0.2); border-color: #FF7832; }}
-        .del-staff {{ display: inline-block; margin-left: 4px; color: #e55; font-size: 14px;
+                          border-radius: 8px; cursor: pointer; font-family: inherit; transition: all 0.2s; }
+        .add-staff-btn:hover { background: rgba(255,120,50,0.2); border-color: #FF7832; }
+        .del-staff { display: inline-block; margin-left: 4px; color: #e55; font-size: 14px;
                       font-weight: 700; cursor: pointer; opacity: 0.5; transition: opacity 0.15s;
-                      line-height: 1; vertical-align: middle; }}
-        .del-staff:hover {{ opacity: 1; }}
-        .drag-tooltip {{
+                      line-height: 1; vertical-align: middle; }
+        .del-staff:hover { opacity: 1; }
+        .drag-tooltip {
             position: fixed; z-index: 300; padding: 3px 8px;
             background: #1a1a2e; border: 1px solid rgba(255,120,50,0.5);
             border-radius: 6px; font-size: 11px; font-weight: 600;
             color: #FF7832; pointer-events: none; white-space: nowrap;
             box-shadow: 0 4px 12px rgba(0,0,0,0.5);
-        }}
+        }
 
         /* ── Legend ── */
-        .legend {{ display: flex; flex-wrap: wrap; gap: 6px; justify-content: center;
-                   margin-bottom: 15px; }}
-        .legend-item {{ display: flex; align-items: center; gap: 4px; font-size: 10px;
+        .legend { display: flex; flex-wrap: wrap; gap: 6px; justify-content: center;
+                   margin-bottom: 15px; }
+        .legend-item { display: flex; align-items: center; gap: 4px; font-size: 10px;
                         color: #666; padding: 3px 8px; background: rgba(255,255,255,0.03);
-                        border-radius: 6px; }}
-        .legend-dot {{ width: 8px; height: 8px; border-radius: 50%; }}
+                        border-radius: 6px; }
+        .legend-dot { width: 8px; height: 8px; border-radius: 50%; }
 
         /* ── Desktop : planning agrandi ── */
-        @media (min-width: 900px) {{
-            body {{ padding: 24px 40px; }}
-            .container {{ max-width: 1100px; padding: 8px 18px; }}
-            h1 {{ font-size: 24px; letter-spacing: 2px; }}
-            .subtitle {{ font-size: 14px; }}
-            .dates {{ font-size: 16px; padding: 8px 20px; }}
-            .week-selector {{ gap: 8px; }}
-            .week-tab {{ font-size: 14px; padding: 10px 18px; }}
-            .view-toggle {{ max-width: 500px; margin-left: auto; margin-right: auto; }}
-            .view-btn {{ font-size: 14px; padding: 10px; }}
-            .day-tabs {{ gap: 6px; margin-bottom: 16px; }}
-            .day-tab {{ font-size: 13px; padding: 10px 14px; border-radius: 10px; }}
-            .timeline {{ margin-bottom: 28px; }}
-            .timeline-row {{ margin-bottom: 6px; }}
-            .tl-name {{ width: 130px; font-size: 13px; padding-right: 14px; }}
-            .tl-bar-container {{ height: 36px; border-radius: 7px; }}
-            .tl-bar {{ border-radius: 7px; font-size: 11px; border-left-width: 3px; }}
-            .tl-bar .bar-label {{ padding: 0 6px; }}
-            .time-marker {{ font-size: 12px; }}
-            .legend {{ gap: 10px; margin-bottom: 20px; }}
-            .legend-item {{ font-size: 12px; padding: 4px 10px; }}
-            .legend-dot {{ width: 10px; height: 10px; }}
-            .employee-list {{ gap: 8px; }}
-            .employee-btn {{ font-size: 15px; padding: 14px 18px; }}
-            .badge {{ font-size: 12px; padding: 4px 10px; }}
-            .modal {{ max-width: 650px; }}
-            .modal-header h2 {{ font-size: 18px; }}
-            .modal-event .ev-time {{ font-size: 13px; min-width: 100px; }}
-            .modal-event .ev-label {{ font-size: 14px; }}
-            .cal-chooser {{ max-width: 550px; }}
-        }}
-        @media (min-width: 1300px) {{
-            .container {{ max-width: 1400px; padding: 10px 24px; }}
-            .tl-name {{ width: 150px; font-size: 14px; }}
-            .tl-bar-container {{ height: 40px; }}
-            .tl-bar {{ font-size: 12px; }}
-            .time-marker {{ font-size: 13px; }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>Planning Urban 7D</h1>
-            <p class="subtitle">Semaine {week_num}</p>
-            <div class="dates">{date_range}</div>
-        </div>
-
-        <div class="week-selector">
-{week_tabs.rstrip()}
-        </div>
+        @media (min-width: 900px) {
+            body { padding: 24px 40px; }
+            .container { max-width: 1100px; padding: 8px 18px; }
+            h1 { font-size: 24px; letter-spacing: 2px; }
+            .subtitle { font-size: 14px; }
+            .dates { font-size: 16px; padding: 8px 20px; }
+            .week-selector { gap: 8px; }
+            .week-tab { font-size: 14px; padding: 10px 18px; }
+            .view-toggle { max-width: 500px; margin-left: auto; margin-right: auto; }
+            .view-btn { font-size: 14px; padding: 10px; }
+            .day-tabs { gap: 6px; margin-bottom: 16px; }
+            .day-tab { font-size: 13px; padding: 10px 14px; border-radius: 10px; }
+            .timeline { margin-bottom: 28px; }
+            .timeline-row { margin-bottom: 6px; }
+            .timeline-row + .timeline-row { contain-intrinsic-size: auto 36px; }
+            .tl-name { width: 130px; font-size: 13px; padding-right: 14px; }
+            .tl-bar-container { height: 36px; border-radius: 7px; }
+            .tl-bar { border-radius: 7px; font-size: 11px; border-left-width: 3px; }
+            .tl-bar .bar-label { padding: 0 6px; }
+            .time-marker { font-size: 12px; }
+            .legend { gap: 10px; margin-bottom: 20px; }
+            .legend-item { font-size: 12px; padding: 4px 10px; }
+            .legend-dot { width: 10px; height: 10px; }
+            .employee-list { gap: 8px; }
+            .employee-btn { font-size: 15px; padding: 14px 18px; }
+            .badge { font-size: 12px; padding: 4px 10px; }
+            .modal { max-width: 650px; }
+            .modal-header h2 { font-size: 18px; }
+            .modal-event .ev-time { font-size: 13px; min-width: 100px; }
+            .modal-event .ev-label { font-size: 14px; }
+            .cal-chooser { max-width: 550px; }
+        }
+        @media (min-width: 1300px) {
+            .container { max-width: 1400px; padding: 10px 24px; }
+            .tl-name { width: 150px; font-size: 14px; }
+            .tl-bar-container { height: 40px; }
+            .timeline-row + .timeline-row { contain-intrinsic-size: auto 40px; }
+            .tl-bar { font-size: 12px; }
+            .time-marker { font-size: 13px; }
+        }
+"""
 
-        <div class="week-notes" id="week-notes"></div>
 
-        <div class="view-toggle">
-            <button class="view-btn active" data-view="day">Vue quotidienne</button>
-            <button class="view-btn" data-view="staff">Vue hebdo par staff</button>
-        </div>
+def _bar_color_rule(selector, c):
+    return (f"        {selector} {{ background: {c['bg']}; border-color: {c['border']}; "
+            f"color: {c['text']}; --glow-color: {c['border']};\n"
+            f"            box-shadow: inset 0 0 8px rgba(255,255,255,0.05), 0 0 4px {c['border']}40; }}\n")
 
-        <!-- ── Vue Journée (timeline) ── -->
-        <div id="view-day">
-            <div class="day-tabs" id="day-tabs"></div>
-            <div class="legend" id="legend"></div>
-            <div class="timeline" id="timeline"></div>
-        </div>
 
-        <!-- ── Vue Staff (liste) ── -->
-        <div id="view-staff" style="display:none;">
-            <div class="employee-list">
-{employee_buttons.rstrip()}
-            </div>
-        </div>
-    </div>
+# Couleurs des barres de la timeline : une règle par code (attribut data-code),
+# seules left/width restent en style inline. Placées après les règles :hover, avec
+# une spécificité au moins égale à .tl-bar:hover (toute barre porte data-code) :
+# comme l'ancien style inline, le survol n'ajoute que filter/z-index, pour tous les codes.
+_BAR_COLORS_CSS = "        /* ── Couleurs des barres par code ── */\n" + _bar_color_rule(".tl-bar[data-code]", DEFAULT_COLOR) + "".join(
+    _bar_color_rule(f".tl-bar[data-code={json.dumps(code)}]", c) for code, c in CODE_COLORS.items()
+)
 
-    <!-- ── Modal preview individuelle ── -->
-    <div class="modal-overlay" id="modal">
-        <div class="modal">
-            <div class="modal-header">
-                <h2 id="modal-name"></h2>
-                <div style="display:flex;align-items:center;gap:8px;">
-                    <button class="subscribe-btn" id="modal-subscribe" style="padding:6px 14px;font-size:11px;">
-                        S'abonner
-                    </button>
-                    <button class="modal-close" id="modal-close">&times;</button>
-                </div>
-            </div>
-            <div class="modal-body" id="modal-body"></div>
-        </div>
-    </div>
-
-    <!-- ── Choix application calendrier ── -->
-    <div class="cal-chooser-overlay" id="cal-chooser">
-        <div class="cal-chooser">
-            <h3>Ajouter au calendrier</h3>
-            <div class="cal-sub" id="cal-chooser-name"></div>
-            <a class="cal-option" id="cal-google" target="_blank" rel="noopener">
-                <span class="cal-icon">G</span>
-                <div class="cal-info">
-                    <div class="cal-name">Google Agenda</div>
-                    <div class="cal-desc">S'abonner via Google Calendar (Android, Web)</div>
-                </div>
-            </a>
-            <a class="cal-option" id="cal-apple">
-                <span class="cal-icon">A</span>
-                <div class="cal-info">
-                    <div class="cal-name">Apple Calendar</div>
-                    <div class="cal-desc">iPhone, iPad, Mac</div>
-                </div>
-            </a>
-            <a class="cal-option" id="cal-outlook" target="_blank" rel="noopener">
-                <span class="cal-icon">O</span>
-                <div class="cal-info">
-                    <div class="cal-name">Outlook</div>
-                    <div class="cal-desc">Outlook.com / Office 365</div>
-                </div>
-            </a>
-            <a class="cal-option" id="cal-download">
-                <span class="cal-icon">+</span>
-                <div class="cal-info">
-                    <div class="cal-name">Autre / Télécharger .ics</div>
-                    <div class="cal-desc">Télécharger et ouvrir manuellement</div>
-                </div>
-            </a>
-            <div class="cal-option" id="cal-copy" style="cursor:pointer;">
-                <span class="cal-icon">~</span>
-                <div class="cal-info">
-                    <div class="cal-name">Copier le lien</div>
-                    <div class="cal-desc">Pour coller dans Google Agenda > Paramètres > Ajouter par URL</div>
-                </div>
-            </div>
-            <button class="cal-chooser-cancel" id="cal-cancel">Annuler</button>
-        </div>
-    </div>
-
-    <script>
-    (function() {{
-        var NOTES_DATA = {notes_json};
-        // Nettoyage des anciennes données localStorage (source de désync entre appareils)
-        try {{ localStorage.removeItem('planning-notes-S{week_num}'); }} catch(e) {{}}
-        var DATA = {events_json};
-        // Nettoyage des anciennes données localStorage
-        try {{ localStorage.removeItem('planning-edits-S{week_num}'); }} catch(e) {{}}
-        var COLORS = {colors_json};
-        var DEFAULT_C = {default_color_json};
-        var DAYS = {day_labels_json};
-        var DAYS_FULL = {day_labels_full_json};
-        var WEEK_DATES = {week_dates_json};
+_PAGE_SCRIPT = """\
+        var JOURS = Object.freeze(['Dimanche','Lundi','Mardi','Mercredi','Jeudi','Vendredi','Samedi']);
+        var JOURS_COURTS = Object.freeze(['Dim','Lun','Mar','Mer','Jeu','Ven','Sam']);
+        var MOIS = Object.freeze(['janvier','f\u00e9vrier','mars','avril','mai','juin','juillet','ao\u00fbt','septembre','octobre','novembre','d\u00e9cembre']);
         var currentDay = 0;
-        (function() {{
+        (function() {
             var now = new Date();
             var today = now.getFullYear() + '-' + String(now.getMonth()+1).padStart(2,'0') + '-' + String(now.getDate()).padStart(2,'0');
             var idx = WEEK_DATES.indexOf(today);
             if (idx !== -1) currentDay = idx;
-        }})();
+        })();
         var currentView = 'day';
 
-        function getColor(code) {{ return COLORS[code] || DEFAULT_C; }}
-        function getFirstName(n) {{ var p=n.split(' '); for(var i=0;i<p.length;i++){{ if(p[i]!==p[i].toUpperCase()) return p.slice(i).join(' '); }} return p[p.length-1]; }}
+        // Une seule référence par code, figée : getColor n'alloue rien et les
+        // caches de styles (clés = code) restent valides
+        Object.keys(COLORS).forEach(function(k) { Object.freeze(COLORS[k]); });
+        Object.freeze(DEFAULT_C);
+        function getColor(code) { return COLORS[code] || DEFAULT_C; }
+        var _bgCache = {};
+        function bgFor(code) {
+            if (!_bgCache[code]) {
+                var c = getColor(code);
+                _bgCache[code] = 'background:' + c.bg + ';border-color:' + c.border + ';box-shadow:0 0 8px ' + c.border + '30;';
+            }
+            return _bgCache[code];
+        }
+        var _ESC_HTML = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+        function escHtml(str) {
+            return String(str).replace(/[&<>"']/g, function(ch) { return _ESC_HTML[ch]; });
+        }
+        function getFirstName(n) { var p=n.split(' '); for(var i=0;i<p.length;i++){ if(p[i]!==p[i].toUpperCase()) return p.slice(i).join(' '); } return p[p.length-1]; }
+
+        // ── Index des créneaux par jour ──
+        // Les champs dérivés sont préfixés par "_" et retirés à la publication.
+        function prepEvent(ev) {
+            ev._color = getColor(ev.code);
+            ev._ics = null;
+            ev._codeH = escHtml(ev.code);
+            ev._labelH = escHtml(ev.label);
+            // Heures lues directement dans la chaîne locale « AAAA-MM-JJTHH:MM » (sans Date) ;
+            // « 24:00 » (accepté par Date) vaut minuit
+            var sH = +ev.start.substr(11, 2) % 24, sM = +ev.start.substr(14, 2);
+            var eH = +ev.end.substr(11, 2) % 24, eM = +ev.end.substr(14, 2);
+            ev._startHM = pad2(sH) + ':' + pad2(sM);
+            ev._endHM = pad2(eH) + ':' + pad2(eM);
+            ev._sh = sH + sM / 60;
+            var eh = eH + eM / 60;
+            ev._eh = eh <= ev._sh ? 24 : eh;
+            // Instants locaux (ms) pour les durées et l'export, sans analyse de chaîne
+            ev._sMs = localMs(ev.start);
+            ev._eMs = localMs(ev.end);
+        }
+        function localMs(iso) {
+            return new Date(+iso.substr(0, 4), +iso.substr(5, 2) - 1, +iso.substr(8, 2),
+                            +iso.substr(11, 2), +iso.substr(14, 2)).getTime();
+        }
+        function indexEvents(emp) {
+            var byDay = [[], [], [], [], [], [], []];
+            for (var i = 0; i < emp.events.length; i++) {
+                prepEvent(emp.events[i]);
+                byDay[emp.events[i].day].push(emp.events[i]);
+            }
+            emp._eventsByDay = byDay;
+            // Les créneaux ont changé : données par jour à recalculer
+            dayCache = [];
+        }
+        // Données d'un jour pour la timeline : créneaux, regroupement par employé,
+        // codes et plage horaire brute {minH, maxH}. Calculées une fois puis mises
+        // en cache ; vidées par indexEvents et les chemins d'édition.
+        var dayCache = [];
+        function dayData(day) {
+            if (dayCache[day]) return dayCache[day];
+            var entries = [], codes = [], byName = {}, nameOrder = [];
+            var minH = 24, maxH = 0;
+            var empNames = Object.keys(DATA);
+            for (var ni = 0; ni < empNames.length; ni++) {
+                var name = empNames[ni];
+                if (name === '_codeNames') continue;
+                var list = DATA[name]._eventsByDay[day];
+                if (!list.length) continue;
+                var rowEntries = byName[name] = [];
+                nameOrder.push(name);
+                for (var li = 0; li < list.length; li++) {
+                    var entry = dayEntry(name, list[li]);
+                    entries.push(entry);
+                    rowEntries.push(entry);
+                    codes.push(list[li].code);
+                    if (entry.sh < minH) minH = entry.sh;
+                    if (entry.eh > maxH) maxH = entry.eh;
+                }
+            }
+            return (dayCache[day] = { entries: entries, byName: byName, nameOrder: nameOrder,
+                                      codes: codes, minH: minH, maxH: maxH });
+        }
+        Object.keys(DATA).forEach(function(n) { if (n !== '_codeNames') indexEvents(DATA[n]); });
 
         // ── Replacement matching ──
-        function getReplacements() {{
+        function getReplacements() {
             return (notesWork && notesWork.replacements) || [];
-        }}
-        function getReplacementStatus(fullName, dateStr, startH, endH) {{
+        }
+        function getReplacementStatus(fullName, dateStr, startH, endH) {
             var repls = getReplacements();
-            for (var i = 0; i < repls.length; i++) {{
+            for (var i = 0; i < repls.length; i++) {
                 var r = repls[i];
                 if (r.date !== dateStr) continue;
                 var rStart = parseFloat(r.start.split(':')[0]) + parseFloat(r.start.split(':')[1] || 0) / 60;
                 var rEnd = parseFloat(r.end.split(':')[0]) + parseFloat(r.end.split(':')[1] || 0) / 60;
                 // Check overlap: bar overlaps with replacement window
-                if (startH < rEnd && endH > rStart) {{
-                    if (fullName === r.out) return {{status: 'out', other: r['in']}};
-                    if (fullName === r['in']) return {{status: 'in', other: r.out}};
-                }}
-            }}
+                if (startH < rEnd && endH > rStart) {
+                    if (fullName === r.out) return {status: 'out', other: r['in']};
+                    if (fullName === r['in']) return {status: 'in', other: r.out};
+                }
+            }
             return null;
-        }}
+        }
 
         // ── Day tabs ──
+        // Onglets construits hors du DOM puis insérés en une fois ; gardés pour selectDay
         var dayTabsEl = document.getElementById('day-tabs');
-        DAYS.forEach(function(label, i) {{
+        var dayTabs = [];
+        var dayTabsFrag = document.createDocumentFragment();
+        DAYS.forEach(function(label, i) {
             var btn = document.createElement('div');
             btn.className = 'day-tab' + (i === currentDay ? ' active' : '');
             btn.textContent = label;
-            btn.onclick = function() {{ selectDay(i); }};
-            dayTabsEl.appendChild(btn);
-        }});
+            btn.onclick = function() { selectDay(i); };
+            dayTabs.push(btn);
+            dayTabsFrag.appendChild(btn);
+        });
+        dayTabsEl.appendChild(dayTabsFrag);
 
-        function selectDay(i) {{
+        function selectDay(i) {
             currentDay = i;
-            dayTabsEl.querySelectorAll('.day-tab').forEach(function(t, j) {{
-                t.classList.toggle('active', j === i);
-            }});
+            for (var j = 0; j < dayTabs.length; j++) {
+                dayTabs[j].classList.toggle('active', j === i);
+            }
+            scheduleRender();
+        }
+
+        // Un seul rendu par frame : des clics rapprochés n'affichent que le dernier jour
+        var _renderPending = false;
+        function scheduleRender() {
+            if (_renderPending) return;
+            _renderPending = true;
+            requestAnimationFrame(function() {
+                _renderPending = false;
+                showDay();
+            });
+        }
+
+        // Timelines déjà construites, par jour : revenir sur un onglet réattache les
+        // nœuds (timeline + légende) sans reconstruction. Tout autre rendu (édition,
+        // notes, mode édition) passe par renderTimeline et vide le cache.
+        var dayPanels = [];
+        var _keepPanels = false;
+        function todayStr() {
+            var d = new Date();
+            return d.getFullYear() + '-' + String(d.getMonth()+1).padStart(2,'0') + '-' + String(d.getDate()).padStart(2,'0');
+        }
+        function showDay() {
+            var tl = document.getElementById('timeline');
+            var legendEl = document.getElementById('legend');
+            var panel = dayPanels[currentDay];
+            if (panel) {
+                tl.replaceChildren.apply(tl, panel.timeline);
+                legendEl.replaceChildren.apply(legendEl, panel.legend);
+                return;
+            }
+            _keepPanels = true;
             renderTimeline();
-        }}
+            _keepPanels = false;
+            // Le jour courant est toujours reconstruit (ligne « maintenant », recentrage)
+            if (tl.querySelector('.tl-now-line')) return;
+            dayPanels[currentDay] = {
+                timeline: Array.prototype.slice.call(tl.childNodes),
+                legend: Array.prototype.slice.call(legendEl.childNodes)
+            };
+        }
+        window.addEventListener('resize', function() { dayPanels = []; }, { passive: true });
 
         // Scroll active day tab into view
-        setTimeout(function() {{
-            var activeTab = dayTabsEl.querySelector('.day-tab.active');
-            if (activeTab) activeTab.scrollIntoView({{ inline: 'center', block: 'nearest' }});
-        }}, 0);
+        setTimeout(function() {
+            var activeTab = dayTabs[currentDay];
+            if (activeTab) activeTab.scrollIntoView({ inline: 'center', block: 'nearest' });
+        }, 0);
 
         // ── Legend ── Build code-to-label map from all events
-        var CODE_LABELS = {{}};
-        Object.keys(DATA).forEach(function(n) {{
+        var CODE_LABELS = {};
+        Object.keys(DATA).forEach(function(n) {
             if (n === '_codeNames') return;
-            DATA[n].events.forEach(function(ev) {{
+            DATA[n].events.forEach(function(ev) {
                 if (ev.label && ev.label !== ev.code) CODE_LABELS[ev.code] = ev.label;
-            }});
-        }});
-        function renderLegend(codes) {{
-            var el = document.getElementById('legend');
-            el.innerHTML = '';
-            var seen = {{}};
-            codes.forEach(function(code) {{
-                if (seen[code]) return;
-                seen[code] = true;
+            });
+        });
+        // Élément de légende pré-assemblé par code (couleurs et libellés fixes)
+        var _legendItemCache = {};
+        function legendItemFor(code) {
+            if (!_legendItemCache[code]) {
                 var c = getColor(code);
-                var item = document.createElement('div');
-                item.className = 'legend-item';
                 var displayName = CODE_LABELS[code] || (DATA._codeNames && DATA._codeNames[code]) || code;
-                item.innerHTML = '<div class="legend-dot" style="background:' + c.border +
-                    ';box-shadow:0 0 6px ' + c.border + '"></div>' + displayName;
-                el.appendChild(item);
-            }});
-        }}
+                _legendItemCache[code] = '<div class="legend-item"><div class="legend-dot" style="background:' + c.border +
+                    ';box-shadow:0 0 6px ' + c.border + '"></div>' + displayName + '</div>';
+            }
+            return _legendItemCache[code];
+        }
+        function renderLegend(codes) {
+            var html = '';
+            var seen = {};
+            codes.forEach(function(code) {
+                if (seen[code]) return;
+                seen[code] = true;
+                html += legendItemFor(code);
+            });
+            document.getElementById('legend').innerHTML = html;
+        }
 
         // ── Timeline rendering ──
-        function renderTimeline() {{
+        // Heures décimales et libellé horaire calculés une fois par créneau affiché
+        function dayEntry(name, ev) {
+            return { name: name, ev: ev, sh: ev._sh, eh: ev._eh, timeStr: ev._startHM + ' - ' + ev._endHM,
+                     posMin: null, posRange: 0, pos: '' };
+        }
+        // Ligne type (nom + conteneur de barres), clonée pour chaque employé
+        var _rowProto = document.createElement('div');
+        _rowProto.className = 'timeline-row';
+        _rowProto.innerHTML = '<div class="tl-name"></div><div class="tl-bar-container"></div>';
+        // Clic sur un nom délégué au conteneur : aucun handler par ligne à recréer à chaque rendu
+        document.getElementById('timeline').addEventListener('click', function(e) {
+            var nameEl = e.target.closest('.tl-name');
+            if (nameEl) openModal(nameEl.title);
+        });
+        function renderTimeline() {
+            if (!_keepPanels) dayPanels = [];
             var tl = document.getElementById('timeline');
-            tl.innerHTML = '';
             var dateStr = WEEK_DATES[currentDay] || '';
 
-            // Collect events for this day
-            var dayEvents = [];
-            var allCodes = [];
-            Object.keys(DATA).forEach(function(name) {{
-                if (name === '_codeNames') return;
-                var emp = DATA[name];
-                emp.events.forEach(function(ev) {{
-                    if (ev.day === currentDay) {{
-                        dayEvents.push({{ name: name, ev: ev }});
-                        allCodes.push(ev.code);
-                    }}
-                }});
-            }});
+            // Créneaux du jour déjà collectés et regroupés (cache par jour)
+            var base = dayData(currentDay);
 
             // Inject virtual events for replacers not already present this day
-            var dayRepls = getReplacements().filter(function(r) {{ return r.date === dateStr; }});
-            dayRepls.forEach(function(r) {{
+            // (gardés à part : le cache du jour n'est jamais modifié)
+            var synthEntries = [];
+            var synthByName = {};
+            var synthNames = [];
+            var dayRepls = getReplacements().filter(function(r) { return r.date === dateStr; });
+            dayRepls.forEach(function(r) {
                 var replacerName = r['in'];
                 if (!replacerName || !DATA[replacerName]) return;
                 // Check if replacer already has events this day
-                var hasEvents = dayEvents.some(function(d) {{ return d.name === replacerName; }});
+                var hasEvents = !!(base.byName[replacerName] || synthByName[replacerName]);
                 // Find the replaced person's event(s) overlapping the replacement window to get code/label
                 var rStart = parseFloat(r.start.split(':')[0]) + parseFloat(r.start.split(':')[1] || 0) / 60;
                 var rEnd = parseFloat(r.end.split(':')[0]) + parseFloat(r.end.split(':')[1] || 0) / 60;
                 var outName = r.out;
                 var refCode = 'VDC';
                 var refLabel = 'Vie de centre';
-                if (outName && DATA[outName]) {{
-                    DATA[outName].events.forEach(function(ev) {{
-                        if (ev.day !== currentDay) return;
-                        var s2 = new Date(ev.start);
-                        var e2 = new Date(ev.end);
-                        var sh2 = s2.getHours() + s2.getMinutes()/60;
-                        var eh2 = e2.getHours() + e2.getMinutes()/60;
-                        if (eh2 <= sh2) eh2 = 24;
-                        if (sh2 < rEnd && eh2 > rStart) {{
+                if (outName && DATA[outName]) {
+                    DATA[outName]._eventsByDay[currentDay].forEach(function(ev) {
+                        if (ev._sh < rEnd && ev._eh > rStart) {
                             refCode = ev.code;
                             refLabel = ev.label;
-                        }}
-                    }});
-                }}
-                if (!hasEvents) {{
+                        }
+                    });
+                }
+                if (!hasEvents) {
                     // Build synthetic ISO dates for the replacement window
                     var synthStart = dateStr + 'T' + r.start.split(':')[0].padStart(2,'0') + ':' + (r.start.split(':')[1] || '00').padStart(2,'0');
                     var synthEnd = dateStr + 'T' + r.end.split(':')[0].padStart(2,'0') + ':' + (r.end.split(':')[1] || '00').padStart(2,'0');
-                    var synthEv = {{
+                    var synthEv = {
                         code: refCode,
                         label: refLabel,
                         start: synthStart,
                         end: synthEnd,
                         day: currentDay,
                         _synthetic: true
-                    }};
-                    dayEvents.push({{ name: replacerName, ev: synthEv }});
-                    allCodes.push(refCode);
-                }}
-            }});
-
-            if (dayEvents.length === 0) {{
+                    };
+                    prepEvent(synthEv);
+                    var synthEntry = dayEntry(replacerName, synthEv);
+                    synthEntries.push(synthEntry);
+                    synthByName[replacerName] = [synthEntry];
+                    synthNames.push(replacerName);
+                }
+            });
+
+            if (base.entries.length === 0 && synthEntries.length === 0) {
                 tl.innerHTML = '<div class="no-events">Aucun cr\u00e9neau ce jour</div>';
                 renderLegend([]);
                 return;
-            }}
+            }
 
+            var allCodes = base.codes;
+            var nameOrder = base.nameOrder;
+            if (synthEntries.length) {
+                allCodes = allCodes.concat(synthEntries.map(function(d) { return d.ev.code; }));
+                nameOrder = nameOrder.concat(synthNames);
+            }
             renderLegend(allCodes);
 
             // Add replacement legend if any replacements exist for this day
-            var dayRepls = getReplacements().filter(function(r) {{ return r.date === dateStr; }});
-            if (dayRepls.length > 0) {{
+            var dayRepls = getReplacements().filter(function(r) { return r.date === dateStr; });
+            if (dayRepls.length > 0) {
                 var legendEl = document.getElementById('legend');
                 var replOut = document.createElement('div');
                 replOut.className = 'legend-item';
                 replOut.innerHTML = '<div class="legend-dot" style="background:repeating-linear-gradient(45deg,transparent,transparent 2px,rgba(255,60,60,0.5) 2px,rgba(255,60,60,0.5) 3px);border:1px solid #ff3c3c"></div>Remplac\u00e9(e)';
-                legendEl.appendChild(replOut);
                 var replIn = document.createElement('div');
                 replIn.className = 'legend-item';
                 replIn.innerHTML = '<div class="legend-dot" style="background:repeating-linear-gradient(45deg,transparent,transparent 2px,rgba(60,220,80,0.5) 2px,rgba(60,220,80,0.5) 3px);border:1px solid #3cdc50"></div>Rempla\u00e7ant(e)';
-                legendEl.appendChild(replIn);
-            }}
+                legendEl.append(replOut, replIn);
+            }
 
             // Scrollable inner wrapper
             var inner = document.createElement('div');
             inner.className = 'timeline-inner';
 
-            // Find time range
-            var minH = 24, maxH = 0;
-            dayEvents.forEach(function(d) {{
-                var s = new Date(d.ev.start);
-                var e = new Date(d.ev.end);
-                var sh = s.getHours() + s.getMinutes()/60;
-                var eh = e.getHours() + e.getMinutes()/60;
-                if (eh <= sh) eh = 24;
-                if (sh < minH) minH = sh;
-                if (eh > maxH) maxH = eh;
-            }});
+            // Find time range : plage en cache, élargie aux seuls créneaux virtuels
+            var minH = base.minH, maxH = base.maxH;
+            for (var si = 0; si < synthEntries.length; si++) {
+                if (synthEntries[si].sh < minH) minH = synthEntries[si].sh;
+                if (synthEntries[si].eh > maxH) maxH = synthEntries[si].eh;
+            }
             minH = Math.floor(minH);
             maxH = Math.ceil(maxH);
             if (maxH <= minH) maxH = minH + 1;
@@ -1285,16 +1385,13 @@ def generate_html(week_employees, week_num, year, all_weeks):
             var nameW = isDesktop ? 150 : 70;
             inner.style.minWidth = (nameW + range * pxPerHour) + 'px';
 
-            // Grid line positions for bar containers
-            var gridLines = [];
-            for (var gh = minH; gh <= maxH; gh++) {{
-                var pos = ((gh - minH) / range) * 100;
-                gridLines.push({{ pos: pos, cls: 'hour' }});
-                if (gh < maxH) {{
-                    var halfPos = ((gh + 0.5 - minH) / range) * 100;
-                    gridLines.push({{ pos: halfPos, cls: 'half' }});
-                }}
-            }}
+            // Ligne « maintenant » (jour courant) calculée avant la construction :
+            // insérée avec les barres, aucune écriture après l'attachement au DOM
+            var _now = new Date();
+            var currentH = _now.getHours() + _now.getMinutes() / 60;
+            var showNow = WEEK_DATES[currentDay] === todayStr() && currentH >= minH && currentH <= maxH;
+            var nowPct = ((currentH - minH) / range) * 100;
+            var nowLineHtml = showNow ? '<div class="tl-now-line" style="left:' + nowPct + '%"></div>' : '';
 
             // Time markers
             var markerRow = document.createElement('div');
@@ -1302,188 +1399,178 @@ def generate_html(week_employees, week_num, year, all_weeks):
             var markerSpacer = document.createElement('div');
             markerSpacer.className = 'tl-name';
             markerSpacer.innerHTML = '&nbsp;';
-            markerRow.appendChild(markerSpacer);
             var markers = document.createElement('div');
             markers.className = 'time-markers';
             markers.style.flex = '1';
-            for (var h = minH; h <= maxH; h++) {{
+            var markerSpans = [];
+            for (var h = minH; h <= maxH; h++) {
                 var m = document.createElement('span');
                 m.className = 'time-marker';
                 m.textContent = h + 'h';
-                markers.appendChild(m);
-            }}
-            markerRow.appendChild(markers);
+                markerSpans.push(m);
+            }
+            if (showNow) {
+                // Draw now-line on time markers row
+                markers.style.position = 'relative';
+                var nm = document.createElement('div');
+                nm.className = 'tl-now-marker';
+                nm.style.left = nowPct + '%';
+                markerSpans.push(nm);
+            }
+            markers.append.apply(markers, markerSpans);
+            markerRow.append(markerSpacer, markers);
             inner.appendChild(markerRow);
 
-            // Group by employee
-            var byName = {{}};
-            var nameOrder = [];
-            dayEvents.forEach(function(d) {{
-                if (!byName[d.name]) {{ byName[d.name] = []; nameOrder.push(d.name); }}
-                byName[d.name].push(d.ev);
-            }});
+            // Lignes et barres assemblées hors du DOM, insérées en une fois
+            var rowsFrag = document.createDocumentFragment();
+            nameOrder.forEach(function(name) {
+                var row = _rowProto.cloneNode(true);
+                var nameEl = row.firstElementChild;
+                var barContainer = row.lastElementChild;
 
-            nameOrder.forEach(function(name) {{
-                var row = document.createElement('div');
-                row.className = 'timeline-row';
-
-                var nameEl = document.createElement('div');
-                nameEl.className = 'tl-name';
                 nameEl.textContent = getFirstName(name);
                 nameEl.title = name;
-                nameEl.onclick = function() {{ openModal(name); }};
-                row.appendChild(nameEl);
 
-                var barContainer = document.createElement('div');
-                barContainer.className = 'tl-bar-container';
                 barContainer.dataset.minH = minH;
                 barContainer.dataset.range = range;
-
-                // Add grid lines
-                gridLines.forEach(function(gl) {{
-                    var line = document.createElement('div');
-                    line.className = 'tl-grid-line ' + gl.cls;
-                    line.style.left = gl.pos + '%';
-                    barContainer.appendChild(line);
-                }});
-
-                byName[name].forEach(function(ev) {{
-                    var s = new Date(ev.start);
-                    var e = new Date(ev.end);
-                    var sh = s.getHours() + s.getMinutes()/60;
-                    var eh = e.getHours() + e.getMinutes()/60;
-                    if (eh <= sh) eh = 24;
-
-                    var left = ((sh - minH) / range) * 100;
-                    var width = ((eh - sh) / range) * 100;
-                    if (left < 0) left = 0;
-                    if (left + width > 100) width = 100 - left;
-
-                    var c = getColor(ev.code);
-                    var bar = document.createElement('div');
-                    bar.className = 'tl-bar';
+                barContainer.style.setProperty('--hours', range);
+
+                // Barres de la ligne écrites en une seule chaîne HTML
+                var barsHtml = '';
+                var rowEvents = base.byName[name] || synthByName[name];
+                for (var bi = 0; bi < rowEvents.length; bi++) {
+                    var d = rowEvents[bi];
+                    var ev = d.ev, sh = d.sh, eh = d.eh;
+
+                    // Position calculée une fois par échelle (minH, range) et gardée sur l'entrée
+                    if (d.posMin !== minH || d.posRange !== range) {
+                        var left = ((sh - minH) / range) * 100;
+                        var width = ((eh - sh) / range) * 100;
+                        if (left < 0) left = 0;
+                        if (left + width > 100) width = 100 - left;
+                        d.posMin = minH; d.posRange = range;
+                        d.pos = 'left:' + left + '%;width:' + width + '%';
+                    }
+
+                    var cls = 'tl-bar';
 
                     // Check replacement status for this bar
                     var replInfo = getReplacementStatus(name, dateStr, sh, eh);
-                    if (replInfo && replInfo.status === 'out') bar.className += ' replaced';
-                    if (replInfo && replInfo.status === 'in') bar.className += ' replacer';
-
-                    bar.style.cssText = 'left:' + left + '%;width:' + width + '%;' +
-                        'background:' + c.bg + ';border-color:' + c.border + ';color:' + c.text +
-                        ';--glow-color:' + c.border + ';' +
-                        'box-shadow:inset 0 0 8px rgba(255,255,255,0.05), 0 0 4px ' + c.border + '40;';
-                    bar.innerHTML = '<span class="bar-label">' + ev.code + '</span>';
-                    var timeStr = s.getHours().toString().padStart(2,'0') + ':' + s.getMinutes().toString().padStart(2,'0') +
-                        ' - ' + e.getHours().toString().padStart(2,'0') + ':' + e.getMinutes().toString().padStart(2,'0');
-                    bar.title = ev.label + '\\n' + timeStr;
-                    if (replInfo && replInfo.status === 'out') bar.title += '\\nRemplacé par ' + getFirstName(replInfo.other);
-                    if (replInfo && replInfo.status === 'in') bar.title += '\\nRemplace ' + getFirstName(replInfo.other);
-                    barContainer.appendChild(bar);
-                }});
-
-                row.appendChild(barContainer);
-                inner.appendChild(row);
-            }});
-
-            tl.appendChild(inner);
-
-            // Auto-scroll to current hour if viewing today + draw now-line
-            var _now = new Date();
-            var _today = _now.getFullYear() + '-' + String(_now.getMonth()+1).padStart(2,'0') + '-' + String(_now.getDate()).padStart(2,'0');
-            if (WEEK_DATES[currentDay] === _today) {{
-                var currentH = _now.getHours() + _now.getMinutes() / 60;
-                if (currentH >= minH && currentH <= maxH) {{
-                    // Draw now-line on each bar container
-                    var nowPct = ((currentH - minH) / range) * 100;
-                    inner.querySelectorAll('.tl-bar-container').forEach(function(bc) {{
-                        var nl = document.createElement('div');
-                        nl.className = 'tl-now-line';
-                        nl.style.left = nowPct + '%';
-                        bc.appendChild(nl);
-                    }});
-                    // Draw now-line on time markers row
-                    var tmRow = inner.querySelector('.time-markers');
-                    if (tmRow) {{
-                        tmRow.style.position = 'relative';
-                        var nm = document.createElement('div');
-                        nm.className = 'tl-now-marker';
-                        nm.style.left = nowPct + '%';
-                        tmRow.appendChild(nm);
-                    }}
-
-                    setTimeout(function() {{
-                        var scrollPct = (currentH - minH) / range;
-                        var nameColWidth = 70;
-                        var scrollableWidth = inner.scrollWidth - nameColWidth;
-                        var scrollTarget = nameColWidth + scrollPct * scrollableWidth - tl.clientWidth / 2;
-                        tl.scrollLeft = Math.max(0, scrollTarget);
-                    }}, 0);
-                }}
-            }}
-        }}
-
-        // Auto-update now-line every 60 seconds
-        setInterval(function() {{
-            var view = document.getElementById('view-day');
-            if (view && view.style.display !== 'none') {{
-                renderTimeline();
-            }}
-        }}, 60000);
+                    if (replInfo && replInfo.status === 'out') cls += ' replaced';
+                    if (replInfo && replInfo.status === 'in') cls += ' replacer';
+
+                    // Libellé et code déjà échappés par prepEvent ; l'horaire n'a rien à échapper
+                    var title = ev._labelH + '\\n' + d.timeStr;
+                    if (replInfo && replInfo.status === 'out') title += '\\nRemplacé par ' + escHtml(getFirstName(replInfo.other));
+                    if (replInfo && replInfo.status === 'in') title += '\\nRemplace ' + escHtml(getFirstName(replInfo.other));
+                    barsHtml += '<div class="' + cls + '" data-code="' + ev._codeH +
+                        '" style="' + d.pos + '" title="' + title + '">' +
+                        '<span class="bar-label">' + ev._codeH + '</span></div>';
+                }
+                barContainer.insertAdjacentHTML('beforeend', barsHtml + nowLineHtml);
+                rowsFrag.appendChild(row);
+            });
+            inner.appendChild(rowsFrag);
+
+            // Ancienne grille remplacée en une seule mutation (pas de vidage préalable)
+            tl.replaceChildren(inner);
+
+            // Auto-scroll to current hour if viewing today (lectures puis une écriture)
+            if (showNow) {
+                setTimeout(function() {
+                    var scrollPct = (currentH - minH) / range;
+                    var nameColWidth = 70;
+                    var scrollableWidth = inner.scrollWidth - nameColWidth;
+                    var scrollTarget = nameColWidth + scrollPct * scrollableWidth - tl.clientWidth / 2;
+                    tl.scrollLeft = Math.max(0, scrollTarget);
+                }, 0);
+            }
+        }
+
+        // Auto-update now-line every 60 seconds : seul le jour courant est reconstruit,
+        // les timelines des autres jours restent en cache
+        setInterval(function() {
+            if (viewDayEl.style.display === 'none' || WEEK_DATES[currentDay] !== todayStr()) return;
+            dayPanels[currentDay] = null;
+            showDay();
+        }, 60000);
 
-        function pad2(n) {{ return n.toString().padStart(2, '0'); }}
+        function pad2(n) { return n.toString().padStart(2, '0'); }
 
-        function toICSDate(dt) {{
+        function toICSDate(dt) {
             return dt.getFullYear().toString() +
                 pad2(dt.getMonth() + 1) + pad2(dt.getDate()) + 'T' +
                 pad2(dt.getHours()) + pad2(dt.getMinutes()) + '00';
-        }}
-
-        function icsEscape(str) {{
-            return str.replace(/\\\\/g, '\\\\\\\\').replace(/\\n/g, '\\\\n').replace(/,/g, '\\\\,').replace(/;/g, '\\\\;');
-        }}
-
-        function generateICSForNames(names) {{
-            // Build notes description from NOTES_DATA (notes only, no label)
-            var noteDesc = '';
-            if (NOTES_DATA.comment) {{
-                noteDesc += NOTES_DATA.comment;
-            }}
-            (NOTES_DATA.updates || []).forEach(function(u) {{
-                if (u.text) {{
-                    var prefix = u.date ? ('MAJ ' + u.date + ': ') : 'MAJ: ';
-                    if (noteDesc) noteDesc += '\\n';
-                    noteDesc += prefix + u.text;
-                }}
-            }});
-
-            var lines = [
-                'BEGIN:VCALENDAR', 'VERSION:2.0',
-                'PRODID:-//Planning Urban 7D//FR',
-                'CALSCALE:GREGORIAN', 'METHOD:PUBLISH',
-                'X-WR-CALNAME:Planning Urban 7D',
-                'X-WR-TIMEZONE:Europe/Paris'
-            ];
-            names.forEach(function(name) {{
+        }
+
+        // Échappement ICS en une seule passe (même table que _ICS_ESCAPE côté Python)
+        var ICS_SPECIAL_RE = /[\\\\\\n,;]/g;
+        function icsEscape(str) {
+            return str.replace(ICS_SPECIAL_RE, function(ch) { return ch === '\\n' ? '\\\\n' : '\\\\' + ch; });
+        }
+
+        // Lignes DTSTART/DTEND/SUMMARY d'un créneau, formatées une fois (vidées par prepEvent)
+        function icsEventBody(name, ev) {
+            if (!ev._ics) {
+                ev._ics = 'DTSTART;TZID=Europe/Paris:' + toICSDate(new Date(ev._sMs)) + '\\r\\n' +
+                    'DTEND;TZID=Europe/Paris:' + toICSDate(new Date(ev._eMs)) + '\\r\\n' +
+                    'SUMMARY:' + getFirstName(name) + ' - ' + ev.label;
+            }
+            return ev._ics;
+        }
+
+        // En-tête VCALENDAR et description des notes : NOTES_DATA n'est jamais modifié
+        // (les éditions passent par notesWork), on les construit donc une seule fois
+        var ICS_HEADER = [
+            'BEGIN:VCALENDAR', 'VERSION:2.0',
+            'PRODID:-//Planning Urban 7D//FR',
+            'CALSCALE:GREGORIAN', 'METHOD:PUBLISH',
+            'X-WR-CALNAME:Planning Urban 7D',
+            'X-WR-TIMEZONE:Europe/Paris'
+        ];
+        var _icsDescLine = null;
+
+        function icsDescLine() {
+            if (_icsDescLine === null) {
+                // Build notes description from NOTES_DATA (notes only, no label)
+                var noteDesc = '';
+                if (NOTES_DATA.comment) {
+                    noteDesc += NOTES_DATA.comment;
+                }
+                (NOTES_DATA.updates || []).forEach(function(u) {
+                    if (u.text) {
+                        var prefix = u.date ? ('MAJ ' + u.date + ': ') : 'MAJ: ';
+                        if (noteDesc) noteDesc += '\\n';
+                        noteDesc += prefix + u.text;
+                    }
+                });
+                _icsDescLine = noteDesc ? 'DESCRIPTION:' + icsEscape(noteDesc) : '';
+            }
+            return _icsDescLine;
+        }
+
+        function generateICSForNames(names) {
+            var lines = ICS_HEADER.slice();
+            var descLine = icsDescLine();
+            for (var n = 0; n < names.length; n++) {
+                var name = names[n];
                 var emp = DATA[name];
-                if (!emp) return;
-                emp.events.forEach(function(ev, i) {{
-                    var s = new Date(ev.start);
-                    var e = new Date(ev.end);
+                if (!emp) continue;
+                var evs = emp.events;
+                for (var i = 0; i < evs.length; i++) {
                     lines.push('BEGIN:VEVENT');
                     lines.push('UID:export-' + emp.slug + '-' + i + '@urban7d');
-                    lines.push('DTSTART;TZID=Europe/Paris:' + toICSDate(s));
-                    lines.push('DTEND;TZID=Europe/Paris:' + toICSDate(e));
-                    lines.push('SUMMARY:' + getFirstName(name) + ' - ' + ev.label);
-                    if (noteDesc) lines.push('DESCRIPTION:' + icsEscape(noteDesc));
+                    lines.push(icsEventBody(name, evs[i]));
+                    if (descLine) lines.push(descLine);
                     lines.push('END:VEVENT');
-                }});
-            }});
+                }
+            }
             lines.push('END:VCALENDAR');
             return lines.join('\\r\\n');
-        }}
+        }
 
         // ── Calendar chooser (universel tous navigateurs / OS) ──
-        function openCalendarChooser(slug, displayName) {{
+        function openCalendarChooser(slug, displayName) {
             var base = window.location.href.replace(/[^/]*$/, '');
             var icsPath = 'ics/' + slug + '.ics';
             var fullUrl = new URL(icsPath, base).href;
@@ -1500,54 +1587,63 @@ def generate_html(week_employees, week_num, year, all_weeks):
             document.getElementById('cal-download').setAttribute('download', slug + '.ics');
             document.getElementById('cal-copy').setAttribute('data-url', fullUrl);
 
-            document.getElementById('cal-chooser').classList.add('open');
-        }}
+            calChooserEl.classList.add('open');
+        }
 
-        function closeCalendarChooser() {{
-            document.getElementById('cal-chooser').classList.remove('open');
-        }}
+        function closeCalendarChooser() {
+            calChooserEl.classList.remove('open');
+        }
         document.getElementById('cal-cancel').onclick = closeCalendarChooser;
-        document.getElementById('cal-chooser').onclick = function(e) {{
-            if (e.target === this) closeCalendarChooser();
-        }};
-        document.querySelectorAll('.cal-option').forEach(function(opt) {{
-            opt.addEventListener('click', function() {{
+        var calChooserEl = document.getElementById('cal-chooser');
+        calChooserEl.addEventListener('click', function(e) {
+            if (e.target === calChooserEl) closeCalendarChooser();
+        }, { passive: true });
+        document.querySelectorAll('.cal-option').forEach(function(opt) {
+            opt.addEventListener('click', function() {
                 setTimeout(closeCalendarChooser, 300);
-            }});
-        }});
-        document.getElementById('cal-copy').onclick = function() {{
+            });
+        });
+        document.getElementById('cal-copy').onclick = function() {
             var url = this.getAttribute('data-url');
-            if (navigator.clipboard) {{
-                navigator.clipboard.writeText(url).then(function() {{
+            if (navigator.clipboard) {
+                navigator.clipboard.writeText(url).then(function() {
                     var el = document.querySelector('#cal-copy .cal-name');
                     el.textContent = 'Lien copié !';
-                    setTimeout(function() {{ el.textContent = 'Copier le lien'; }}, 2000);
-                }});
-            }} else {{
+                    setTimeout(function() { el.textContent = 'Copier le lien'; }, 2000);
+                });
+            } else {
                 prompt('Copier ce lien :', url);
-            }}
-        }};
+            }
+        };
 
         // ── View toggle ──
-        document.querySelectorAll('.view-btn').forEach(function(btn) {{
-            btn.onclick = function() {{
+        var viewDayEl = document.getElementById('view-day');
+        var viewStaffEl = document.getElementById('view-staff');
+        var activeViewBtn = document.querySelector('.view-btn.active');
+        document.querySelectorAll('.view-btn').forEach(function(btn) {
+            btn.onclick = function() {
                 currentView = btn.getAttribute('data-view');
-                document.querySelectorAll('.view-btn').forEach(function(b) {{
-                    b.classList.toggle('active', b === btn);
-                }});
-                document.getElementById('view-day').style.display = currentView === 'day' ? '' : 'none';
-                document.getElementById('view-staff').style.display = currentView === 'staff' ? '' : 'none';
-            }};
-        }});
+                if (activeViewBtn) activeViewBtn.classList.remove('active');
+                btn.classList.add('active');
+                activeViewBtn = btn;
+                viewDayEl.style.display = currentView === 'day' ? '' : 'none';
+                viewStaffEl.style.display = currentView === 'staff' ? '' : 'none';
+            };
+        });
 
         // ── Modal ──
         var modalEl = document.getElementById('modal');
         document.getElementById('modal-close').onclick = closeModal;
-        modalEl.onclick = function(e) {{ if (e.target === modalEl) closeModal(); }};
+        modalEl.addEventListener('click', function(e) { if (e.target === modalEl) closeModal(); }, { passive: true });
 
-        function closeModal() {{ modalEl.classList.remove('open'); }}
+        function closeModal() { modalEl.classList.remove('open'); }
 
-        function openModal(name) {{
+        // Créneau type de la fiche (horaire + libellé), cloné pour chaque créneau
+        var _modalEventProto = document.createElement('div');
+        _modalEventProto.className = 'modal-event';
+        _modalEventProto.innerHTML = '<span class="ev-time"></span><span class="ev-label"></span>';
+
+        function openModal(name) {
             var emp = DATA[name];
             if (!emp) return;
 
@@ -1555,55 +1651,51 @@ def generate_html(week_employees, week_num, year, all_weeks):
             var body = document.getElementById('modal-body');
             body.innerHTML = '';
 
-            // Group events by day
-            var byDay = {{}};
-            emp.events.forEach(function(ev) {{ if (!byDay[ev.day]) byDay[ev.day] = []; byDay[ev.day].push(ev); }});
+            // Créneaux par jour : copie de l'index (les créneaux virtuels n'y sont pas ajoutés)
+            var byDay = emp._eventsByDay.slice();
 
             // Inject virtual events for days where this person is a replacer but has no events
             var repls = getReplacements();
-            repls.forEach(function(r) {{
+            repls.forEach(function(r) {
                 if (r['in'] !== name) return;
                 // Find the day index for this replacement date
                 var dayIdx = WEEK_DATES.indexOf(r.date);
                 if (dayIdx < 0) return;
-                var hasEventsThisDay = byDay[dayIdx] && byDay[dayIdx].length > 0;
-                if (hasEventsThisDay) return;
+                if (byDay[dayIdx].length > 0) return;
                 // Find code/label from replaced person's event
                 var outName = r.out;
                 var refCode = 'VDC';
                 var refLabel = 'Vie de centre';
                 var rStart = parseFloat(r.start.split(':')[0]) + parseFloat(r.start.split(':')[1] || 0) / 60;
                 var rEnd = parseFloat(r.end.split(':')[0]) + parseFloat(r.end.split(':')[1] || 0) / 60;
-                if (outName && DATA[outName]) {{
-                    DATA[outName].events.forEach(function(ev) {{
-                        if (ev.day !== dayIdx) return;
-                        var s2 = new Date(ev.start);
-                        var e2 = new Date(ev.end);
-                        var sh2 = s2.getHours() + s2.getMinutes()/60;
-                        var eh2 = e2.getHours() + e2.getMinutes()/60;
-                        if (eh2 <= sh2) eh2 = 24;
-                        if (sh2 < rEnd && eh2 > rStart) {{
-                            refCode = ev.code;
-                            refLabel = ev.label;
-                        }}
-                    }});
-                }}
+                if (outName && DATA[outName]) {
+                    var outEvs = DATA[outName]._eventsByDay[dayIdx];
+                    for (var oi = 0; oi < outEvs.length; oi++) {
+                        var oev = outEvs[oi];
+                        if (oev._sh < rEnd && oev._eh > rStart) {
+                            refCode = oev.code;
+                            refLabel = oev.label;
+                        }
+                    }
+                }
                 var synthStart = r.date + 'T' + r.start.split(':')[0].padStart(2,'0') + ':' + (r.start.split(':')[1] || '00').padStart(2,'0');
                 var synthEnd = r.date + 'T' + r.end.split(':')[0].padStart(2,'0') + ':' + (r.end.split(':')[1] || '00').padStart(2,'0');
-                if (!byDay[dayIdx]) byDay[dayIdx] = [];
-                byDay[dayIdx].push({{
+                var synthEv = {
                     code: refCode,
                     label: refLabel,
                     start: synthStart,
                     end: synthEnd,
                     day: dayIdx,
                     _synthetic: true
-                }});
-            }});
+                };
+                prepEvent(synthEv);
+                byDay[dayIdx] = [synthEv];
+            });
 
             var hasDays = false;
-            for (var d = 0; d < 7; d++) {{
-                if (!byDay[d] || byDay[d].length === 0) continue;
+            for (var d = 0; d < 7; d++) {
+                var list = byDay[d];
+                if (!list.length) continue;
                 hasDays = true;
                 var dayDiv = document.createElement('div');
                 dayDiv.className = 'modal-day';
@@ -1613,178 +1705,176 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 title.textContent = DAYS_FULL[d];
                 dayDiv.appendChild(title);
 
-                byDay[d].forEach(function(ev) {{
-                    var c = getColor(ev.code);
-                    var s = new Date(ev.start);
-                    var e = new Date(ev.end);
-                    var sh = s.getHours() + s.getMinutes()/60;
-                    var eh = e.getHours() + e.getMinutes()/60;
-                    if (eh <= sh) eh = 24;
+                for (var k = 0; k < list.length; k++) {
+                    var ev = list[k];
+                    var c = ev._color;
+                    var sh = ev._sh, eh = ev._eh;
                     var evDateStr = ev.start.substring(0, 10);
 
-                    var evDiv = document.createElement('div');
-                    evDiv.className = 'modal-event';
+                    var evDiv = _modalEventProto.cloneNode(true);
 
                     // Check replacement status
                     var replInfo = getReplacementStatus(name, evDateStr, sh, eh);
                     if (replInfo && replInfo.status === 'out') evDiv.className += ' replaced';
                     if (replInfo && replInfo.status === 'in') evDiv.className += ' replacer';
 
-                    evDiv.style.cssText = 'background:' + c.bg + ';border-color:' + c.border +
-                        ';box-shadow:0 0 8px ' + c.border + '30;';
+                    evDiv.style.cssText = bgFor(ev.code);
 
-                    var timeSpan = document.createElement('span');
-                    timeSpan.className = 'ev-time';
+                    var timeSpan = evDiv.firstElementChild;
                     timeSpan.style.color = c.text;
-                    timeSpan.textContent = s.getHours().toString().padStart(2,'0') + ':' +
-                        s.getMinutes().toString().padStart(2,'0') + ' \u2192 ' +
-                        e.getHours().toString().padStart(2,'0') + ':' +
-                        e.getMinutes().toString().padStart(2,'0');
+                    timeSpan.textContent = ev._startHM + ' \u2192 ' + ev._endHM;
 
-                    var labelSpan = document.createElement('span');
-                    labelSpan.className = 'ev-label';
+                    var labelSpan = evDiv.lastElementChild;
                     labelSpan.style.color = c.text;
                     labelSpan.textContent = ev.label;
 
-                    evDiv.appendChild(timeSpan);
-                    evDiv.appendChild(labelSpan);
-
                     // Add replacement annotation text
-                    if (replInfo) {{
+                    if (replInfo) {
                         var replSpan = document.createElement('span');
                         replSpan.className = 'ev-repl';
-                        if (replInfo.status === 'out') {{
+                        if (replInfo.status === 'out') {
                             replSpan.textContent = '\u2194 ' + getFirstName(replInfo.other);
                             replSpan.style.color = '#ff6b6b';
-                        }} else {{
+                        } else {
                             replSpan.textContent = '\u2194 ' + getFirstName(replInfo.other);
                             replSpan.style.color = '#51cf66';
-                        }}
+                        }
                         evDiv.appendChild(replSpan);
-                    }}
+                    }
 
                     dayDiv.appendChild(evDiv);
-                }});
+                }
                 body.appendChild(dayDiv);
-            }}
+            }
 
-            if (!hasDays) {{
+            if (!hasDays) {
                 body.innerHTML = '<div class="no-events">Repos cette semaine</div>';
-            }} else {{
+            } else {
                 // Total weekly hours footer (brut / net)
                 var totalH = computeWeeklyHours(emp);
                 var footer = document.createElement('div');
                 footer.className = 'modal-hours-total';
-                if (totalH.pause > 0) {{
+                if (totalH.pause > 0) {
                     footer.innerHTML =
                         '<div class="hours-line">Heures brut : <strong>' + formatHours(totalH.brut) + '</strong></div>' +
                         '<div class="hours-line pause">Pauses (20min / 6h) : <strong>\u2212' + formatHours(totalH.pause) + '</strong></div>' +
                         '<div class="hours-line net">Heures net : <strong>' + formatHours(totalH.net) + '</strong></div>';
-                }} else {{
+                } else {
                     footer.innerHTML = 'Total semaine : <strong>' + formatHours(totalH.brut) + '</strong>';
-                }}
+                }
                 body.appendChild(footer);
-            }}
+            }
 
             // Subscribe button → opens calendar chooser
             var subBtn = document.getElementById('modal-subscribe');
-            subBtn.onclick = function(e) {{
+            subBtn.onclick = function(e) {
                 e.preventDefault();
                 openCalendarChooser(emp.slug, getFirstName(name));
-            }};
+            };
 
             modalEl.classList.add('open');
-        }}
+        }
 
         // ── Compute weekly hours per employee and display badges ──
-        function computeWeeklyHours(emp) {{
+        function computeWeeklyHours(emp) {
             var brut = 0;
-            emp.events.forEach(function(ev) {{
-                var s = new Date(ev.start);
-                var e = new Date(ev.end);
-                brut += (e - s) / (1000 * 60 * 60);
-            }});
+            emp.events.forEach(function(ev) {
+                brut += (ev._eMs - ev._sMs) / (1000 * 60 * 60);
+            });
             var pauseH = computeWeeklyPause(emp);
-            return {{ brut: brut, net: brut - pauseH, pause: pauseH }};
-        }}
+            return { brut: brut, net: brut - pauseH, pause: pauseH };
+        }
         // Compute total pause deduction for an employee's week.
         // Rule: per day, merge consecutive/overlapping shifts into continuous
         // blocks, then for each block every 6h worked → 20 min pause.
-        function computeWeeklyPause(emp) {{
+        function computeWeeklyPause(emp) {
             // Group events by day
-            var byDay = {{}};
-            emp.events.forEach(function(ev) {{
+            var byDay = {};
+            emp.events.forEach(function(ev) {
                 var d = ev.day;
                 if (!byDay[d]) byDay[d] = [];
-                byDay[d].push({{ s: new Date(ev.start).getTime(), e: new Date(ev.end).getTime() }});
-            }});
+                byDay[d].push({ s: ev._sMs, e: ev._eMs });
+            });
             var totalPause = 0; // in hours
-            Object.keys(byDay).forEach(function(d) {{
-                var intervals = byDay[d].slice().sort(function(a,b) {{ return a.s - b.s; }});
+            Object.keys(byDay).forEach(function(d) {
+                var intervals = byDay[d].slice().sort(function(a,b) { return a.s - b.s; });
                 // Merge strictly consecutive intervals (fin == début du suivant)
                 var merged = [intervals[0]];
-                for (var i = 1; i < intervals.length; i++) {{
+                for (var i = 1; i < intervals.length; i++) {
                     var last = merged[merged.length - 1];
-                    if (intervals[i].s <= last.e) {{
+                    if (intervals[i].s <= last.e) {
                         last.e = Math.max(last.e, intervals[i].e);
-                    }} else {{
-                        merged.push({{ s: intervals[i].s, e: intervals[i].e }});
-                    }}
-                }}
+                    } else {
+                        merged.push({ s: intervals[i].s, e: intervals[i].e });
+                    }
+                }
                 // For each continuous block, count pauses (every 6h → 20min)
-                merged.forEach(function(block) {{
+                merged.forEach(function(block) {
                     var durationH = (block.e - block.s) / (1000 * 60 * 60);
                     var pauses = Math.floor(durationH / 6);
                     totalPause += pauses * (20 / 60); // 20 min in hours
-                }});
-            }});
+                });
+            });
             return totalPause;
-        }}
-        function formatHours(h) {{
+        }
+        function formatHours(h) {
             var hrs = Math.floor(h);
             var mins = Math.round((h - hrs) * 60);
             return mins > 0 ? hrs + 'h' + (mins < 10 ? '0' : '') + mins : hrs + 'h';
-        }}
-        function updateHoursBadges() {{
-            document.querySelectorAll('.employee-btn[data-name]').forEach(function(btn) {{
-                var emp = DATA[btn.getAttribute('data-name')];
+        }
+        // Boutons de la liste staff : générés côté serveur, la liste ne change pas
+        var employeeBtns = document.querySelectorAll('.employee-btn[data-name]');
+        // Badge d'heures de chaque bouton : créé une fois, réécrit seulement si les heures changent
+        var hoursBadges = {};
+        function updateHoursBadges() {
+            employeeBtns.forEach(function(btn) {
+                var name = btn.getAttribute('data-name');
+                var emp = DATA[name];
                 if (!emp) return;
-                // Remove old badges
-                btn.querySelectorAll('.hours-badge').forEach(function(b) {{ b.remove(); }});
                 var h = computeWeeklyHours(emp);
-                var badge = document.createElement('span');
-                badge.className = 'badge hours-badge';
-                if (h.pause > 0) {{
+                var key = h.brut + '|' + h.pause;
+                var badge = hoursBadges[name];
+                if (!badge) {
+                    badge = hoursBadges[name] = document.createElement('span');
+                    badge.className = 'badge hours-badge';
+                    btn.appendChild(badge);
+                } else if (badge._key === key) {
+                    return;
+                }
+                badge._key = key;
+                if (h.pause > 0) {
                     badge.innerHTML = formatHours(h.net) + ' <span class="hours-brut">(' + formatHours(h.brut) + ')</span>';
                     badge.title = 'Net : ' + formatHours(h.net) + ' | Brut : ' + formatHours(h.brut) + ' | Pauses : ' + formatHours(h.pause);
-                }} else {{
+                } else {
                     badge.textContent = formatHours(h.brut);
-                }}
-                btn.appendChild(badge);
-            }});
-        }}
-        updateHoursBadges();
+                    badge.removeAttribute('title');
+                }
+            });
+        }
+        // Vue staff masquée au chargement : badges d'heures calculés quand le navigateur est libre
+        (window.requestIdleCallback || function(cb) { return setTimeout(cb, 1); })(function() { updateHoursBadges(); });
 
         // ── Staff list click ──
-        document.querySelectorAll('.employee-btn[data-name]').forEach(function(btn) {{
-            btn.onclick = function() {{ openModal(btn.getAttribute('data-name')); }};
-        }});
+        employeeBtns.forEach(function(btn) {
+            btn.onclick = function() { openModal(btn.getAttribute('data-name')); };
+        });
 
         // ── Notes de semaine (injectées depuis notes/SXX.json) ──
         var REPO = 'OhLaPey/planning-urbansoccer';
-        var NOTES_PATH = 'notes/S{week_num}.json';
+        var NOTES_PATH = 'notes/S' + WEEK_NUM + '.json';
         var TOKEN_KEY = 'planning-admin-token';
         var notesEl = document.getElementById('week-notes');
-        var notesWork = JSON.parse(JSON.stringify(NOTES_DATA));
+        // Copie de travail (NOTES_DATA reste la version publiée) : clone natif, sans aller-retour JSON
+        var notesWork = typeof structuredClone === 'function' ? structuredClone(NOTES_DATA) : JSON.parse(JSON.stringify(NOTES_DATA));
         var notesDirty = false;
-        function saveNotesLocal() {{
+        function saveNotesLocal() {
             // Plus de localStorage — les notes sont en mémoire et persistées via "Publier"
-        }}
+        }
 
-        function getToken() {{ return localStorage.getItem(TOKEN_KEY) || ''; }}
-        function setToken(t) {{ localStorage.setItem(TOKEN_KEY, t); }}
+        function getToken() { return localStorage.getItem(TOKEN_KEY) || ''; }
+        function setToken(t) { localStorage.setItem(TOKEN_KEY, t); }
 
-        function renderNotes() {{
+        function renderNotes() {
             var data = notesWork;
             notesEl.innerHTML = '';
 
@@ -1806,36 +1896,37 @@ def generate_html(week_employees, week_num, year, all_weeks):
             card.appendChild(txt);
             notesEl.appendChild(card);
 
-            editBtn.onclick = function() {{
-                if (txt.contentEditable === 'true') {{
-                    txt.contentEditable = 'false';
+            editBtn.onclick = function() {
+                if (txt.contentEditable === 'true') {
+                    // Mise à jour sur place de la seule carte éditée (pas de reconstruction des notes)
+                    txt.removeAttribute('contenteditable');
                     data.comment = txt.innerText;
+                    txt.textContent = data.comment;
                     editBtn.innerHTML = '\u270e';
                     notesDirty = true; saveNotesLocal();
-                    renderNotes();
-                }} else {{
+                    showPublishButton();
+                } else {
                     txt.contentEditable = 'true';
                     txt.focus();
                     editBtn.innerHTML = '\u2714';
-                }}
-            }};
+                }
+            };
 
             // Update cards
-            data.updates.forEach(function(u, idx) {{
+            var lastUpdateCard = card;
+            function buildNoteCard(u) {
                 var ucard = document.createElement('div');
                 ucard.className = 'note-card update';
                 var uhdr = document.createElement('div');
                 uhdr.className = 'note-header';
                 var dateLabel = '';
-                if (u.date) {{
+                if (u.date) {
                     var _dp = u.date.split(/[\\-T ]/);
                     var _dd = new Date(parseInt(_dp[0]), parseInt(_dp[1])-1, parseInt(_dp[2]),
                         _dp.length > 3 ? parseInt(_dp[3]) : 0, _dp.length > 4 ? parseInt(_dp[4]) : 0);
-                    var _jours = ['Dimanche','Lundi','Mardi','Mercredi','Jeudi','Vendredi','Samedi'];
-                    var _mois = ['janvier','f\u00e9vrier','mars','avril','mai','juin','juillet','ao\u00fbt','septembre','octobre','novembre','d\u00e9cembre'];
                     var _timePart = (_dp.length > 3) ? ' \u00e0 ' + _dp[3] + 'h' + (_dp[4] || '00') : '';
-                    dateLabel = ' \u2014 ' + _jours[_dd.getDay()] + ' ' + _dd.getDate() + ' ' + _mois[_dd.getMonth()] + _timePart;
-                }}
+                    dateLabel = ' \u2014 ' + JOURS[_dd.getDay()] + ' ' + _dd.getDate() + ' ' + MOIS[_dd.getMonth()] + _timePart;
+                }
                 uhdr.innerHTML = '<span class="note-label update">Mise \u00e0 jour' + dateLabel + '</span>';
                 var uactions = document.createElement('div');
                 uactions.className = 'note-actions';
@@ -1855,42 +1946,48 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 utxt.className = 'note-text';
                 utxt.textContent = u.text || '';
                 ucard.appendChild(utxt);
-                notesEl.appendChild(ucard);
 
-                uedit.onclick = function() {{
-                    if (utxt.contentEditable === 'true') {{
-                        utxt.contentEditable = 'false';
-                        data.updates[idx].text = utxt.innerText;
+                uedit.onclick = function() {
+                    if (utxt.contentEditable === 'true') {
+                        utxt.removeAttribute('contenteditable');
+                        u.text = utxt.innerText;
+                        utxt.textContent = u.text;
                         uedit.innerHTML = '\u270e';
                         notesDirty = true; saveNotesLocal();
-                        renderNotes();
-                    }} else {{
+                        showPublishButton();
+                    } else {
                         utxt.contentEditable = 'true';
                         utxt.focus();
                         uedit.innerHTML = '\u2714';
-                    }}
-                }};
-                udel.onclick = function() {{
-                    data.updates.splice(idx, 1);
+                    }
+                };
+                // Index relu au clic : les suppressions précédentes décalent les positions
+                udel.onclick = function() {
+                    data.updates.splice(data.updates.indexOf(u), 1);
+                    if (lastUpdateCard === ucard) lastUpdateCard = ucard.previousSibling;
+                    ucard.remove();
                     notesDirty = true; saveNotesLocal();
-                    renderNotes();
-                }};
-            }});
+                    showPublishButton();
+                };
+                return ucard;
+            }
+            data.updates.forEach(function(u) {
+                lastUpdateCard = buildNoteCard(u);
+                notesEl.appendChild(lastUpdateCard);
+            });
 
             // ── Replacement cards ──
-            var repls = data.replacements || [];
-            repls.forEach(function(r, idx) {{
+            function buildReplCard(r) {
                 var rcard = document.createElement('div');
                 rcard.className = 'note-card replacement';
                 var rhdr = document.createElement('div');
                 rhdr.className = 'note-header';
                 var rDateLabel = '';
-                if (r.date) {{
+                if (r.date) {
                     var _rp = r.date.split('-');
                     var _rd = new Date(parseInt(_rp[0]), parseInt(_rp[1])-1, parseInt(_rp[2]));
-                    var _rjours = ['Dim','Lun','Mar','Mer','Jeu','Ven','Sam'];
-                    rDateLabel = ' \u2014 ' + _rjours[_rd.getDay()] + ' ' + _rd.getDate() + '/' + _rp[1];
-                }}
+                    rDateLabel = ' \u2014 ' + JOURS_COURTS[_rd.getDay()] + ' ' + _rd.getDate() + '/' + _rp[1];
+                }
                 rhdr.innerHTML = '<span class="note-label replacement">Remplacement' + rDateLabel + '</span>';
                 var ractions = document.createElement('div');
                 ractions.className = 'note-actions';
@@ -1906,23 +2003,27 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 rsummary.innerHTML = '<span class="repl-out">' + getFirstName(r.out) + '</span> \u2192 <span class="repl-in">' + getFirstName(r.in) + '</span>' +
                     '  <span style="color:#666;font-size:10px">' + (r.start || '') + ' \u2013 ' + (r.end || '') + '</span>';
                 rcard.appendChild(rsummary);
-                notesEl.appendChild(rcard);
 
-                rdel.onclick = function() {{
-                    data.replacements.splice(idx, 1);
+                rdel.onclick = function() {
+                    data.replacements.splice(data.replacements.indexOf(r), 1);
+                    rcard.remove();
                     notesDirty = true; saveNotesLocal();
-                    renderNotes();
+                    showPublishButton();
                     renderTimeline();
-                }};
-            }});
+                };
+                return rcard;
+            }
+            (data.replacements || []).forEach(function(r) {
+                notesEl.appendChild(buildReplCard(r));
+            });
 
             // Add replacement button
             var addReplBtn = document.createElement('button');
             addReplBtn.className = 'add-repl-btn';
             addReplBtn.textContent = '+ Ajouter un remplacement';
-            addReplBtn.onclick = function() {{
+            addReplBtn.onclick = function() {
                 // Build employee list from DATA
-                var names = Object.keys(DATA).filter(function(n) {{ return n !== '_codeNames'; }}).sort();
+                var names = Object.keys(DATA).filter(function(n) { return n !== '_codeNames'; }).sort();
                 var form = document.createElement('div');
                 form.className = 'note-card replacement';
                 form.innerHTML = '<div class="note-header"><span class="note-label replacement">Nouveau remplacement</span></div>';
@@ -1934,16 +2035,15 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 dateRow.className = 'repl-row';
                 dateRow.innerHTML = '<label>Jour</label>';
                 var dateSel = document.createElement('select');
-                WEEK_DATES.forEach(function(d, i) {{
+                WEEK_DATES.forEach(function(d, i) {
                     var opt = document.createElement('option');
                     opt.value = d;
-                    var _jrs = ['Dim','Lun','Mar','Mer','Jeu','Ven','Sam'];
                     var _dp = d.split('-');
                     var _dt = new Date(parseInt(_dp[0]), parseInt(_dp[1])-1, parseInt(_dp[2]));
-                    opt.textContent = _jrs[_dt.getDay()] + ' ' + _dt.getDate() + '/' + _dp[1];
+                    opt.textContent = JOURS_COURTS[_dt.getDay()] + ' ' + _dt.getDate() + '/' + _dp[1];
                     if (i === currentDay) opt.selected = true;
                     dateSel.appendChild(opt);
-                }});
+                });
                 dateRow.appendChild(dateSel);
                 formBody.appendChild(dateRow);
 
@@ -1955,11 +2055,11 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 var outDef = document.createElement('option');
                 outDef.value = ''; outDef.textContent = 'Personne remplac\u00e9e...';
                 outSel.appendChild(outDef);
-                names.forEach(function(n) {{
+                names.forEach(function(n) {
                     var opt = document.createElement('option');
                     opt.value = n; opt.textContent = n;
                     outSel.appendChild(opt);
-                }});
+                });
                 outRow.appendChild(outSel);
                 formBody.appendChild(outRow);
 
@@ -1971,11 +2071,11 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 var inDef = document.createElement('option');
                 inDef.value = ''; inDef.textContent = 'Rempla\u00e7ant(e)...';
                 inSel.appendChild(inDef);
-                names.forEach(function(n) {{
+                names.forEach(function(n) {
                     var opt = document.createElement('option');
                     opt.value = n; opt.textContent = n;
                     inSel.appendChild(opt);
-                }});
+                });
                 inRow.appendChild(inSel);
                 formBody.appendChild(inRow);
 
@@ -1997,7 +2097,7 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 formBody.appendChild(timeRow);
 
                 // Auto-fill time range from replaced person's schedule
-                function autoFillTimes() {{
+                function autoFillTimes() {
                     var selName = outSel.value;
                     var selDate = dateSel.value;
                     if (!selName || !selDate || !DATA[selName]) return;
@@ -2006,21 +2106,19 @@ def generate_html(week_employees, week_num, year, all_weeks):
                     if (dayIdx < 0) return;
                     // Find earliest start and latest end for this person on this day
                     var earliest = null, latest = null;
-                    emp.events.forEach(function(ev) {{
+                    emp.events.forEach(function(ev) {
                         if (ev.day !== dayIdx) return;
-                        var s = new Date(ev.start);
-                        var e = new Date(ev.end);
-                        var sStr = s.getHours().toString().padStart(2,'0') + ':' + s.getMinutes().toString().padStart(2,'0');
-                        var eStr = e.getHours().toString().padStart(2,'0') + ':' + e.getMinutes().toString().padStart(2,'0');
+                        var sStr = ev._startHM;
+                        var eStr = ev._endHM;
                         if (eStr === '00:00') eStr = '23:59';
                         if (!earliest || sStr < earliest) earliest = sStr;
                         if (!latest || eStr > latest) latest = eStr;
-                    }});
-                    if (earliest && latest) {{
+                    });
+                    if (earliest && latest) {
                         startInput.value = earliest;
                         endInput.value = latest;
-                    }}
-                }}
+                    }
+                }
                 outSel.addEventListener('change', autoFillTimes);
                 dateSel.addEventListener('change', autoFillTimes);
 
@@ -2028,130 +2126,168 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 var submitBtn = document.createElement('button');
                 submitBtn.className = 'repl-add-btn';
                 submitBtn.textContent = 'Valider';
-                submitBtn.onclick = function() {{
+                submitBtn.onclick = function() {
                     if (!outSel.value || !inSel.value) return;
                     if (!data.replacements) data.replacements = [];
-                    data.replacements.push({{
+                    var newR = {
                         date: dateSel.value,
                         out: outSel.value,
                         in: inSel.value,
                         start: startInput.value,
                         end: endInput.value
-                    }});
+                    };
+                    data.replacements.push(newR);
                     notesDirty = true; saveNotesLocal();
-                    renderNotes();
+                    // Le formulaire cède la place à la nouvelle carte, suivie du bouton d'ajout
+                    var rcard = buildReplCard(newR);
+                    form.replaceWith(rcard);
+                    notesEl.insertBefore(addReplBtn, rcard.nextSibling);
+                    showPublishButton();
                     renderTimeline();
-                }};
+                };
                 formBody.appendChild(submitBtn);
                 form.appendChild(formBody);
 
                 // Replace button with form
                 addReplBtn.replaceWith(form);
-            }};
+            };
             notesEl.appendChild(addReplBtn);
 
             // Add update button
             var addBtn = document.createElement('button');
             addBtn.className = 'add-note-btn';
             addBtn.textContent = '+ Ajouter une mise \u00e0 jour';
-            addBtn.onclick = function() {{
+            addBtn.onclick = function() {
                 var today = new Date();
                 var ds = today.getFullYear() + '-' +
                     (today.getMonth()+1).toString().padStart(2,'0') + '-' +
                     today.getDate().toString().padStart(2,'0');
-                data.updates.push({{ date: ds, text: '' }});
+                var newU = { date: ds, text: '' };
+                data.updates.push(newU);
                 notesDirty = true; saveNotesLocal();
-                renderNotes();
-                var cards = notesEl.querySelectorAll('.note-card.update .note-text');
-                if (cards.length > 0) {{
-                    var last = cards[cards.length - 1];
-                    last.contentEditable = 'true';
-                    last.focus();
-                    var editBtns = notesEl.querySelectorAll('.note-card.update .note-btn:not(.del)');
-                    if (editBtns.length > 0) editBtns[editBtns.length - 1].innerHTML = '\u2714';
-                }}
-            }};
+                var ucard = buildNoteCard(newU);
+                notesEl.insertBefore(ucard, lastUpdateCard.nextSibling);
+                lastUpdateCard = ucard;
+                var utxt = ucard.querySelector('.note-text');
+                utxt.contentEditable = 'true';
+                utxt.focus();
+                ucard.querySelector('.note-btn:not(.del)').innerHTML = '\u2714';
+                showPublishButton();
+            };
             notesEl.appendChild(addBtn);
+            showPublishButton();
+        }
 
-            // Publish button (only if admin token is set and notes changed)
+        // Publish button (only if admin token is set and notes changed)
+        function showPublishButton() {
             var token = getToken();
-            if (token && notesDirty) {{
+            var current = notesEl.querySelector('.publish-btn');
+            // Après une publication le bouton est devenu « Rafraîchir » : une nouvelle
+            // modification doit pouvoir être publiée, on repart donc d'un bouton neuf
+            if (current && notesDirty && current.classList.contains('success')) {
+                clearTimeout(current._countdown);
+                current.remove();
+                current = null;
+            }
+            if (token && notesDirty && !current) {
                 var pubBtn = document.createElement('button');
                 pubBtn.className = 'publish-btn';
                 pubBtn.textContent = 'Publier les notes';
-                pubBtn.onclick = function() {{
+                pubBtn.onclick = function() {
                     pubBtn.disabled = true;
                     pubBtn.textContent = 'Publication en cours...';
-                    pushNotesToGitHub(data, pubBtn);
-                }};
+                    pushNotesToGitHub(notesWork, pubBtn);
+                };
                 notesEl.appendChild(pubBtn);
-            }}
-        }}
+            }
+        }
+
+        // ── Écriture d'un fichier via l'API GitHub ──
+        // Le sha renvoyé par le dernier PUT réussi est gardé par fichier : les publications
+        // suivantes partent directement en PUT. Le GET n'est refait qu'au premier envoi
+        // ou si GitHub refuse un sha périmé (409/422).
+        var _fileSha = {};
 
-        function pushNotesToGitHub(data, btn) {{
+        function putGitHubFile(path, content, message) {
             var token = getToken();
-            var content = btoa(unescape(encodeURIComponent(JSON.stringify(data, null, 2) + '\\n')));
-            var apiUrl = 'https://api.github.com/repos/' + REPO + '/contents/' + NOTES_PATH;
-
-            // First get the current file SHA (required for update)
-            fetch(apiUrl, {{
-                headers: {{ 'Authorization': 'Bearer ' + token, 'Accept': 'application/vnd.github.v3+json' }}
-            }})
-            .then(function(r) {{ return r.ok ? r.json() : {{ sha: null }}; }})
-            .then(function(file) {{
-                var body = {{
-                    message: 'MAJ notes S{week_num} depuis la page',
-                    content: content,
-                    branch: 'main'
-                }};
-                if (file.sha) body.sha = file.sha;
-
-                return fetch(apiUrl, {{
+            var apiUrl = 'https://api.github.com/repos/' + REPO + '/contents/' + path;
+
+            function fetchSha() {
+                return fetch(apiUrl, {
+                    headers: { 'Authorization': 'Bearer ' + token, 'Accept': 'application/vnd.github.v3+json' }
+                })
+                .then(function(r) { return r.ok ? r.json() : { sha: null }; })
+                .then(function(file) { _fileSha[path] = file.sha || null; });
+            }
+
+            function put() {
+                var body = { message: message, content: content, branch: 'main' };
+                if (_fileSha[path]) body.sha = _fileSha[path];
+                return fetch(apiUrl, {
                     method: 'PUT',
-                    headers: {{
+                    headers: {
                         'Authorization': 'Bearer ' + token,
                         'Accept': 'application/vnd.github.v3+json',
                         'Content-Type': 'application/json'
-                    }},
+                    },
                     body: JSON.stringify(body)
-                }});
-            }})
-            .then(function(r) {{
-                if (r.ok) {{
+                });
+            }
+
+            function done(r) {
+                if (!r.ok) return r;
+                return r.json().then(function(res) {
+                    _fileSha[path] = (res.content && res.content.sha) || null;
+                    return r;
+                }, function() { delete _fileSha[path]; return r; });
+            }
+
+            if (!(path in _fileSha)) return fetchSha().then(put).then(done);
+            return put().then(function(r) {
+                if (r.status !== 409 && r.status !== 422) return done(r);
+                return fetchSha().then(put).then(done);
+            });
+        }
+
+        function pushNotesToGitHub(data, btn) {
+            var content = btoa(unescape(encodeURIComponent(JSON.stringify(data, null, 2) + '\\n')));
+            putGitHubFile(NOTES_PATH, content, 'MAJ notes S' + WEEK_NUM + ' depuis la page')
+            .then(function(r) {
+                if (r.ok) {
                     notesDirty = false;
                     showRefreshCountdown(btn);
-                }} else {{
-                    return r.json().then(function(err) {{
+                } else {
+                    return r.json().then(function(err) {
                         btn.disabled = false;
                         btn.textContent = 'Erreur : ' + (err.message || 'v\u00e9rifier le token');
                         btn.classList.remove('success');
-                    }});
-                }}
-            }})
-            .catch(function(e) {{
+                    });
+                }
+            })
+            .catch(function(e) {
                 btn.disabled = false;
                 btn.textContent = 'Erreur r\u00e9seau, r\u00e9essayer';
-            }});
-        }}
+            });
+        }
 
-        function showRefreshCountdown(btn) {{
+        function showRefreshCountdown(btn) {
             var seconds = 90;
             btn.classList.add('success');
             btn.disabled = true;
 
-            function tick() {{
-                if (seconds > 0) {{
+            function tick() {
+                if (seconds > 0) {
                     btn.textContent = 'Publi\u00e9 \u2714 En ligne dans ~' + seconds + 's \u2014 Rafra\u00eechir';
                     seconds--;
-                    setTimeout(tick, 1000);
-                }} else {{
+                    btn._countdown = setTimeout(tick, 1000);
+                } else {
                     btn.textContent = "C'est en ligne ! Rafra\u00eechir la page";
-                }}
+                }
                 btn.disabled = false;
-                btn.onclick = function() {{ location.reload(); }};
-            }}
+                btn.onclick = function() { location.reload(); };
+            }
             tick();
-        }}
+        }
 
         renderNotes();
 
@@ -2162,7 +2298,7 @@ def generate_html(week_employees, week_num, year, all_weeks):
         var editMode = false;
         var adminToolbarEl = null;
 
-        function initAdminToolbar() {{
+        function initAdminToolbar() {
             if (!getToken()) return;
             if (adminToolbarEl) return;
             adminToolbarEl = document.createElement('div');
@@ -2171,24 +2307,25 @@ def generate_html(week_employees, week_num, year, all_weeks):
             var toggleBtn = document.createElement('button');
             toggleBtn.className = 'edit-toggle';
             toggleBtn.textContent = 'Mode \u00e9dition';
-            toggleBtn.onclick = function() {{
-                if (editMode && _editsDirty) {{
+            toggleBtn.onclick = function() {
+                if (editMode && _editsDirty) {
                     if (!confirm('Modifications non enregistr\u00e9es. Quitter sans enregistrer ?')) return;
                     _editsDirty = false;
                     updateSaveButton();
-                }}
+                }
                 editMode = !editMode;
                 toggleBtn.classList.toggle('active', editMode);
                 toggleBtn.textContent = editMode ? 'Quitter \u00e9dition' : 'Mode \u00e9dition';
+                document.getElementById('timeline').classList.toggle('editing', editMode);
                 renderTimeline();
-            }};
+            };
             adminToolbarEl.appendChild(toggleBtn);
             var saveBtn = document.createElement('button');
             saveBtn.className = 'save-edits-btn';
             saveBtn.id = 'save-edits-btn';
             saveBtn.textContent = 'Enregistrer';
             saveBtn.style.display = 'none';
-            saveBtn.onclick = function() {{ publishAllEdits(); }};
+            saveBtn.onclick = function() { publishAllEdits(); };
             adminToolbarEl.appendChild(saveBtn);
             var statusEl = document.createElement('span');
             statusEl.className = 'edit-status';
@@ -2196,21 +2333,21 @@ def generate_html(week_employees, week_num, year, all_weeks):
             adminToolbarEl.appendChild(statusEl);
             var viewDay = document.getElementById('view-day');
             viewDay.insertBefore(adminToolbarEl, viewDay.firstChild);
-        }}
+        }
 
-        // Override renderTimeline to add editable class when editMode
+        // Override renderTimeline to add edit handles when editMode (styles via #timeline.editing)
         var _origRenderTimeline = renderTimeline;
         var _dragState = null;
 
         // Snap a decimal hour to the nearest 15-min increment
-        function snapHour(h) {{ return Math.round(h * 4) / 4; }}
-        function hourToStr(h) {{
+        function snapHour(h) { return Math.round(h * 4) / 4; }
+        function hourToStr(h) {
             var hh = Math.floor(h); var mm = Math.round((h - hh) * 60);
-            if (mm === 60) {{ hh++; mm = 0; }}
+            if (mm === 60) { hh++; mm = 0; }
             return hh.toString().padStart(2,'0') + ':' + mm.toString().padStart(2,'0');
-        }}
+        }
 
-        function startDrag(e, bar, side, empName, ev, container) {{
+        function startDrag(e, bar, side, empName, ev, container) {
             e.preventDefault(); e.stopPropagation();
             var rect = container.getBoundingClientRect();
             // Compute current timeline range from rendered grid
@@ -2220,8 +2357,8 @@ def generate_html(week_employees, week_num, year, all_weeks):
             var minH = parseFloat(container.dataset.minH);
             var range = parseFloat(container.dataset.range);
 
-            _dragState = {{ bar: bar, side: side, empName: empName, ev: ev,
-                            rect: rect, minH: minH, range: range }};
+            _dragState = { bar: bar, side: side, empName: empName, ev: ev,
+                            rect: rect, minH: minH, range: range };
             bar.querySelector('.drag-handle.' + side).classList.add('active');
 
             // Create tooltip
@@ -2230,9 +2367,9 @@ def generate_html(week_employees, week_num, year, all_weeks):
             tip.id = 'drag-tooltip';
             document.body.appendChild(tip);
             updateDrag(e);
-        }}
+        }
 
-        function updateDrag(e) {{
+        function updateDrag(e) {
             if (!_dragState) return;
             var clientX = e.touches ? e.touches[0].clientX : e.clientX;
             var clientY = e.touches ? e.touches[0].clientY : e.clientY;
@@ -2240,135 +2377,128 @@ def generate_html(week_employees, week_num, year, all_weeks):
             var pct = ((clientX - ds.rect.left) / ds.rect.width) * 100;
             pct = Math.max(0, Math.min(100, pct));
             var newH = snapHour(ds.minH + (pct / 100) * ds.range);
+            var sh = ds.ev._sh, eh = ds.ev._eh;
 
-            var s = new Date(ds.ev.start);
-            var eDate = new Date(ds.ev.end);
-            var sh = s.getHours() + s.getMinutes() / 60;
-            var eh = eDate.getHours() + eDate.getMinutes() / 60;
-            if (eh <= sh) eh = 24;
-
-            if (ds.side === 'left') {{
+            if (ds.side === 'left') {
                 newH = Math.min(newH, eh - 0.25);  // min 15 min
                 var newLeft = ((newH - ds.minH) / ds.range) * 100;
                 var newWidth = ((eh - newH) / ds.range) * 100;
                 ds.bar.style.left = newLeft + '%';
                 ds.bar.style.width = newWidth + '%';
                 ds.currentH = newH;
-            }} else {{
+            } else {
                 newH = Math.max(newH, sh + 0.25);
                 var origLeft = ((sh - ds.minH) / ds.range) * 100;
                 var newWidth = ((newH - sh) / ds.range) * 100;
                 ds.bar.style.width = newWidth + '%';
                 ds.currentH = newH;
-            }}
+            }
 
             var tip = document.getElementById('drag-tooltip');
-            if (tip) {{
+            if (tip) {
                 tip.textContent = hourToStr(newH);
                 tip.style.left = (clientX + 12) + 'px';
                 tip.style.top = (clientY - 28) + 'px';
-            }}
-        }}
+            }
+        }
 
-        function endDrag() {{
+        function endDrag() {
             if (!_dragState) return;
             var ds = _dragState;
-            var s = new Date(ds.ev.start);
-            var eDate = new Date(ds.ev.end);
-            var sh = s.getHours() + s.getMinutes() / 60;
-            var eh = eDate.getHours() + eDate.getMinutes() / 60;
-            if (eh <= sh) eh = 24;
+            var sh = ds.ev._sh, eh = ds.ev._eh;
 
             var newStart, newEnd;
-            if (ds.side === 'left') {{
+            if (ds.side === 'left') {
                 newStart = hourToStr(ds.currentH);
                 newEnd = hourToStr(eh);
-            }} else {{
+            } else {
                 newStart = hourToStr(sh);
                 newEnd = hourToStr(ds.currentH);
-            }}
+            }
 
             _dragState = null;
             var tip = document.getElementById('drag-tooltip');
             if (tip) tip.remove();
 
             applyTimeEdit(ds.empName, ds.ev, newStart, newEnd);
-        }}
+        }
+
+        document.addEventListener('mousemove', function(e) { updateDrag(e); });
+        document.addEventListener('mouseup', function() { endDrag(); });
+        document.addEventListener('touchmove', function(e) { if (_dragState) { e.preventDefault(); updateDrag(e); } }, { passive: false });
+        document.addEventListener('touchend', function() { endDrag(); });
+
+        // Clics d'édition délégués au conteneur : barre → édition, zone vide → nouveau créneau
+        document.getElementById('timeline').addEventListener('click', function(e) {
+            if (!editMode || _dragState) return;
+            var t = e.target;
+            var row = t.closest('.timeline-row');
+            var nameEl = row && row.firstElementChild;
+            if (!nameEl || !nameEl.title) return;
+            var empName = nameEl.title;
+
+            if (t.classList.contains('tl-bar-container')) {
+                var rect = t.getBoundingClientRect();
+                var minH = parseFloat(t.dataset.minH);
+                var range = parseFloat(t.dataset.range);
+                var pct = ((e.clientX - rect.left) / rect.width) * 100;
+                var clickH = snapHour(minH + (pct / 100) * range);
+                openAddEventPopup(empName, clickH);
+                return;
+            }
 
-        document.addEventListener('mousemove', function(e) {{ updateDrag(e); }});
-        document.addEventListener('mouseup', function() {{ endDrag(); }});
-        document.addEventListener('touchmove', function(e) {{ if (_dragState) {{ e.preventDefault(); updateDrag(e); }} }}, {{ passive: false }});
-        document.addEventListener('touchend', function() {{ endDrag(); }});
+            // Don't open popup if click was on a drag handle
+            var bar = t.closest('.tl-bar');
+            if (!bar || t.classList.contains('drag-handle')) return;
+            var emp = DATA[empName];
+            if (!emp) return;
+            var idx = Array.prototype.indexOf.call(row.querySelectorAll('.tl-bar'), bar);
+            var ev = emp._eventsByDay[currentDay][idx];
+            if (ev) openEditPopup(empName, ev, idx);
+        });
 
-        renderTimeline = function() {{
+        renderTimeline = function() {
             _origRenderTimeline();
             if (!editMode) return;
 
-            document.querySelectorAll('#timeline .tl-bar').forEach(function(bar) {{
-                bar.classList.add('editable');
-                // Add drag handles
-                if (!bar.querySelector('.drag-handle')) {{
-                    var handleL = document.createElement('div');
-                    handleL.className = 'drag-handle left';
-                    var handleR = document.createElement('div');
-                    handleR.className = 'drag-handle right';
-                    bar.appendChild(handleL);
-                    bar.appendChild(handleR);
-                }}
-            }});
-
             // Add click + drag handlers + delete staff buttons
             var rows = document.querySelectorAll('#timeline .timeline-row');
-            rows.forEach(function(row) {{
+            rows.forEach(function(row) {
                 var nameEl = row.querySelector('.tl-name');
                 if (!nameEl || !nameEl.title) return;
                 var empName = nameEl.title;
                 var container = row.querySelector('.tl-bar-container');
 
                 // Add delete staff button next to name
-                if (!nameEl.querySelector('.del-staff')) {{
+                if (!nameEl.querySelector('.del-staff')) {
                     var delBtn = document.createElement('span');
                     delBtn.className = 'del-staff';
                     delBtn.textContent = '\u00d7';
                     delBtn.title = 'Supprimer ' + empName;
-                    delBtn.onclick = function(e) {{ e.stopPropagation(); deleteStaff(empName); }};
+                    delBtn.onclick = function(e) { e.stopPropagation(); deleteStaff(empName); };
                     nameEl.appendChild(delBtn);
-                }}
-                row.querySelectorAll('.tl-bar').forEach(function(bar, idx) {{
+                }
+                row.querySelectorAll('.tl-bar').forEach(function(bar, idx) {
                     var emp = DATA[empName];
                     if (!emp) return;
-                    var dayEvts = emp.events.filter(function(ev) {{ return ev.day === currentDay; }});
+                    var dayEvts = emp._eventsByDay[currentDay];
                     if (!dayEvts[idx]) return;
                     var ev = dayEvts[idx];
 
-                    bar.onclick = function(e) {{
-                        if (!editMode || _dragState) return;
-                        // Don't open popup if click was on a drag handle
-                        if (e.target.classList.contains('drag-handle')) return;
-                        e.stopPropagation();
-                        openEditPopup(empName, ev, idx);
-                    }};
-
-                    bar.querySelector('.drag-handle.left').onmousedown = function(e) {{ startDrag(e, bar, 'left', empName, ev, container); }};
-                    bar.querySelector('.drag-handle.right').onmousedown = function(e) {{ startDrag(e, bar, 'right', empName, ev, container); }};
-                    bar.querySelector('.drag-handle.left').ontouchstart = function(e) {{ startDrag(e, bar, 'left', empName, ev, container); }};
-                    bar.querySelector('.drag-handle.right').ontouchstart = function(e) {{ startDrag(e, bar, 'right', empName, ev, container); }};
-                }});
-
-                // Click on empty area of bar container → create new event
-                (function(cont, eName) {{
-                    cont.addEventListener('click', function(e) {{
-                        if (!editMode || _dragState) return;
-                        if (e.target !== cont && !e.target.classList.contains('tl-grid-line')) return;
-                        var rect = cont.getBoundingClientRect();
-                        var minH = parseFloat(cont.dataset.minH);
-                        var range = parseFloat(cont.dataset.range);
-                        var pct = ((e.clientX - rect.left) / rect.width) * 100;
-                        var clickH = snapHour(minH + (pct / 100) * range);
-                        openAddEventPopup(eName, clickH);
-                    }});
-                }})(container, empName);
-            }});
+                    // Add drag handles
+                    var handleL = document.createElement('div');
+                    handleL.className = 'drag-handle left';
+                    var handleR = document.createElement('div');
+                    handleR.className = 'drag-handle right';
+                    bar.appendChild(handleL);
+                    bar.appendChild(handleR);
+
+                    handleL.onmousedown = function(e) { startDrag(e, bar, 'left', empName, ev, container); };
+                    handleR.onmousedown = function(e) { startDrag(e, bar, 'right', empName, ev, container); };
+                    handleL.ontouchstart = function(e) { startDrag(e, bar, 'left', empName, ev, container); };
+                    handleR.ontouchstart = function(e) { startDrag(e, bar, 'right', empName, ev, container); };
+                });
+            });
 
             // Add staff button at bottom of timeline
             var addStaffRow = document.getElementById('add-staff-row');
@@ -2378,56 +2508,39 @@ def generate_html(week_employees, week_num, year, all_weeks):
             addRow.className = 'timeline-row add-staff-row';
             addRow.id = 'add-staff-row';
             addRow.innerHTML = '<button class="add-staff-btn">+ Ajouter un employ\u00e9</button>';
-            addRow.querySelector('button').onclick = function() {{ openAddStaffPopup(); }};
+            addRow.querySelector('button').onclick = function() { openAddStaffPopup(); };
             tl.querySelector('.timeline-inner').appendChild(addRow);
-        }};
+        };
 
         // Build activity code options for select
-        function buildCodeOptions() {{
-            var codes = {{}};
-            Object.keys(DATA).forEach(function(n) {{
+        function buildCodeOptions() {
+            var codes = {};
+            Object.keys(DATA).forEach(function(n) {
                 if (n === '_codeNames') return;
-                DATA[n].events.forEach(function(ev) {{
+                DATA[n].events.forEach(function(ev) {
                     if (!codes[ev.code]) codes[ev.code] = ev.label || ev.code;
-                }});
-            }});
-            if (DATA._codeNames) {{
-                Object.keys(DATA._codeNames).forEach(function(c) {{
+                });
+            });
+            if (DATA._codeNames) {
+                Object.keys(DATA._codeNames).forEach(function(c) {
                     if (!codes[c]) codes[c] = DATA._codeNames[c];
-                }});
-            }}
+                });
+            }
             return codes;
-        }}
-
-        function openEditPopup(empName, ev, evIdx) {{
-            // Remove existing popup
-            var old = document.getElementById('edit-overlay');
-            if (old) old.remove();
-            old = document.getElementById('edit-popup');
-            if (old) old.remove();
+        }
 
-            var s = new Date(ev.start);
-            var e = new Date(ev.end);
-            var sh = s.getHours().toString().padStart(2, '0') + ':' + s.getMinutes().toString().padStart(2, '0');
-            var eh = e.getHours().toString().padStart(2, '0') + ':' + e.getMinutes().toString().padStart(2, '0');
+        function openEditPopup(empName, ev, evIdx) {
+            var sh = ev._startHM, eh = ev._endHM;
 
             // Build code selector
             var codes = buildCodeOptions();
             var codeOpts = '';
-            Object.keys(codes).sort().forEach(function(c) {{
+            Object.keys(codes).sort().forEach(function(c) {
                 var sel = (c === ev.code) ? ' selected' : '';
                 codeOpts += '<option value="' + c + '"' + sel + '>' + c + ' \u2014 ' + codes[c] + '</option>';
-            }});
-
-            var overlay = document.createElement('div');
-            overlay.className = 'edit-overlay';
-            overlay.id = 'edit-overlay';
-            overlay.onclick = function() {{ closeEditPopup(); }};
-            document.body.appendChild(overlay);
+            });
 
-            var popup = document.createElement('div');
-            popup.className = 'edit-popup';
-            popup.id = 'edit-popup';
+            var popup = openEditOverlay();
             popup.innerHTML =
                 '<h3>' + getFirstName(empName) + ' \u2014 ' + ev.label + '</h3>' +
                 '<div class="field"><label>Activit\u00e9</label><select id="edit-code">' + codeOpts + '</select></div>' +
@@ -2438,15 +2551,14 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 '<button class="btn-cancel" id="edit-cancel">Annuler</button>' +
                 '<button class="btn-save" id="edit-save">Enregistrer</button>' +
                 '</div>';
-            document.body.appendChild(popup);
 
             document.getElementById('edit-cancel').onclick = closeEditPopup;
-            document.getElementById('edit-delete').onclick = function() {{
+            document.getElementById('edit-delete').onclick = function() {
                 if (!confirm('Supprimer ce cr\u00e9neau ?')) return;
                 deleteEvent(empName, ev);
                 closeEditPopup();
-            }};
-            document.getElementById('edit-save').onclick = function() {{
+            };
+            document.getElementById('edit-save').onclick = function() {
                 var newStart = document.getElementById('edit-start').value;
                 var newEnd = document.getElementById('edit-end').value;
                 var newCode = document.getElementById('edit-code').value;
@@ -2456,20 +2568,21 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 ev.label = codes[newCode] || newCode;
                 applyTimeEdit(empName, ev, newStart, newEnd);
                 closeEditPopup();
-            }};
-        }}
+            };
+        }
 
-        function deleteEvent(empName, ev) {{
+        function deleteEvent(empName, ev) {
             var emp = DATA[empName];
             if (!emp) return;
             var idx = emp.events.indexOf(ev);
             if (idx !== -1) emp.events.splice(idx, 1);
+            indexEvents(emp);
             renderTimeline();
             updateHoursBadges();
             pushDataAfterEdit();
-        }}
+        }
 
-        function openAddEventPopup(empName, defaultHour) {{
+        function openAddEventPopup(empName, defaultHour) {
             closeEditPopup();
             var dateStr = WEEK_DATES[currentDay];
             var startH = hourToStr(defaultHour);
@@ -2477,19 +2590,11 @@ def generate_html(week_employees, week_num, year, all_weeks):
 
             var codes = buildCodeOptions();
             var codeOpts = '';
-            Object.keys(codes).sort().forEach(function(c) {{
+            Object.keys(codes).sort().forEach(function(c) {
                 codeOpts += '<option value="' + c + '">' + c + ' \u2014 ' + codes[c] + '</option>';
-            }});
+            });
 
-            var overlay = document.createElement('div');
-            overlay.className = 'edit-overlay';
-            overlay.id = 'edit-overlay';
-            overlay.onclick = function() {{ closeEditPopup(); }};
-            document.body.appendChild(overlay);
-
-            var popup = document.createElement('div');
-            popup.className = 'edit-popup';
-            popup.id = 'edit-popup';
+            var popup = openEditOverlay();
             popup.innerHTML =
                 '<h3>Nouveau cr\u00e9neau \u2014 ' + getFirstName(empName) + '</h3>' +
                 '<div class="field"><label>Activit\u00e9</label><select id="edit-code">' + codeOpts + '</select></div>' +
@@ -2499,41 +2604,35 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 '<button class="btn-cancel" id="edit-cancel">Annuler</button>' +
                 '<button class="btn-save" id="edit-save">Ajouter</button>' +
                 '</div>';
-            document.body.appendChild(popup);
 
             document.getElementById('edit-cancel').onclick = closeEditPopup;
-            document.getElementById('edit-save').onclick = function() {{
+            document.getElementById('edit-save').onclick = function() {
                 var newStart = document.getElementById('edit-start').value;
                 var newEnd = document.getElementById('edit-end').value;
                 var newCode = document.getElementById('edit-code').value;
                 if (!newStart || !newEnd) return;
                 var codes = buildCodeOptions();
-                var newEv = {{
+                var newEv = {
                     code: newCode,
                     label: codes[newCode] || newCode,
                     start: dateStr + 'T' + newStart,
                     end: dateStr + 'T' + newEnd,
                     day: currentDay
-                }};
+                };
+                prepEvent(newEv);
                 DATA[empName].events.push(newEv);
+                DATA[empName]._eventsByDay[currentDay].push(newEv);
+                dayCache[currentDay] = null;
                 renderTimeline();
                 updateHoursBadges();
                 closeEditPopup();
                 pushDataAfterEdit();
-            }};
-        }}
+            };
+        }
 
-        function openAddStaffPopup() {{
+        function openAddStaffPopup() {
             closeEditPopup();
-            var overlay = document.createElement('div');
-            overlay.className = 'edit-overlay';
-            overlay.id = 'edit-overlay';
-            overlay.onclick = function() {{ closeEditPopup(); }};
-            document.body.appendChild(overlay);
-
-            var popup = document.createElement('div');
-            popup.className = 'edit-popup';
-            popup.id = 'edit-popup';
+            var popup = openEditOverlay();
             popup.innerHTML =
                 '<h3>Ajouter un employ\u00e9</h3>' +
                 '<div class="field"><label>Nom</label><input type="text" id="add-staff-last" placeholder="NOM" style="text-transform:uppercase;"></div>' +
@@ -2542,54 +2641,46 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 '<button class="btn-cancel" id="edit-cancel">Annuler</button>' +
                 '<button class="btn-save" id="edit-save">Ajouter</button>' +
                 '</div>';
-            document.body.appendChild(popup);
 
             document.getElementById('edit-cancel').onclick = closeEditPopup;
-            document.getElementById('edit-save').onclick = function() {{
+            document.getElementById('edit-save').onclick = function() {
                 var last = document.getElementById('add-staff-last').value.trim().toUpperCase();
                 var first = document.getElementById('add-staff-first').value.trim();
                 if (!last || !first) return;
                 var fullName = last + ' ' + first;
-                if (DATA[fullName]) {{ alert('Cet employ\u00e9 existe d\u00e9j\u00e0.'); return; }}
+                if (DATA[fullName]) { alert('Cet employ\u00e9 existe d\u00e9j\u00e0.'); return; }
                 var slug = (last + '-' + first).toLowerCase().normalize('NFD')
                     .replace(/[\u0300-\u036f]/g, '').replace(/[^a-z0-9-]/g, '-').replace(/-+/g, '-');
-                DATA[fullName] = {{ slug: slug, events: [] }};
+                DATA[fullName] = { slug: slug, events: [] };
+                indexEvents(DATA[fullName]);
                 renderTimeline();
                 updateHoursBadges();
                 closeEditPopup();
                 pushDataAfterEdit();
-            }};
-        }}
+            };
+        }
 
-        function deleteStaff(empName) {{
+        function deleteStaff(empName) {
             var emp = DATA[empName];
             if (!emp) return;
             closeEditPopup();
 
             // Find which days this employee has events
-            var daySet = {{}};
-            emp.events.forEach(function(ev) {{ daySet[ev.day] = true; }});
-            var daysWithEvents = Object.keys(daySet).map(Number).sort(function(a,b){{ return a-b; }});
+            var daySet = {};
+            emp.events.forEach(function(ev) { daySet[ev.day] = true; });
+            var daysWithEvents = Object.keys(daySet).map(Number).sort(function(a,b){ return a-b; });
 
             // If no events, just delete the empty entry
-            if (daysWithEvents.length === 0) {{
+            if (daysWithEvents.length === 0) {
                 if (!confirm('Supprimer ' + empName + ' (aucun cr\u00e9neau) ?')) return;
                 delete DATA[empName];
                 renderTimeline();
                 updateHoursBadges();
                 pushDataAfterEdit();
                 return;
-            }}
-
-            var overlay = document.createElement('div');
-            overlay.className = 'edit-overlay';
-            overlay.id = 'edit-overlay';
-            overlay.onclick = function() {{ closeEditPopup(); }};
-            document.body.appendChild(overlay);
+            }
 
-            var popup = document.createElement('div');
-            popup.className = 'edit-popup';
-            popup.id = 'edit-popup';
+            var popup = openEditOverlay();
 
             var html = '<h3>Supprimer ' + getFirstName(empName) + '</h3>';
             html += '<p style="font-size:11px;color:#888;margin-bottom:10px;">S\u00e9lectionner les jours \u00e0 supprimer :</p>';
@@ -2598,16 +2689,16 @@ def generate_html(week_employees, week_num, year, all_weeks):
             html += '<label class="day-check all-check"><input type="checkbox" id="del-all"> <span>Toute la semaine</span></label>';
 
             // One checkbox per day
-            for (var i = 0; i < 7; i++) {{
+            for (var i = 0; i < 7; i++) {
                 var hasEvts = daySet[i];
-                var count = emp.events.filter(function(ev) {{ return ev.day === i; }}).length;
+                var count = emp._eventsByDay[i].length;
                 var label = DAYS_FULL[i] + ' ' + (WEEK_DATES[i] || '').substring(8,10) + '/' + (WEEK_DATES[i] || '').substring(5,7);
-                if (hasEvts) {{
+                if (hasEvts) {
                     html += '<label class="day-check"><input type="checkbox" value="' + i + '" class="del-day-cb"' +
                         (daysWithEvents.length === 1 ? ' checked' : '') +
                         '> <span>' + label + ' <em>(' + count + ' cr\u00e9neau' + (count > 1 ? 'x' : '') + ')</em></span></label>';
-                }}
-            }}
+                }
+            }
 
             html += '<div class="actions" style="margin-top:12px;">' +
                 '<button class="btn-cancel" id="edit-cancel">Annuler</button>' +
@@ -2615,223 +2706,483 @@ def generate_html(week_employees, week_num, year, all_weeks):
                 '</div>';
 
             popup.innerHTML = html;
-            document.body.appendChild(popup);
 
             // "Select all" toggles all checkboxes
-            document.getElementById('del-all').onchange = function() {{
+            document.getElementById('del-all').onchange = function() {
                 var checked = this.checked;
-                popup.querySelectorAll('.del-day-cb').forEach(function(cb) {{ cb.checked = checked; }});
-            }};
+                popup.querySelectorAll('.del-day-cb').forEach(function(cb) { cb.checked = checked; });
+            };
             // If all individual checkboxes are checked, check "select all" too
-            popup.querySelectorAll('.del-day-cb').forEach(function(cb) {{
-                cb.onchange = function() {{
+            popup.querySelectorAll('.del-day-cb').forEach(function(cb) {
+                cb.onchange = function() {
                     var allCbs = popup.querySelectorAll('.del-day-cb');
                     var allChecked = true;
-                    allCbs.forEach(function(c) {{ if (!c.checked) allChecked = false; }});
+                    allCbs.forEach(function(c) { if (!c.checked) allChecked = false; });
                     document.getElementById('del-all').checked = allChecked;
-                }};
-            }});
+                };
+            });
 
             document.getElementById('edit-cancel').onclick = closeEditPopup;
-            document.getElementById('del-confirm').onclick = function() {{
+            document.getElementById('del-confirm').onclick = function() {
                 var selectedDays = [];
-                popup.querySelectorAll('.del-day-cb:checked').forEach(function(cb) {{
+                popup.querySelectorAll('.del-day-cb:checked').forEach(function(cb) {
                     selectedDays.push(parseInt(cb.value));
-                }});
+                });
                 if (selectedDays.length === 0) return;
 
                 // If all days selected, remove employee entirely
-                if (selectedDays.length === daysWithEvents.length) {{
+                if (selectedDays.length === daysWithEvents.length) {
                     delete DATA[empName];
-                }} else {{
+                    dayCache = [];
+                } else {
                     // Remove only events from selected days
-                    emp.events = emp.events.filter(function(ev) {{
+                    emp.events = emp.events.filter(function(ev) {
                         return selectedDays.indexOf(ev.day) === -1;
-                    }});
-                }}
+                    });
+                    indexEvents(emp);
+                }
                 renderTimeline();
                 updateHoursBadges();
                 closeEditPopup();
                 pushDataAfterEdit();
-            }};
-        }}
+            };
+        }
 
         var _editsDirty = false;
 
-        function pushDataAfterEdit() {{
+        function pushDataAfterEdit() {
             _editsDirty = true;
             updateSaveButton();
-        }}
+        }
 
-        function updateSaveButton() {{
+        function updateSaveButton() {
             var btn = document.getElementById('save-edits-btn');
             if (!btn) return;
-            if (_editsDirty) {{
+            if (_editsDirty) {
                 btn.style.display = '';
                 btn.disabled = false;
                 btn.textContent = 'Enregistrer';
                 btn.className = 'save-edits-btn dirty';
-            }} else {{
+            } else {
                 btn.className = 'save-edits-btn';
                 btn.style.display = 'none';
-            }}
-        }}
+            }
+        }
 
-        function publishAllEdits() {{
+        function publishAllEdits() {
             var btn = document.getElementById('save-edits-btn');
-            if (btn) {{
+            if (btn) {
                 btn.disabled = true;
                 btn.textContent = 'Sauvegarde...';
                 btn.className = 'save-edits-btn saving';
-            }}
+            }
             var statusEl = document.getElementById('edit-status');
-            pushDataToGitHub(function(ok) {{
-                if (ok) {{
+            pushDataToGitHub(function(ok) {
+                if (ok) {
                     _editsDirty = false;
-                    if (btn) {{
+                    if (btn) {
                         btn.textContent = 'Sauvegard\u00e9 \u2714';
                         btn.className = 'save-edits-btn saved';
-                        setTimeout(function() {{ updateSaveButton(); }}, 2000);
-                    }}
-                }} else {{
-                    if (btn) {{
+                        setTimeout(function() { updateSaveButton(); }, 2000);
+                    }
+                } else {
+                    if (btn) {
                         btn.disabled = false;
                         btn.textContent = 'Erreur \u2014 R\u00e9essayer';
                         btn.className = 'save-edits-btn error';
-                    }}
-                }}
-            }});
-        }}
-
-        function closeEditPopup() {{
-            var el = document.getElementById('edit-overlay');
-            if (el) el.remove();
-            el = document.getElementById('edit-popup');
-            if (el) el.remove();
-        }}
-
-        function applyTimeEdit(empName, ev, newStart, newEnd) {{
+                    }
+                }
+            });
+        }
+
+        // Overlay + popup d'édition créés une seule fois, masqués entre deux ouvertures
+        var editOverlayEl = null, editPopupEl = null;
+        function openEditOverlay() {
+            if (!editOverlayEl) {
+                editOverlayEl = document.createElement('div');
+                editOverlayEl.className = 'edit-overlay';
+                editOverlayEl.id = 'edit-overlay';
+                editOverlayEl.addEventListener('click', closeEditPopup, { passive: true });
+                document.body.appendChild(editOverlayEl);
+                editPopupEl = document.createElement('div');
+                editPopupEl.className = 'edit-popup';
+                editPopupEl.id = 'edit-popup';
+                document.body.appendChild(editPopupEl);
+            }
+            editOverlayEl.style.display = '';
+            editPopupEl.style.display = '';
+            return editPopupEl;
+        }
+
+        function closeEditPopup() {
+            if (!editOverlayEl) return;
+            editOverlayEl.style.display = 'none';
+            editPopupEl.style.display = 'none';
+            editPopupEl.innerHTML = '';
+        }
+
+        function applyTimeEdit(empName, ev, newStart, newEnd) {
             var dateStr = ev.start.substring(0, 11);
             ev.start = dateStr + newStart;
             ev.end = dateStr + newEnd;
+            prepEvent(ev);
+            dayCache[ev.day] = null;
             renderTimeline();
             updateHoursBadges();
             pushDataAfterEdit();
-        }}
+        }
 
-        function pushDataToGitHub(cb) {{
+        function pushDataToGitHub(cb) {
             var token = getToken();
-            if (!token) {{ cb(false); return; }}
+            if (!token) { cb(false); return; }
 
             // Build the updated data JSON for this week
-            var weekData = {{}};
-            Object.keys(DATA).forEach(function(name) {{
+            var weekData = {};
+            Object.keys(DATA).forEach(function(name) {
                 if (name === '_codeNames') return;
                 weekData[name] = DATA[name];
-            }});
-            var content = btoa(unescape(encodeURIComponent(JSON.stringify(weekData, null, 2) + '\\n')));
-            var dataPath = 'data/S{week_num}-events.json';
-            var apiUrl = 'https://api.github.com/repos/' + REPO + '/contents/' + dataPath;
-
-            // Get current SHA
-            fetch(apiUrl, {{
-                headers: {{ 'Authorization': 'Bearer ' + token, 'Accept': 'application/vnd.github.v3+json' }}
-            }})
-            .then(function(r) {{ return r.ok ? r.json() : {{ sha: null }}; }})
-            .then(function(file) {{
-                var body = {{
-                    message: 'MAJ cr\u00e9neaux S{week_num} depuis la page',
-                    content: content,
-                    branch: 'main'
-                }};
-                if (file.sha) body.sha = file.sha;
-
-                return fetch(apiUrl, {{
-                    method: 'PUT',
-                    headers: {{
-                        'Authorization': 'Bearer ' + token,
-                        'Accept': 'application/vnd.github.v3+json',
-                        'Content-Type': 'application/json'
-                    }},
-                    body: JSON.stringify(body)
-                }});
-            }})
-            .then(function(r) {{ cb(r.ok); }})
-            .catch(function() {{ cb(false); }});
-        }}
+            });
+            var json = JSON.stringify(weekData, function(k, v) { return k.charAt(0) === '_' ? undefined : v; }, 2);
+            var content = btoa(unescape(encodeURIComponent(json + '\\n')));
+            putGitHubFile('data/S' + WEEK_NUM + '-events.json', content, 'MAJ cr\u00e9neaux S' + WEEK_NUM + ' depuis la page')
+            .then(function(r) { cb(r.ok); })
+            .catch(function() { cb(false); });
+        }
 
         // Init admin toolbar if token exists
         initAdminToolbar();
 
         // Admin link at bottom to enter token
-        if (!getToken()) {{
+        if (!getToken()) {
             var adminLink = document.createElement('div');
             adminLink.style.cssText = 'text-align:center;margin:20px 0;';
             adminLink.innerHTML = '<a href="#" style="color:#444;font-size:11px;text-decoration:none;">Admin</a>';
-            adminLink.querySelector('a').onclick = function(e) {{
+            adminLink.querySelector('a').onclick = function(e) {
                 e.preventDefault();
                 var t = prompt('Token GitHub (admin):');
-                if (t && t.trim()) {{
+                if (t && t.trim()) {
                     setToken(t.trim());
                     adminLink.remove();
                     initAdminToolbar();
                     renderNotes();
-                }}
-            }};
+                }
+            };
             document.querySelector('.container').appendChild(adminLink);
-        }}
+        }
+
+"""
+
+
+def generate_html(week_employees, week_num, year, all_weeks):
+    """Génère la page HTML avec preview timeline + vue individuelle + abonnement."""
+    date_range = format_date_range(year, week_num)
+
+    # Si un fichier events.json existe (modifié depuis la page web), l'utiliser
+    # comme source de vérité à la place des données Excel.
+    events_path = f"data/S{week_num}-events.json"
+    if os.path.exists(events_path):
+        with open(events_path, "r", encoding="utf-8") as f:
+            events_json = f.read().strip()
+    else:
+        events_json = build_events_json(week_employees)
+    notes_data = load_week_notes(week_num)
+    notes_json = dumps_compact(notes_data)
+
+    DAYS_SHORT = ["Lun", "Mar", "Mer", "Jeu", "Ven", "Sam", "Dim"]
+    DAYS_FULL = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+    # Les 7 dates de la semaine (partagées avec le parsing via le cache) :
+    # libellés courts, longs et dates ISO construits en une seule passe
+    day_labels, day_labels_full, day_isos = [], [], []
+    for short, full, d in zip(DAYS_SHORT, DAYS_FULL, week_dates(year, week_num)):
+        dd, mm = f"{d.day:02d}", f"{d.month:02d}"
+        day_labels.append(f"{short} {dd}")
+        day_labels_full.append(f"{full} {dd}/{mm}")
+        day_isos.append(f"{d.year:04d}-{mm}-{dd}")
+    day_labels_json = json.dumps(day_labels, ensure_ascii=False)
+    day_labels_full_json = json.dumps(day_labels_full, ensure_ascii=False)
+    week_dates_json = json.dumps(day_isos)
+
+    tabs = []
+    for w in sorted(all_weeks):
+        cls = ' active' if w == week_num else ''
+        href = '#' if w == week_num else f'S{w}.html'
+        tabs.append(f'            <a href="{href}" class="week-tab{cls}">S{w}</a>')
+    week_tabs = "\n".join(tabs)
+
+    buttons = []
+    for name, evts in week_employees.items():
+        if evts:
+            buttons.append(
+                f'            <button class="employee-btn" data-name="{name}" '
+                f'data-slug="{slug(name)}">{name}</button>'
+            )
+        else:
+            buttons.append(
+                f'            <div class="employee-btn repos">{name} '
+                f'<span class="badge">Repos</span></div>'
+            )
+    employee_buttons = "\n".join(buttons)
+
+    return f"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Planning Urban 7D - S{week_num}</title>
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link href="https://fonts.googleapis.com/css2?family=Space+Mono:wght@400;700&family=Tahoma&display=swap" rel="stylesheet">
+    <style>
+{_PAGE_CSS}{_BAR_COLORS_CSS}    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Planning Urban 7D</h1>
+            <p class="subtitle">Semaine {week_num}</p>
+            <div class="dates">{date_range}</div>
+        </div>
+
+        <div class="week-selector">
+{week_tabs}
+        </div>
+
+        <div class="week-notes" id="week-notes"></div>
+
+        <div class="view-toggle">
+            <button class="view-btn active" data-view="day">Vue quotidienne</button>
+            <button class="view-btn" data-view="staff">Vue hebdo par staff</button>
+        </div>
+
+        <!-- ── Vue Journée (timeline) ── -->
+        <div id="view-day">
+            <div class="day-tabs" id="day-tabs"></div>
+            <div class="legend" id="legend"></div>
+            <div class="timeline" id="timeline"></div>
+        </div>
+
+        <!-- ── Vue Staff (liste) ── -->
+        <div id="view-staff" style="display:none;">
+            <div class="employee-list">
+{employee_buttons}
+            </div>
+        </div>
+    </div>
+
+    <!-- ── Modal preview individuelle ── -->
+    <div class="modal-overlay" id="modal">
+        <div class="modal">
+            <div class="modal-header">
+                <h2 id="modal-name"></h2>
+                <div style="display:flex;align-items:center;gap:8px;">
+                    <button class="subscribe-btn" id="modal-subscribe" style="padding:6px 14px;font-size:11px;">
+                        S'abonner
+                    </button>
+                    <button class="modal-close" id="modal-close">&times;</button>
+                </div>
+            </div>
+            <div class="modal-body" id="modal-body"></div>
+        </div>
+    </div>
+
+    <!-- ── Choix application calendrier ── -->
+    <div class="cal-chooser-overlay" id="cal-chooser">
+        <div class="cal-chooser">
+            <h3>Ajouter au calendrier</h3>
+            <div class="cal-sub" id="cal-chooser-name"></div>
+            <a class="cal-option" id="cal-google" target="_blank" rel="noopener">
+                <span class="cal-icon">G</span>
+                <div class="cal-info">
+                    <div class="cal-name">Google Agenda</div>
+                    <div class="cal-desc">S'abonner via Google Calendar (Android, Web)</div>
+                </div>
+            </a>
+            <a class="cal-option" id="cal-apple">
+                <span class="cal-icon">A</span>
+                <div class="cal-info">
+                    <div class="cal-name">Apple Calendar</div>
+                    <div class="cal-desc">iPhone, iPad, Mac</div>
+                </div>
+            </a>
+            <a class="cal-option" id="cal-outlook" target="_blank" rel="noopener">
+                <span class="cal-icon">O</span>
+                <div class="cal-info">
+                    <div class="cal-name">Outlook</div>
+                    <div class="cal-desc">Outlook.com / Office 365</div>
+                </div>
+            </a>
+            <a class="cal-option" id="cal-download">
+                <span class="cal-icon">+</span>
+                <div class="cal-info">
+                    <div class="cal-name">Autre / Télécharger .ics</div>
+                    <div class="cal-desc">Télécharger et ouvrir manuellement</div>
+                </div>
+            </a>
+            <div class="cal-option" id="cal-copy" style="cursor:pointer;">
+                <span class="cal-icon">~</span>
+                <div class="cal-info">
+                    <div class="cal-name">Copier le lien</div>
+                    <div class="cal-desc">Pour coller dans Google Agenda > Paramètres > Ajouter par URL</div>
+                </div>
+            </div>
+            <button class="cal-chooser-cancel" id="cal-cancel">Annuler</button>
+        </div>
+    </div>
 
-    }})();
+    <script>
+    (function() {{
+        var NOTES_DATA = {notes_json};
+        // Nettoyage des anciennes données localStorage (source de désync entre appareils)
+        try {{ localStorage.removeItem('planning-notes-S{week_num}'); }} catch(e) {{}}
+        var DATA = {events_json};
+        // Nettoyage des anciennes données localStorage
+        try {{ localStorage.removeItem('planning-edits-S{week_num}'); }} catch(e) {{}}
+        var COLORS = {_COLORS_JSON};
+        var DEFAULT_C = {_DEFAULT_COLOR_JSON};
+        var DAYS = {day_labels_json};
+        var DAYS_FULL = {day_labels_full_json};
+        var WEEK_DATES = {week_dates_json};
+        var WEEK_NUM = {week_num};
+{_PAGE_SCRIPT}    }})();
     </script>
 </body>
 </html>"""
 
 
+# Page index.html : redirection vers la dernière semaine
+_INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta http-equiv="refresh" content="0;url=S{week}.html">
+    <title>Planning Urban 7D</title>
+</head>
+<body>
+    <p>Redirection vers <a href="S{week}.html">S{week}</a>...</p>
+</body>
+</html>"""
+
+# Récapitulatif affiché en fin de génération (un seul write)
+_SEP = "\u2500" * 41
+_FOOTER = "\n".join([
+    "",
+    "Termin\u00e9 !",
+    "",
+    "\u2500\u2500 Abonnement calendrier " + _SEP,
+    "1. H\u00e9bergez ces fichiers (GitHub Pages, Netlify, etc.)",
+    "2. Les employ\u00e9s ouvrent la page et cliquent sur leur nom",
+    "3. Le calendrier se met \u00e0 jour automatiquement",
+    "",
+    "Pour ajouter une nouvelle semaine :",
+    "  1. Ajoutez le fichier Excel \u00ab Plannings %(year)s SXX.xlsx \u00bb",
+    "  2. Relancez : python generate.py",
+    "  3. Publiez les fichiers mis \u00e0 jour",
+])
+
+
 # ── Main ───────────────────────────────────────────────────────────────────
 
 
-def main():
+def write_week_outputs(week_num, wd, all_weeks):
+    """Écrit data/SXX.json, data/SXX-events.json (si absent) et SXX.html.
+
+    Retourne la liste des chemins écrits, dans l'ordre.
+    """
+    year = wd["year"]
+    employees = wd["employees"]
+    written = []
+
+    # JSON
+    active_names = sorted([n for n, e in employees.items() if e])
+    days = week_dates(year, week_num)
+    monday, sunday = days[0], days[6]
+    json_data = {
+        "semaine": week_num,
+        "annee": year,
+        "date_debut": f"{monday.day} {FRENCH_MONTHS[monday.month]}",
+        "date_fin": f"{sunday.day} {FRENCH_MONTHS[sunday.month]}",
+        "employesActifs": active_names,
+    }
+    json_path = f"data/S{week_num}.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        f.write(dumps_pretty(json_data))
+    written.append(json_path)
+
+    # Events JSON — écrire seulement s'il n'existe pas encore
+    # (s'il existe, il a été modifié depuis la page web et fait foi)
+    events_path = f"data/S{week_num}-events.json"
+    if not os.path.exists(events_path):
+        with open(events_path, "w", encoding="utf-8") as f:
+            f.write(dumps_pretty(build_events_data(employees)))
+            f.write("\n")
+        written.append(events_path)
+
+    # HTML
+    html_content = generate_html(employees, week_num, year, all_weeks)
+    html_path = f"S{week_num}.html"
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(html_content)
+    written.append(html_path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="G\u00e9n\u00e8re les plannings (ICS, HTML, JSON) depuis les fichiers Excel.")
+    parser.add_argument("--quiet", action="store_true",
+                        help="n'afficher que les avertissements")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO,
+                        format="%(message)s", stream=sys.stdout)
+
     excel_files = discover_excel_files()
     if not excel_files:
-        print("Aucun fichier 'Plannings YYYY SXX.xlsx' trouv\u00e9.")
+        logger.warning("Aucun fichier 'Plannings YYYY SXX.xlsx' trouv\u00e9.")
         return
 
-    print(f"Fichiers Excel trouv\u00e9s : {len(excel_files)}")
+    logger.info("Fichiers Excel trouv\u00e9s : %d", len(excel_files))
     for ef in excel_files:
-        print(f"  - {ef['filename']} (S{ef['week']}, {ef['year']})")
+        logger.info("  - %s (S%s, %s)", ef["filename"], ef["week"], ef["year"])
 
     # ── Collecter tous les événements par employé, toutes semaines ──
-    all_employee_events = {}   # {name: [events]}
+    all_employee_events = defaultdict(list)   # {name: [events]}
     week_data = {}             # {week_num: {employees, year}}
     all_weeks = set()
 
-    for ef in excel_files:
-        year, week_num = ef["year"], ef["week"]
-        dates = week_dates(year, week_num)
-
-        wb = openpyxl.load_workbook(ef["filename"])
-        ws = wb["Planning"] if "Planning" in wb.sheetnames else wb.active
-
-        employees = parse_employees(ws, dates, week_num)
-        all_weeks.add(week_num)
-        week_data[week_num] = {"employees": employees, "year": year}
-
-        active_count = 0
-        print(f"\nSemaine {week_num} ({year}) :")
-        for name, evts in employees.items():
-            if name not in all_employee_events:
-                all_employee_events[name] = []
-            all_employee_events[name].extend(evts)
-            if evts:
-                active_count += 1
-                print(f"  {name} ({len(evts)} \u00e9v\u00e9nements)")
-                for e in evts:
-                    end_str = e["end"].strftime("%H:%M")
-                    if e["end"].date() > e["start"].date():
-                        end_str += " (+1j)"
-                    print(f"    {e['start'].strftime('%a %d/%m %H:%M')} - "
-                          f"{end_str} : {e['label']}")
-        print(f"  \u2192 {active_count} employ\u00e9s actifs")
+    # Fichiers indépendants : parsing en parallèle, fusion dans l'ordre au fil
+    # des résultats (la fusion d'une semaine recouvre le parsing des suivantes).
+    # Un seul worker utile : pas de pool (démarrage des processus inutile).
+    workers = min(len(excel_files), os.cpu_count() or 1)
+    # Détail par créneau formaté seulement s'il sera affiché (sauté sous --quiet)
+    verbose = logger.isEnabledFor(logging.INFO)
+    with ExitStack() as stack:
+        if workers > 1:
+            ex = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            parsed = ex.map(parse_planning_file, excel_files)
+        else:
+            parsed = map(parse_planning_file, excel_files)
+
+        for ef, (employees, warnings) in zip(excel_files, parsed):
+            year, week_num = ef["year"], ef["week"]
+            # Avertissements de tout le fichier émis en une fois
+            if warnings:
+                logger.warning("\n".join(warnings))
+            all_weeks.add(week_num)
+            week_data[week_num] = {"employees": employees, "year": year}
+
+            active_count = 0
+            logger.info("\nSemaine %s (%s) :", week_num, year)
+            for name, evts in employees.items():
+                all_employee_events[name].extend(evts)
+                if evts:
+                    active_count += 1
+                    if verbose:
+                        logger.info("  %s (%d \u00e9v\u00e9nements)", name, len(evts))
+                        for e in evts:
+                            end_str = e.end.strftime("%H:%M")
+                            if e.end.date() > e.start.date():
+                                end_str += " (+1j)"
+                            logger.info("    %s - %s : %s",
+                                        e.start.strftime("%a %d/%m %H:%M"), end_str, e.label)
+            logger.info("  \u2192 %d employ\u00e9s actifs", active_count)
 
     # ── Charger les notes par semaine ──
     all_week_notes = {}
@@ -2853,7 +3204,7 @@ def main():
             r_eh = int(r_parts_e[0]) + int(r_parts_e[1] if len(r_parts_e) > 1 else 0) / 60
             # Check if replacer already has events on this date
             in_evts = all_employee_events.get(in_name, [])
-            has_on_date = any(e["start"].strftime("%Y-%m-%d") == repl_date_str for e in in_evts)
+            has_on_date = any(e.start.date().isoformat() == repl_date_str for e in in_evts)
             if has_on_date:
                 continue
             # Find code/label from replaced person's events
@@ -2861,110 +3212,59 @@ def main():
             ref_label = "Vie de centre"
             out_evts = all_employee_events.get(out_name, [])
             for oev in out_evts:
-                if oev["start"].strftime("%Y-%m-%d") != repl_date_str:
+                if oev.start.date().isoformat() != repl_date_str:
                     continue
-                o_sh = oev["start"].hour + oev["start"].minute / 60
-                o_eh = oev["end"].hour + oev["end"].minute / 60
+                o_sh = oev.start.hour + oev.start.minute / 60
+                o_eh = oev.end.hour + oev.end.minute / 60
                 if o_eh <= o_sh:
                     o_eh = 24
                 if o_sh < r_eh and o_eh > r_sh:
-                    ref_code = oev.get("code", ref_code)
-                    ref_label = oev.get("label", ref_label)
+                    ref_code = oev.code
+                    ref_label = oev.label
                     break
             from datetime import datetime as _dt2
             synth_start = _dt2.strptime(f"{repl_date_str} {int(r_parts_s[0]):02d}:{int(r_parts_s[1] if len(r_parts_s)>1 else 0):02d}", "%Y-%m-%d %H:%M")
             synth_end = _dt2.strptime(f"{repl_date_str} {int(r_parts_e[0]):02d}:{int(r_parts_e[1] if len(r_parts_e)>1 else 0):02d}", "%Y-%m-%d %H:%M")
-            synth_evt = {
-                "code": ref_code,
-                "label": ref_label,
-                "start": synth_start,
-                "end": synth_end,
-                "week": wn,
-            }
-            if in_name not in all_employee_events:
-                all_employee_events[in_name] = []
-            all_employee_events[in_name].append(synth_evt)
+            all_employee_events[in_name].append(
+                Event(ref_code, ref_label, synth_start, synth_end, wn))
 
     # ── Générer les fichiers ICS (cumulatifs, toutes semaines) ──
     os.makedirs("ics", exist_ok=True)
     ics_count = 0
     for name, events in all_employee_events.items():
         if events:
-            events.sort(key=lambda e: e["start"])
+            events.sort(key=_BY_START)
             ics_content = generate_ics(name, events, week_notes=all_week_notes)
             filename = f"ics/{slug(name)}.ics"
             with open(filename, "w", encoding="utf-8") as f:
                 f.write(ics_content)
             ics_count += 1
-    print(f"\n{ics_count} fichiers ICS g\u00e9n\u00e9r\u00e9s dans ics/")
+    logger.info("\n%d fichiers ICS g\u00e9n\u00e9r\u00e9s dans ics/", ics_count)
 
     # ── Générer HTML + JSON par semaine ──
     os.makedirs("data", exist_ok=True)
     for week_num in sorted(all_weeks):
         wd = week_data[week_num]
         year = wd["year"]
-        employees = wd["employees"]
-
-        # JSON
-        active_names = sorted([n for n, e in employees.items() if e])
-        monday = datetime.fromisocalendar(year, week_num, 1)
-        sunday = monday + timedelta(days=6)
-        json_data = {
-            "semaine": week_num,
-            "annee": year,
-            "date_debut": f"{monday.day} {FRENCH_MONTHS[monday.month]}",
-            "date_fin": f"{sunday.day} {FRENCH_MONTHS[sunday.month]}",
-            "employesActifs": active_names,
-        }
-        json_path = f"data/S{week_num}.json"
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
-        print(f"\u00c9crit : {json_path}")
-
-        # Events JSON — écrire seulement s'il n'existe pas encore
-        # (s'il existe, il a été modifié depuis la page web et fait foi)
-        events_path = f"data/S{week_num}-events.json"
-        if not os.path.exists(events_path):
-            events_data = json.loads(build_events_json(employees))
-            with open(events_path, "w", encoding="utf-8") as f:
-                json.dump(events_data, f, ensure_ascii=False, indent=2)
-                f.write("\n")
-            print(f"\u00c9crit : {events_path}")
-
-        # HTML
-        html_content = generate_html(employees, week_num, year, all_weeks)
-        html_path = f"S{week_num}.html"
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        print(f"\u00c9crit : {html_path}")
+        for path in write_week_outputs(week_num, wd, all_weeks):
+            logger.info("\u00c9crit : %s", path)
 
     # ── Mettre à jour index.html → dernière semaine ──
+    # (inchangé → pas de réécriture, évite d'invalider le cache GitHub Pages)
     latest_week = max(all_weeks)
-    with open("index.html", "w", encoding="utf-8") as f:
-        f.write(
-            '<!DOCTYPE html>\n'
-            '<html lang="fr">\n'
-            '<head>\n'
-            '    <meta charset="UTF-8">\n'
-            f'    <meta http-equiv="refresh" content="0;url=S{latest_week}.html">\n'
-            '    <title>Planning Urban 7D</title>\n'
-            '</head>\n'
-            '<body>\n'
-            f'    <p>Redirection vers <a href="S{latest_week}.html">S{latest_week}</a>...</p>\n'
-            '</body>\n'
-            '</html>'
-        )
-    print(f"\u00c9crit : index.html \u2192 S{latest_week}.html")
-
-    print("\nTermin\u00e9 !")
-    print("\n\u2500\u2500 Abonnement calendrier \u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500")
-    print("1. H\u00e9bergez ces fichiers (GitHub Pages, Netlify, etc.)")
-    print("2. Les employ\u00e9s ouvrent la page et cliquent sur leur nom")
-    print("3. Le calendrier se met \u00e0 jour automatiquement")
-    print(f"\nPour ajouter une nouvelle semaine :")
-    print(f"  1. Ajoutez le fichier Excel « Plannings {year} SXX.xlsx »")
-    print(f"  2. Relancez : python generate.py")
-    print(f"  3. Publiez les fichiers mis \u00e0 jour")
+    index_path = Path("index.html")
+    index_html = _INDEX_TEMPLATE.format(week=latest_week)
+    try:
+        index_current = index_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        index_current = None
+    if index_current == index_html:
+        logger.info("index.html \u00e0 jour \u2192 S%s.html", latest_week)
+    else:
+        index_path.write_text(index_html, encoding="utf-8", newline="\n")
+        logger.info("\u00c9crit : index.html \u2192 S%s.html", latest_week)
+
+    logger.info(_FOOTER, {"year": year})
 
 
 if __name__ == "__main__":
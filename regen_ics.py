@@ -6,23 +6,28 @@ import json
 import os
 import re
 from datetime import datetime, timezone
+from functools import lru_cache
 
 
 ICS_DIR = "ics"
 NOTES_DIR = "notes"
 
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_ICS_ESCAPE = str.maketrans({"\\": "\\\\", "\n": "\\n", ",": "\\,", ";": "\\;"})
+_SLUG_TABLE = str.maketrans({
+    "ï": "i", "é": "e", "è": "e", "ê": "e", "ô": "o", "ü": "u",
+    "ù": "u", "û": "u", "à": "a", "â": "a", "ç": "c",
+})
+_WEEK_HTML_RE = re.compile(r"S(\d+)\.html")
 
+
+@lru_cache(maxsize=512)
 def slug(name):
-    s = name.lower()
-    for old, new in [("ï", "i"), ("é", "e"), ("è", "e"), ("ê", "e"),
-                     ("ô", "o"), ("ü", "u"), ("ù", "u"), ("û", "u"),
-                     ("à", "a"), ("â", "a"), ("ç", "c")]:
-        s = s.replace(old, new)
-    return re.sub(r"[^a-z0-9]+", "-", s).strip("-")
+    return _SLUG_RE.sub("-", name.lower().translate(_SLUG_TABLE)).strip("-")
 
 
 def ics_escape(text):
-    return text.replace("\\", "\\\\").replace("\n", "\\n").replace(",", "\\,").replace(";", "\\;")
+    return text.translate(_ICS_ESCAPE)
 
 
 def fold_line(line, max_len=75):
@@ -186,7 +191,7 @@ def generate_ics(name, all_events, all_notes, dtstamp_utc):
                 evt_desc = repl_note + ("\n" + evt_desc if evt_desc else "")
             evt_desc_escaped = ics_escape(evt_desc) if evt_desc else ""
 
-            summary = summary_label.replace("\\", "\\\\").replace(",", "\\,").replace(";", "\\;")
+            summary = ics_escape(summary_label)
 
             lines.append("BEGIN:VEVENT")
             lines.append(f"UID:{s}-s{week_num}-{i}@urban7d")
@@ -217,7 +222,7 @@ def main():
 
     for html_file in html_files:
         # Extract week number from filename (S9.html -> 9, S10.html -> 10)
-        match = re.match(r"S(\d+)\.html", html_file)
+        match = _WEEK_HTML_RE.match(html_file)
         if not match:
             continue
         week_num = int(match.group(1))